@@ -0,0 +1,70 @@
+"""add running member balances
+
+Revision ID: 0003_member_balances
+Revises: 0002_add_active_workspace
+Create Date: 2025-03-01 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_member_balances"
+down_revision = "0002_add_active_workspace"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "member_balances",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            sa.BigInteger(),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "user_id",
+            sa.BigInteger(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("balance_minor", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint(
+            "workspace_id", "user_id", "currency", name="uq_member_balance"
+        ),
+    )
+
+    # Backfill from existing expenses: the payer is owed every share but their own.
+    op.execute(
+        """
+        INSERT INTO member_balances (workspace_id, user_id, currency, balance_minor)
+        SELECT workspace_id, user_id, currency, SUM(delta)
+        FROM (
+            SELECT t.workspace_id, t.created_by AS user_id, t.currency, s.amount_minor AS delta
+            FROM transactions t
+            JOIN transaction_splits s ON s.transaction_id = t.id
+            WHERE t.type = 'expense' AND t.created_by IS NOT NULL AND s.user_id <> t.created_by
+            UNION ALL
+            SELECT t.workspace_id, s.user_id, t.currency, -s.amount_minor
+            FROM transactions t
+            JOIN transaction_splits s ON s.transaction_id = t.id
+            WHERE t.type = 'expense' AND t.created_by IS NOT NULL AND s.user_id <> t.created_by
+        ) AS deltas
+        GROUP BY workspace_id, user_id, currency
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("member_balances")
@@ -0,0 +1,28 @@
+"""add case-insensitive category name index
+
+Revision ID: 0004_category_lower_name
+Revises: 0003_member_balances
+Create Date: 2025-03-08 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_category_lower_name"
+down_revision = "0003_member_balances"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_categories_workspace_type_lower_name",
+        "categories",
+        ["workspace_id", "type", sa.text("lower(name)")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_categories_workspace_type_lower_name", table_name="categories")
@@ -0,0 +1,27 @@
+"""add workspace reference-data version
+
+Revision ID: 0005_workspace_version
+Revises: 0004_category_lower_name
+Create Date: 2025-03-10 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_workspace_version"
+down_revision = "0004_category_lower_name"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "workspaces",
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("workspaces", "version")
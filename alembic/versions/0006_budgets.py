@@ -0,0 +1,80 @@
+"""add monthly category budgets and spend counters
+
+Revision ID: 0006_budgets
+Revises: 0005_workspace_version
+Create Date: 2025-03-15 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_budgets"
+down_revision = "0005_workspace_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "budgets",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            sa.BigInteger(),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "category_id",
+            sa.BigInteger(),
+            sa.ForeignKey("categories.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("limit_minor", sa.BigInteger(), nullable=False),
+        sa.Column("thresholds", sa.String(length=64), nullable=False, server_default="80,100"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint(
+            "workspace_id", "category_id", "currency", name="uq_budget_category"
+        ),
+    )
+    op.create_table(
+        "budget_counters",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            sa.BigInteger(),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "category_id",
+            sa.BigInteger(),
+            sa.ForeignKey("categories.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("period", sa.Date(), nullable=False),
+        sa.Column("spent_minor", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint(
+            "workspace_id", "category_id", "currency", "period", name="uq_budget_counter"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("budget_counters")
+    op.drop_table("budgets")
@@ -0,0 +1,70 @@
+"""add recurring expense rules
+
+Revision ID: 0007_recurring_rules
+Revises: 0006_budgets
+Create Date: 2025-03-22 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_recurring_rules"
+down_revision = "0006_budgets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recurring_rules",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            sa.BigInteger(),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "wallet_id",
+            sa.BigInteger(),
+            sa.ForeignKey("wallets.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "category_id",
+            sa.BigInteger(),
+            sa.ForeignKey("categories.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column(
+            "payer_id",
+            sa.BigInteger(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("amount_minor", sa.BigInteger(), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column(
+            "interval",
+            sa.Enum("daily", "weekly", "monthly", name="recurrence_interval", native_enum=False),
+            nullable=False,
+        ),
+        sa.Column("anchor_day", sa.Integer(), nullable=False),
+        sa.Column("next_run_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_recurring_rules_due", "recurring_rules", ["is_active", "next_run_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recurring_rules_due", table_name="recurring_rules")
+    op.drop_table("recurring_rules")
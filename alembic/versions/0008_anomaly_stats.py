@@ -0,0 +1,53 @@
+"""add anomaly detector statistics
+
+Revision ID: 0008_anomaly_stats
+Revises: 0007_recurring_rules
+Create Date: 2025-03-29 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_anomaly_stats"
+down_revision = "0007_recurring_rules"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "anomaly_stats",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            sa.BigInteger(),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "user_id",
+            sa.BigInteger(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("category_key", sa.BigInteger(), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("mean", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("m2", sa.Float(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint(
+            "workspace_id", "user_id", "category_key", "currency", name="uq_anomaly_stat"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("anomaly_stats")
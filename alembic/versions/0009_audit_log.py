@@ -0,0 +1,38 @@
+"""add append-only audit log
+
+Revision ID: 0009_audit_log
+Revises: 0008_anomaly_stats
+Create Date: 2025-04-05 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_audit_log"
+down_revision = "0008_anomaly_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_log",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("workspace_id", sa.BigInteger(), nullable=True),
+        sa.Column("actor_user_id", sa.BigInteger(), nullable=True),
+        sa.Column("action", sa.String(length=64), nullable=False),
+        sa.Column("entity", sa.String(length=32), nullable=False),
+        sa.Column("entity_id", sa.BigInteger(), nullable=True),
+        sa.Column("details", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_audit_log_workspace_created", "audit_log", ["workspace_id", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_log_workspace_created", table_name="audit_log")
+    op.drop_table("audit_log")
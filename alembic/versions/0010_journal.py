@@ -0,0 +1,68 @@
+"""add event journal and journal snapshots
+
+Revision ID: 0010_journal
+Revises: 0009_audit_log
+Create Date: 2025-04-12 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0010_journal"
+down_revision = "0009_audit_log"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "journal_events",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            sa.BigInteger(),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("type", sa.String(length=32), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_journal_events_workspace", "journal_events", ["workspace_id", "id"])
+    op.create_table(
+        "journal_snapshots",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            sa.BigInteger(),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("last_event_id", sa.BigInteger(), nullable=False),
+        sa.Column("state", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_journal_snapshots_workspace",
+        "journal_snapshots",
+        ["workspace_id", "last_event_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_journal_snapshots_workspace", table_name="journal_snapshots")
+    op.drop_table("journal_snapshots")
+    op.drop_index("ix_journal_events_workspace", table_name="journal_events")
+    op.drop_table("journal_events")
@@ -0,0 +1,78 @@
+"""add membership history and implicit default splits
+
+Revision ID: 0012_implicit_splits
+Revises: 0011_split_templates
+Create Date: 2025-04-26 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_implicit_splits"
+down_revision = "0011_split_templates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "workspaces",
+        sa.Column("membership_version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "workspaces",
+        sa.Column("implicit_splits", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.add_column("transactions", sa.Column("split_version", sa.BigInteger(), nullable=True))
+    op.create_table(
+        "membership_history",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            sa.BigInteger(),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "user_id",
+            sa.BigInteger(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("share_weight", sa.Integer(), nullable=False),
+        sa.Column("valid_from_version", sa.BigInteger(), nullable=False),
+        sa.Column("valid_to_version", sa.BigInteger(), nullable=True),
+        sa.Column("valid_from", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("valid_to", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_membership_history_workspace",
+        "membership_history",
+        ["workspace_id", "valid_from_version"],
+    )
+
+    # Existing members start their history at version 1 with their current weight.
+    op.execute(
+        """
+        INSERT INTO membership_history
+            (workspace_id, user_id, share_weight, valid_from_version, valid_from)
+        SELECT m.workspace_id, m.user_id, m.share_weight, 1, m.created_at
+        FROM memberships m
+        """
+    )
+    op.execute(
+        """
+        UPDATE workspaces SET membership_version = 1
+        WHERE EXISTS (SELECT 1 FROM memberships m WHERE m.workspace_id = workspaces.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_membership_history_workspace", table_name="membership_history")
+    op.drop_table("membership_history")
+    op.drop_column("transactions", "split_version")
+    op.drop_column("workspaces", "implicit_splits")
+    op.drop_column("workspaces", "membership_version")
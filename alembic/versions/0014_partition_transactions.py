@@ -0,0 +1,138 @@
+"""partition transactions and transaction splits by month (PostgreSQL)
+
+Revision ID: 0014_partition_transactions
+Revises: 0012_implicit_splits
+Create Date: 2025-05-10 00:00:00.000000
+"""
+
+import datetime as dt
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_partition_transactions"
+down_revision = "0012_implicit_splits"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+TRANSACTION_FOREIGN_KEYS = [
+    ("transactions_workspace_id_fkey", "workspace_id", "workspaces", "CASCADE"),
+    ("transactions_wallet_id_fkey", "wallet_id", "wallets", "RESTRICT"),
+    ("transactions_to_wallet_id_fkey", "to_wallet_id", "wallets", "RESTRICT"),
+    ("transactions_category_id_fkey", "category_id", "categories", "SET NULL"),
+    ("transactions_created_by_fkey", "created_by", "users", "SET NULL"),
+]
+TRANSACTION_INDEXES = [
+    ("ix_transactions_workspace_id", "workspace_id"),
+    ("ix_transactions_wallet_id", "wallet_id"),
+    ("ix_transactions_created_by", "created_by"),
+    ("ix_transactions_occurred_at", "occurred_at"),
+]
+SPLIT_INDEXES = [
+    ("ix_transaction_splits_transaction_id", "transaction_id"),
+    ("ix_transaction_splits_user_id", "user_id"),
+]
+
+
+def _next_month(month: dt.date) -> dt.date:
+    return dt.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _months(first: dt.date, last: dt.date) -> list[dt.date]:
+    months = []
+    month = dt.date(first.year, first.month, 1)
+    while month <= last:
+        months.append(month)
+        month = _next_month(month)
+    return months
+
+
+def _swap_table(table: str, partitioned: bool, months: list[dt.date]) -> None:
+    """Recreate ``table`` from a copy of itself, partitioned by month or plain."""
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    suffix = " PARTITION BY RANGE (occurred_at)" if partitioned else ""
+    op.execute(f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS){suffix}")
+    if partitioned:
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        for month in months:
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year:04d}m{month.month:02d} "
+                f"PARTITION OF {table} FOR VALUES FROM ('{month.isoformat()}') "
+                f"TO ('{_next_month(month).isoformat()}')"
+            )
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def _add_constraints(partitioned: bool) -> None:
+    # Unique keys of a partitioned table must include the partition key.
+    key = ", occurred_at" if partitioned else ""
+    op.execute(f"ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY (id{key})")
+    for name, column, target, on_delete in TRANSACTION_FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE transactions ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+            f"REFERENCES {target} (id) ON DELETE {on_delete}"
+        )
+    for name, column in TRANSACTION_INDEXES:
+        op.create_index(name, "transactions", [column])
+
+    op.execute(
+        "ALTER TABLE transaction_splits "
+        f"ADD CONSTRAINT transaction_splits_pkey PRIMARY KEY (id{key})"
+    )
+    op.execute(
+        "ALTER TABLE transaction_splits ADD CONSTRAINT uq_transaction_split "
+        f"UNIQUE (transaction_id, user_id{key})"
+    )
+    op.execute(
+        "ALTER TABLE transaction_splits ADD CONSTRAINT transaction_splits_transaction_id_fkey "
+        f"FOREIGN KEY (transaction_id{key}) REFERENCES transactions (id{key}) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE transaction_splits ADD CONSTRAINT transaction_splits_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE"
+    )
+    for name, column in SPLIT_INDEXES:
+        op.create_index(name, "transaction_splits", [column])
+
+
+def _rebuild(partitioned: bool) -> None:
+    bind = op.get_bind()
+    first = bind.execute(sa.text("SELECT min(occurred_at) FROM transactions")).scalar()
+    today = dt.datetime.now(dt.timezone.utc).date()
+    last = today
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    months = _months(first.date() if first is not None else today, last)
+
+    # Copies every row under an exclusive lock; run it in a maintenance window. Keys and
+    # indexes are added once the old tables (which still own their names) are dropped.
+    _swap_table("transactions", partitioned, months)
+    _swap_table("transaction_splits", partitioned, months)
+    op.execute("DROP TABLE transaction_splits_old")
+    op.execute("DROP TABLE transactions_old")
+    _add_constraints(partitioned)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "transaction_splits",
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE transaction_splits s SET occurred_at = t.occurred_at
+        FROM transactions t WHERE t.id = s.transaction_id
+        """
+    )
+    op.alter_column("transaction_splits", "occurred_at", nullable=False)
+    _rebuild(partitioned=True)
+
+
+def downgrade() -> None:
+    _rebuild(partitioned=False)
+    op.drop_column("transaction_splits", "occurred_at")
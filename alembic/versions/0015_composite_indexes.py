@@ -0,0 +1,42 @@
+"""composite indexes for report, budget and membership queries
+
+Revision ID: 0015_composite_indexes
+Revises: 0014_partition_transactions
+Create Date: 2025-05-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0015_composite_indexes"
+down_revision = "0014_partition_transactions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_transactions_workspace_type_occurred",
+        "transactions",
+        ["workspace_id", "type", "occurred_at"],
+        postgresql_include=["category_id", "currency", "amount_minor"],
+    )
+    op.create_index(
+        "ix_memberships_user_workspace",
+        "memberships",
+        ["user_id", "workspace_id"],
+    )
+    op.create_index("ix_users_lower_username", "users", [sa.text("lower(username)")])
+    # Both are leading prefixes of the composite indexes above.
+    op.drop_index("ix_transactions_workspace_id", table_name="transactions")
+    op.drop_index("ix_memberships_user_id", table_name="memberships")
+
+
+def downgrade() -> None:
+    op.create_index("ix_memberships_user_id", "memberships", ["user_id"])
+    op.create_index("ix_transactions_workspace_id", "transactions", ["workspace_id"])
+    op.drop_index("ix_users_lower_username", table_name="users")
+    op.drop_index("ix_memberships_user_workspace", table_name="memberships")
+    op.drop_index("ix_transactions_workspace_type_occurred", table_name="transactions")
@@ -0,0 +1,27 @@
+"""add workspace data version for Mini App ETags
+
+Revision ID: 0016_workspace_data_version
+Revises: 0015_composite_indexes
+Create Date: 2025-05-24 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0016_workspace_data_version"
+down_revision = "0015_composite_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "workspaces",
+        sa.Column("data_version", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("workspaces", "data_version")
@@ -0,0 +1,51 @@
+"""store anomaly statistics as additive sums
+
+Revision ID: 0017_anomaly_stat_sums
+Revises: 0016_workspace_data_version
+Create Date: 2025-05-31 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0017_anomaly_stat_sums"
+down_revision = "0016_workspace_data_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "anomaly_stats",
+        sa.Column("sum_log", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "anomaly_stats",
+        sa.Column("sum_log_sq", sa.Float(), nullable=False, server_default="0"),
+    )
+    # Welford (mean, m2) to plain sums: sum = n * mean, sum of squares = m2 + n * mean^2.
+    op.execute(
+        "UPDATE anomaly_stats SET sum_log = sample_count * mean, "
+        "sum_log_sq = m2 + sample_count * mean * mean"
+    )
+    op.drop_column("anomaly_stats", "mean")
+    op.drop_column("anomaly_stats", "m2")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "anomaly_stats",
+        sa.Column("mean", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "anomaly_stats",
+        sa.Column("m2", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        "UPDATE anomaly_stats SET mean = sum_log / sample_count, "
+        "m2 = sum_log_sq - sum_log * sum_log / sample_count WHERE sample_count > 0"
+    )
+    op.drop_column("anomaly_stats", "sum_log")
+    op.drop_column("anomaly_stats", "sum_log_sq")
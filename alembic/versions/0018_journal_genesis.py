@@ -0,0 +1,98 @@
+"""store a journal snapshot of every workspace's current state
+
+Revision ID: 0018_journal_genesis
+Revises: 0017_anomaly_stat_sums
+Create Date: 2025-06-07 00:00:00.000000
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0018_journal_genesis"
+down_revision = "0017_anomaly_stat_sums"
+branch_labels = None
+depends_on = None
+
+
+def _add(totals: dict, key: str, amount_minor: int) -> None:
+    totals[key] = totals.get(key, 0) + amount_minor
+
+
+def upgrade() -> None:
+    # Replays now start from a snapshot. Workspaces created before 0010_journal have history
+    # the journal never saw, so every workspace gets a snapshot of its current state, built
+    # from the same tables the journal mirrors, as of its latest journal event. Earlier
+    # snapshots are replaced. Run it with the writers stopped, like the other data
+    # migrations, so no event lands between the two reads.
+    bind = op.get_bind()
+    states: dict[int, dict] = {
+        workspace_id: {
+            "last_event_id": last_event_id or 0,
+            "balances": {},
+            "expenses": {},
+            "income": {},
+            "weights": {},
+        }
+        for workspace_id, last_event_id in bind.execute(
+            sa.text(
+                "SELECT w.id, (SELECT max(e.id) FROM journal_events e "
+                "WHERE e.workspace_id = w.id) FROM workspaces w"
+            )
+        )
+    }
+
+    for workspace_id, user_id, currency, balance_minor in bind.execute(
+        sa.text("SELECT workspace_id, user_id, currency, balance_minor FROM member_balances")
+    ):
+        balances = states[workspace_id]["balances"].setdefault(currency, {})
+        balances[str(user_id)] = balance_minor
+
+    for workspace_id, user_id, share_weight in bind.execute(
+        sa.text("SELECT workspace_id, user_id, share_weight FROM memberships")
+    ):
+        states[workspace_id]["weights"][str(user_id)] = share_weight
+
+    # Journal months are UTC calendar months of occurred_at.
+    if bind.dialect.name == "postgresql":
+        month = "to_char(occurred_at AT TIME ZONE 'UTC', 'YYYY-MM')"
+    else:
+        month = "strftime('%Y-%m', occurred_at)"
+    totals = bind.execute(
+        sa.text(
+            f"SELECT workspace_id, type, {month} AS month, currency, category_id, "
+            "sum(amount_minor) FROM transactions WHERE type IN ('expense', 'income') "
+            "GROUP BY workspace_id, type, month, currency, category_id"
+        )
+    )
+    for workspace_id, tx_type, tx_month, currency, category_id, amount_minor in totals:
+        kind = "expenses" if tx_type == "expense" else "income"
+        months = states[workspace_id][kind].setdefault(tx_month, {})
+        _add(months.setdefault(currency, {}), str(category_id or 0), amount_minor)
+
+    op.execute("DELETE FROM journal_snapshots")
+    if states:
+        op.bulk_insert(
+            sa.table(
+                "journal_snapshots",
+                sa.column("workspace_id", sa.BigInteger()),
+                sa.column("last_event_id", sa.BigInteger()),
+                sa.column("state", sa.Text()),
+            ),
+            [
+                {
+                    "workspace_id": workspace_id,
+                    "last_event_id": state["last_event_id"],
+                    "state": json.dumps(state, separators=(",", ":")),
+                }
+                for workspace_id, state in states.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    # The snapshots are valid for the previous code as well.
+    pass
@@ -2,13 +2,14 @@ from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.serialization import FastJSONRoute
 from app.core.security import create_access_token
 from app.db.models import User
 from app.db.session import get_db
 from app.webapp_auth import WebAppAuthError, extract_user, validate_init_data
 from app.core.config import get_settings
 
-router = APIRouter(prefix='/auth', tags=['auth'])
+router = APIRouter(prefix='/auth', tags=['auth'], route_class=FastJSONRoute)
 
 
 @router.post('/telegram-miniapp')
@@ -2,12 +2,13 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.serialization import FastJSONRoute
 from app.core.security import create_access_token
 from app.db.models import User
 from app.db.session import get_db
 from app.schemas.api import AuthResponse, RegisterUserRequest
 
-router = APIRouter(prefix='/users', tags=['users'])
+router = APIRouter(prefix='/users', tags=['users'], route_class=FastJSONRoute)
 
 
 @router.post('/register', response_model=AuthResponse)
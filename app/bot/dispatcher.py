@@ -1,12 +1,18 @@
 from aiogram import Bot, Dispatcher
 
 from app.handlers import (
+    budgets_router,
     categories_router,
+    fx_router,
+    recurring_router,
     reports_router,
+    splits_router,
     start_router,
     transactions_router,
+    transfers_router,
     webapp_router,
     wallets_router,
+    weights_router,
     workspaces_router,
 )
 
@@ -18,7 +24,13 @@ def build_dispatcher() -> Dispatcher:
     dp.include_router(wallets_router)
     dp.include_router(categories_router)
     dp.include_router(transactions_router)
+    dp.include_router(transfers_router)
     dp.include_router(reports_router)
+    dp.include_router(fx_router)
+    dp.include_router(budgets_router)
+    dp.include_router(recurring_router)
+    dp.include_router(weights_router)
+    dp.include_router(splits_router)
     dp.include_router(webapp_router)
     return dp
 
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+
+from app.services.notifications import Alert, AlertHandler
+
+logger = logging.getLogger(__name__)
+
+
+def alert_sender(bot: Bot) -> AlertHandler:
+    """Deliver alerts as direct messages to their recipients."""
+
+    async def send(alerts: Sequence[Alert]) -> None:
+        for alert in alerts:
+            text = alert.message()
+            for chat_id in alert.recipients:
+                try:
+                    await bot.send_message(chat_id, text)
+                except TelegramAPIError as exc:
+                    logger.warning("Alert to %s failed: %s", chat_id, exc)
+
+    return send
@@ -1,37 +1,75 @@
 from __future__ import annotations
 
-from aiogram.types import Update
-from fastapi import FastAPI, Header, HTTPException
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-from app.bot import build_dispatcher, create_bot
+from fastapi import FastAPI, Header, HTTPException, Request
+
+from app.api.serialization import FastJSONResponse, FastJSONRoute
 from app.core.config import get_settings
+from app.db.invalidation import bus as invalidation_bus
+from app.db.partitions import partition_maintainer
+from app.db.session import async_session_factory, dispose_engine, get_engine
+from app.services.anomalies import anomaly_detector
+from app.services.audit import audit_writer
+from app.services.notifications import alert_notifier
+from app.services.recurring import RecurringScheduler
 
 settings = get_settings()
-bot = create_bot(settings.bot_token)
-dp = build_dispatcher()
 
-app = FastAPI(title="Prospera Telegram Bot")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # aiogram and the handler modules load here, not when uvicorn imports this module.
+    from app.bot.dispatcher import build_dispatcher, create_bot
+    from app.bot.notifications import alert_sender
+
+    bot = create_bot(settings.bot_token)
+    app.state.bot = bot
+    app.state.dp = build_dispatcher()
+    send_alerts = alert_sender(bot)
+    recurring_scheduler = RecurringScheduler(async_session_factory)
+
+    await invalidation_bus.start(get_engine().url)
+    alert_notifier.subscribe(send_alerts)
+    alert_notifier.start()
+    recurring_scheduler.start()
+    partition_maintainer.start(async_session_factory)
+    anomaly_detector.start(async_session_factory)
+    audit_writer.start(async_session_factory)
+    base_url = (settings.bot_webhook_url or "http://localhost:8001").rstrip("/")
+    webhook_url = f"{base_url}{settings.bot_webhook_path}"
+    await bot.set_webhook(webhook_url, secret_token=settings.bot_webhook_secret)
+    try:
+        yield
+    finally:
+        await recurring_scheduler.stop()
+        await partition_maintainer.stop()
+        await anomaly_detector.stop(async_session_factory)
+        await audit_writer.stop(async_session_factory)
+        await alert_notifier.stop()
+        alert_notifier.unsubscribe(send_alerts)
+        await bot.delete_webhook(drop_pending_updates=False)
+        await bot.session.close()
+        await invalidation_bus.stop()
+        await dispose_engine()
+
+
+app = FastAPI(
+    title="Prospera Telegram Bot",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+app.router.route_class = FastJSONRoute
 
 
 @app.post(settings.bot_webhook_path)
 async def telegram_webhook(
+    request: Request,
     update: dict,
     x_telegram_bot_api_secret_token: str | None = Header(default=None),
 ):
     if x_telegram_bot_api_secret_token != settings.bot_webhook_secret:
         raise HTTPException(status_code=401, detail="Invalid webhook secret")
-    await dp.feed_update(bot, Update.model_validate(update))
+    await request.app.state.dp.feed_raw_update(request.app.state.bot, update)
     return {"ok": True}
-
-
-@app.on_event("startup")
-async def startup_event():
-    base_url = (settings.bot_webhook_url or "http://localhost:8001").rstrip("/")
-    webhook_url = f"{base_url}{settings.bot_webhook_path}"
-    await bot.set_webhook(webhook_url, secret_token=settings.bot_webhook_secret)
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    await bot.delete_webhook(drop_pending_updates=False)
-    await bot.session.close()
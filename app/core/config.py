@@ -1,5 +1,9 @@
 from functools import lru_cache
+from typing import Any
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.engine import make_url
 
 
 class Settings(BaseSettings):
@@ -8,8 +12,14 @@ class Settings(BaseSettings):
     app_name: str = 'prospera-wallet'
     environment: str = 'dev'
     api_prefix: str = '/api/v1'
+    log_level: str = 'INFO'
 
     database_url: str
+    db_pool_size: int = Field(default=5, ge=1)
+    db_max_overflow: int = Field(default=10, ge=0)
+    db_pool_timeout: float = Field(default=30.0, gt=0)
+    db_pool_recycle: int = 1800
+
     jwt_secret: str
     jwt_algorithm: str = 'HS256'
     jwt_exp_minutes: int = 120
@@ -19,10 +29,43 @@ class Settings(BaseSettings):
     bot_webhook_path: str = '/telegram/webhook'
     bot_webhook_url: str | None = None
 
+    webapp_url: str = ''
+    webapp_host: str = '0.0.0.0'
+    webapp_port: int = 8080
+    webapp_workers: int = Field(default=1, ge=1)
+    webapp_shutdown_timeout: float = Field(default=30.0, gt=0)
+    # Worker i serves its metrics on 127.0.0.1:<port + i>; 0 disables them.
+    webapp_metrics_port: int = 0
+
     rate_limit_per_minute: int = 120
     allow_negative_balances: bool = False
 
+    def engine_options(self, workers: int = 1) -> dict[str, Any]:
+        """Keyword arguments for create_async_engine; SQLite keeps its default pool.
+
+        ``workers`` processes split the configured pool, so together they stay within it.
+        """
+        options: dict[str, Any] = {'pool_pre_ping': True}
+        if make_url(self.database_url).get_backend_name() != 'sqlite':
+            options.update(
+                pool_size=max(1, self.db_pool_size // workers),
+                max_overflow=self.db_max_overflow // workers,
+                pool_timeout=self.db_pool_timeout,
+                pool_recycle=self.db_pool_recycle,
+            )
+        return options
+
 
 @lru_cache
 def get_settings() -> Settings:
+    """The process-wide settings; the environment and .env are read once."""
     return Settings()
+
+
+def reload_settings() -> Settings:
+    """Re-read the environment and .env for later get_settings() calls.
+
+    Objects built from the old settings, such as the database engine, keep them.
+    """
+    get_settings.cache_clear()
+    return get_settings()
@@ -0,0 +1,99 @@
+"""JSON encoding and decoding shared by the API, the bot webhook and the Mini App.
+
+The first importable backend of orjson, msgspec and the stdlib ``json`` module is used.
+Every backend writes compact UTF-8 bytes and encodes Decimal as a string. Every
+backend raises ``json.JSONDecodeError`` on malformed input.
+"""
+import datetime as dt
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+
+@dataclass(frozen=True)
+class Backend:
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes | str], Any]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _orjson() -> Backend:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default)
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+    return Backend('orjson', dumps, orjson.loads)
+
+
+def _msgspec() -> Backend:
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: bytes | str) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            text = data if isinstance(data, str) else data.decode('utf-8', 'replace')
+            raise json.JSONDecodeError(str(exc), text, 0) from exc
+
+    return Backend('msgspec', encoder.encode, loads)
+
+
+def _stdlib() -> Backend:
+    def dumps(value: Any) -> bytes:
+        return json.dumps(
+            value, default=_default, ensure_ascii=False, separators=(',', ':')
+        ).encode()
+
+    return Backend('json', dumps, json.loads)
+
+
+_LOADERS = {'orjson': _orjson, 'msgspec': _msgspec, 'json': _stdlib}
+
+
+def load_backend(name: str) -> Backend:
+    """Build the named backend; raises ImportError when its package is missing."""
+    return _LOADERS[name]()
+
+
+def select_backend(names: tuple[str, ...] = BACKENDS) -> Backend:
+    for name in names:
+        try:
+            return load_backend(name)
+        except ImportError:
+            continue
+    return _stdlib()
+
+
+backend = select_backend()
+
+
+def use_backend(name: str) -> Backend:
+    """Switch the process to ``name`` (for benchmarks and tests)."""
+    global backend
+    backend = load_backend(name)
+    return backend
+
+
+def dumps(value: Any) -> bytes:
+    return backend.dumps(value)
+
+
+def loads(data: bytes | str) -> Any:
+    return backend.loads(data)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_insert(session: AsyncSession, table: Any) -> Any:
+    """Return the dialect-specific INSERT that supports ``on_conflict_do_update``."""
+    dialect = session.get_bind().dialect.name
+    try:
+        return _INSERTS[dialect](table)
+    except KeyError as exc:
+        raise RuntimeError(f"Upserts are not supported on {dialect}") from exc
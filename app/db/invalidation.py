@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "prospera_invalidation"
+_PENDING_KEY = "invalidation_events"
+
+Handler = Callable[["InvalidationEvent"], None]
+Connect = Callable[[str], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    entity: str
+    id: int
+    version: int
+    published_at: float
+    origin: str = ""
+
+    def encode(self) -> str:
+        return f"{self.entity}:{self.id}:{self.version}:{self.published_at:.6f}:{self.origin}"
+
+    @classmethod
+    def decode(cls, payload: str) -> InvalidationEvent:
+        try:
+            entity, entity_id, version, published_at, origin = payload.split(":", 4)
+            return cls(entity, int(entity_id), int(version), float(published_at), origin)
+        except ValueError as exc:
+            raise ValueError(f"Malformed invalidation payload: {payload!r}") from exc
+
+
+@dataclass
+class BusStats:
+    published: int = 0
+    received: int = 0
+    malformed: int = 0
+    reconnects: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+
+    def record_lag(self, lag: float) -> None:
+        self.received += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.total_lag += lag
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.received if self.received else 0.0
+
+
+class InvalidationBus:
+    """Fan out ``(entity, id, version)`` cache invalidations to every process.
+
+    Events published inside a session are delivered to local subscribers when that
+    transaction commits and are dropped on rollback. When started against PostgreSQL
+    they also travel as NOTIFY on ``CHANNEL`` (which is transactional as well) and a
+    dedicated LISTEN connection delivers other processes' events. After a reconnect
+    every subscriber is reset, since events may have been missed while disconnected.
+    """
+
+    def __init__(
+        self,
+        connect: Connect | None = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        self.stats = BusStats()
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+        self._reset_handlers: list[Callable[[], None]] = []
+        self._connect = connect or asyncpg.connect
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._task: asyncio.Task | None = None
+        self._connection: Any = None
+        self.connected = asyncio.Event()
+
+    def subscribe(
+        self,
+        entity: str,
+        handler: Handler,
+        on_reset: Callable[[], None] | None = None,
+    ) -> None:
+        self._handlers[entity].append(handler)
+        if on_reset is not None:
+            self._reset_handlers.append(on_reset)
+
+    async def publish(
+        self,
+        session: AsyncSession,
+        entity: str,
+        entity_id: int,
+        version: int,
+    ) -> None:
+        """Queue an event on the session's transaction; the caller commits."""
+        published = InvalidationEvent(entity, entity_id, version, time.time(), self.origin)
+        if session.get_bind().dialect.name == "postgresql":
+            await session.execute(select(func.pg_notify(CHANNEL, published.encode())))
+        pending = session.info.get(_PENDING_KEY)
+        if pending is None:
+            pending = session.info[_PENDING_KEY] = []
+            sync_session = session.sync_session
+            event.listen(sync_session, "after_commit", self._after_commit)
+            event.listen(sync_session, "after_soft_rollback", self._after_rollback)
+        pending.append(published)
+        self.stats.published += 1
+
+    def is_pending(self, session: AsyncSession, entity: str, entity_id: int) -> bool:
+        """Whether the session's open transaction has published for this entity."""
+        return any(
+            queued.entity == entity and queued.id == entity_id
+            for queued in session.info.get(_PENDING_KEY, ())
+        )
+
+    def _after_commit(self, sync_session: Any) -> None:
+        pending, sync_session.info[_PENDING_KEY] = sync_session.info[_PENDING_KEY], []
+        for published in pending:
+            self._deliver(published)
+
+    def _after_rollback(self, sync_session: Any, previous_transaction: Any) -> None:
+        sync_session.info[_PENDING_KEY] = []
+
+    def _deliver(self, published: InvalidationEvent) -> None:
+        for handler in self._handlers.get(published.entity, ()):
+            try:
+                handler(published)
+            except Exception:
+                logger.exception("Invalidation handler failed for %s", published.entity)
+
+    def dispatch(self, payload: str) -> None:
+        """Handle a NOTIFY payload from any process, skipping our own echoes."""
+        try:
+            received = InvalidationEvent.decode(payload)
+        except ValueError:
+            self.stats.malformed += 1
+            logger.warning("Ignoring malformed invalidation payload %r", payload)
+            return
+        if received.origin == self.origin:
+            return
+        self.stats.record_lag(max(0.0, time.time() - received.published_at))
+        self._deliver(received)
+
+    def reset(self) -> None:
+        for on_reset in self._reset_handlers:
+            on_reset()
+
+    async def start(self, database_url: str | URL) -> None:
+        """Listen for other processes' events; a no-op outside PostgreSQL."""
+        url = make_url(database_url)
+        if url.get_backend_name() != "postgresql" or self._task is not None:
+            return
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._task = asyncio.create_task(self._listen(dsn))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _listen(self, dsn: str) -> None:
+        delay = self._reconnect_delay
+        first = True
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._connection = await self._connect(dsn)
+                self._connection.add_termination_listener(lambda _conn: lost.set())
+                await self._connection.add_listener(
+                    CHANNEL, lambda _conn, _pid, _channel, payload: self.dispatch(payload)
+                )
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("Invalidation listener connect failed: %s", exc)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_reconnect_delay)
+                continue
+
+            if not first:
+                self.stats.reconnects += 1
+            first = False
+            delay = self._reconnect_delay
+            # Anything cached before LISTEN took effect may already be stale.
+            self.reset()
+            self.connected.set()
+            try:
+                await lost.wait()
+                logger.warning("Invalidation listener connection lost; reconnecting")
+            finally:
+                self.connected.clear()
+                connection, self._connection = self._connection, None
+                if not connection.is_closed():
+                    await connection.close()
+
+
+bus = InvalidationBus()
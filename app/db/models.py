@@ -10,18 +10,30 @@ from sqlalchemy import (
     Date,
     DateTime,
     Enum as SQLEnum,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     UniqueConstraint,
+    false,
     func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
+# SQLite only auto-increments INTEGER PRIMARY KEY columns; keep BIGINT elsewhere.
+BigIntegerPK = BigInteger().with_variant(Integer, "sqlite")
+
+
+class RecurrenceInterval(str, Enum):
+    daily = "daily"
+    weekly = "weekly"
+    monthly = "monthly"
+
 
 class MembershipRole(str, Enum):
     owner = "owner"
@@ -47,7 +59,7 @@ class CategoryType(str, Enum):
 class User(Base):
     __tablename__ = "users"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
     tg_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True, nullable=False)
     first_name: Mapped[str | None] = mapped_column(String(100))
     last_name: Mapped[str | None] = mapped_column(String(100))
@@ -74,12 +86,45 @@ class User(Base):
     )
 
 
+# Case-insensitive @username lookups when resolving members.
+Index("ix_users_lower_username", func.lower(User.username))
+
+
 class Workspace(Base):
     __tablename__ = "workspaces"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
     base_currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    # Bumped with every wallet, category or membership change; keys reference-data caches.
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    # Advanced by every join or share-weight change; intervals in membership_history use it.
+    membership_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    # Bumped by every write a Mini App read can observe (ledger, reference data, FX rates,
+    # a member switching away); strong ETags of those reads are built from it.
+    data_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    # Default-split expenses store a membership version instead of one split row per member.
+    implicit_splits: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=false(),
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -111,13 +156,23 @@ class Workspace(Base):
         back_populates="workspace",
         cascade="all, delete-orphan",
     )
+    budgets: Mapped[list["Budget"]] = relationship(
+        "Budget",
+        back_populates="workspace",
+        cascade="all, delete-orphan",
+    )
+    member_balances: Mapped[list["MemberBalance"]] = relationship(
+        "MemberBalance",
+        back_populates="workspace",
+        cascade="all, delete-orphan",
+    )
 
 
 class Membership(Base):
     __tablename__ = "memberships"
     __table_args__ = (UniqueConstraint("workspace_id", "user_id", name="uq_membership"),)
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
     workspace_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("workspaces.id", ondelete="CASCADE"),
@@ -152,7 +207,7 @@ class Wallet(Base):
     __tablename__ = "wallets"
     __table_args__ = (UniqueConstraint("workspace_id", "name", name="uq_wallet_name"),)
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
     workspace_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("workspaces.id", ondelete="CASCADE"),
@@ -186,7 +241,7 @@ class Category(Base):
         UniqueConstraint("workspace_id", "name", "type", name="uq_category_name"),
     )
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
     workspace_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("workspaces.id", ondelete="CASCADE"),
@@ -216,10 +271,25 @@ class Category(Base):
     )
 
 
+# Case-insensitive lookups on a category-cache miss.
+Index(
+    "ix_categories_workspace_type_lower_name",
+    Category.workspace_id,
+    Category.type,
+    func.lower(Category.name),
+)
+
+
+# Members look up their own workspaces (uq_membership covers workspace_id, user_id).
+Index("ix_memberships_user_workspace", Membership.user_id, Membership.workspace_id)
+
+
+# On PostgreSQL, transactions and transaction_splits are partitioned by month of
+# occurred_at (see migration 0014 and app/db/partitions.py).
 class Transaction(Base):
     __tablename__ = "transactions"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
     workspace_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("workspaces.id", ondelete="CASCADE"),
@@ -257,6 +327,9 @@ class Transaction(Base):
         server_default=func.now(),
         nullable=False,
     )
+    # Set when the expense follows the default weighted split of this membership version
+    # and has no split rows of its own.
+    split_version: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     workspace: Mapped["Workspace"] = relationship("Workspace", back_populates="transactions")
     wallet: Mapped["Wallet"] = relationship("Wallet", foreign_keys=[wallet_id])
@@ -270,13 +343,24 @@ class Transaction(Base):
     )
 
 
+# Monthly reports, budget sums and balance rebuilds filter on all three columns; on
+# PostgreSQL the included columns let reports and budget sums skip the heap.
+Index(
+    "ix_transactions_workspace_type_occurred",
+    Transaction.workspace_id,
+    Transaction.type,
+    Transaction.occurred_at,
+    postgresql_include=["category_id", "currency", "amount_minor"],
+)
+
+
 class TransactionSplit(Base):
     __tablename__ = "transaction_splits"
     __table_args__ = (
         UniqueConstraint("transaction_id", "user_id", name="uq_transaction_split"),
     )
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
     transaction_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("transactions.id", ondelete="CASCADE"),
@@ -288,6 +372,8 @@ class TransactionSplit(Base):
         nullable=False,
     )
     amount_minor: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Copy of the transaction's occurred_at: the monthly partition key on PostgreSQL.
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -304,7 +390,7 @@ class FxRate(Base):
         UniqueConstraint("workspace_id", "rate_date", "quote_currency", name="uq_fx_rate"),
     )
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
     workspace_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("workspaces.id", ondelete="CASCADE"),
@@ -320,3 +406,292 @@ class FxRate(Base):
     )
 
     workspace: Mapped["Workspace"] = relationship("Workspace", back_populates="fx_rates")
+
+
+# Running net position per member and currency (positive = is owed money), updated in
+# the same transaction as every expense or settlement so reads never scan history.
+class MemberBalance(Base):
+    __tablename__ = "member_balances"
+    __table_args__ = (
+        UniqueConstraint("workspace_id", "user_id", "currency", name="uq_member_balance"),
+    )
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    balance_minor: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    workspace: Mapped["Workspace"] = relationship("Workspace", back_populates="member_balances")
+
+
+class Budget(Base):
+    __tablename__ = "budgets"
+    __table_args__ = (
+        UniqueConstraint("workspace_id", "category_id", "currency", name="uq_budget_category"),
+    )
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    category_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("categories.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    limit_minor: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Comma-separated percentages of the limit, e.g. "80,100".
+    thresholds: Mapped[str] = mapped_column(String(64), nullable=False, default="80,100")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    workspace: Mapped["Workspace"] = relationship("Workspace", back_populates="budgets")
+
+
+# Month-to-date spend per budgeted category, maintained in the expense transaction.
+class BudgetCounter(Base):
+    __tablename__ = "budget_counters"
+    __table_args__ = (
+        UniqueConstraint(
+            "workspace_id", "category_id", "currency", "period", name="uq_budget_counter"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    category_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("categories.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    period: Mapped[date] = mapped_column(Date, nullable=False)
+    spent_minor: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class RecurringRule(Base):
+    __tablename__ = "recurring_rules"
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    wallet_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("wallets.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    category_id: Mapped[int | None] = mapped_column(
+        BigInteger,
+        ForeignKey("categories.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    payer_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    amount_minor: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    note: Mapped[str | None] = mapped_column(Text, nullable=True)
+    interval: Mapped[RecurrenceInterval] = mapped_column(
+        SQLEnum(RecurrenceInterval, name="recurrence_interval", native_enum=False),
+        nullable=False,
+    )
+    # Day of month the rule was anchored to, so monthly runs return to it after short months.
+    anchor_day: Mapped[int] = mapped_column(Integer, nullable=False)
+    next_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+# The scheduler scans active rules by due time.
+Index("ix_recurring_rules_due", RecurringRule.is_active, RecurringRule.next_run_at)
+
+
+class AnomalyStat(Base):
+    __tablename__ = "anomaly_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "workspace_id", "user_id", "category_key", "currency", name="uq_anomaly_stat"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Category id, or 0 for uncategorized expenses (no foreign key, so it can be 0).
+    category_key: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Sums over log(amount_minor); every process adds its own samples to them.
+    sum_log: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sum_log_sq: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class AuditLog(Base):
+    __tablename__ = "audit_log"
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    # No foreign keys: entries outlive the rows they describe and are never updated.
+    workspace_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    actor_user_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    action: Mapped[str] = mapped_column(String(64), nullable=False)
+    entity: Mapped[str] = mapped_column(String(32), nullable=False)
+    entity_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    details: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # When the operation happened; rows are written later in batches.
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+Index("ix_audit_log_workspace_created", AuditLog.workspace_id, AuditLog.created_at)
+
+
+class JournalEvent(Base):
+    __tablename__ = "journal_events"
+
+    # Global sequence; replay order within a workspace follows it.
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    type: Mapped[str] = mapped_column(String(32), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+Index("ix_journal_events_workspace", JournalEvent.workspace_id, JournalEvent.id)
+
+
+class JournalSnapshot(Base):
+    __tablename__ = "journal_snapshots"
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # State after applying every event of the workspace with id <= last_event_id.
+    last_event_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    state: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+Index(
+    "ix_journal_snapshots_workspace",
+    JournalSnapshot.workspace_id,
+    JournalSnapshot.last_event_id,
+)
+
+
+class SplitTemplate(Base):
+    __tablename__ = "split_templates"
+    __table_args__ = (UniqueConstraint("workspace_id", "name", name="uq_split_template_name"),)
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Stored lowercased; templates are matched case-insensitively.
+    name: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Comma-separated user_id:weight pairs, e.g. "3:2,5:1".
+    weights: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+class MembershipHistory(Base):
+    __tablename__ = "membership_history"
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    share_weight: Mapped[int] = mapped_column(Integer, nullable=False)
+    # The weight applies to membership versions in [valid_from_version, valid_to_version).
+    valid_from_version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # NULL while the interval is open (the member's current weight).
+    valid_to_version: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    valid_from: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    valid_to: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+Index(
+    "ix_membership_history_workspace",
+    MembershipHistory.workspace_id,
+    MembershipHistory.valid_from_version,
+)
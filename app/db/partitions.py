@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Parents partitioned by month of occurred_at on PostgreSQL (migration 0014).
+PARTITIONED_TABLES = ("transactions", "transaction_splits")
+MONTHS_AHEAD = 3
+CHECK_INTERVAL_SECONDS = 24 * 3600.0
+
+
+def month_start(moment: dt.date) -> dt.date:
+    return dt.date(moment.year, moment.month, 1)
+
+
+def next_month(month: dt.date) -> dt.date:
+    return dt.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(table: str, month: dt.date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_ddl(table: str, month: dt.date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    )
+
+
+async def partitioned_tables(session: AsyncSession) -> list[str]:
+    """The tables in PARTITIONED_TABLES that are partitioned here (none off PostgreSQL)."""
+    if session.get_bind().dialect.name != "postgresql":
+        return []
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = ANY(:names) AND pg_table_is_visible(c.oid)"
+        ),
+        {"names": list(PARTITIONED_TABLES)},
+    )
+    return [name for name in PARTITIONED_TABLES if name in set(result.scalars())]
+
+
+async def ensure_partitions(
+    session: AsyncSession,
+    today: dt.date | None = None,
+    months_ahead: int = MONTHS_AHEAD,
+) -> list[str]:
+    """Create the monthly partitions from this month through ``months_ahead``; the caller commits.
+
+    Returns the partitions that exist afterwards. Rows outside every month land in the
+    default partition; a month that already has rows there is logged and skipped.
+    """
+    tables = await partitioned_tables(session)
+    if not tables:
+        return []
+    month = month_start(today or dt.datetime.now(dt.timezone.utc).date())
+    names = []
+    for _ in range(months_ahead + 1):
+        for table in tables:
+            try:
+                async with session.begin_nested():
+                    await session.execute(text(partition_ddl(table, month)))
+            except DBAPIError:
+                logger.exception("Could not create partition %s", partition_name(table, month))
+                continue
+            names.append(partition_name(table, month))
+        month = next_month(month)
+    return names
+
+
+class PartitionMaintainer:
+    """Keeps future monthly partitions in place; checks at start and then daily."""
+
+    def __init__(self, interval: float = CHECK_INTERVAL_SECONDS) -> None:
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self, session_factory: async_sessionmaker) -> list[str]:
+        async with session_factory() as session:
+            names = await ensure_partitions(session)
+            await session.commit()
+        return names
+
+    async def _run(self, session_factory: async_sessionmaker) -> None:
+        while True:
+            try:
+                await self.run_once(session_factory)
+            except Exception:
+                logger.exception("Partition maintenance failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self, session_factory: async_sessionmaker) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+partition_maintainer = PartitionMaintainer()
@@ -1,12 +1,54 @@
+from __future__ import annotations
+
 from collections.abc import AsyncGenerator
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from app.core.config import get_settings
 
-settings = get_settings()
-engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+_engine: AsyncEngine | None = None
+
+
+def init_engine(workers: int = 1) -> AsyncEngine:
+    """Create this process's engine with a 1/``workers`` share of the configured pool.
+
+    A no-op once the engine exists.
+    """
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        _engine = create_async_engine(settings.database_url, **settings.engine_options(workers))
+    return _engine
+
+
+def get_engine() -> AsyncEngine:
+    """The process-wide engine, created from the settings on first use."""
+    if _engine is None:
+        return init_engine()
+    return _engine
+
+
+async def dispose_engine() -> None:
+    if _engine is not None:
+        await _engine.dispose()
+
+
+class LazySessionMaker(async_sessionmaker[AsyncSession]):
+    """Binds to get_engine() when the first session is opened rather than at import."""
+
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionMaker(expire_on_commit=False, class_=AsyncSession)
 # Backwards/for webapp import compatibility
 async_session_factory = SessionLocal
 
@@ -1,17 +1,29 @@
+from app.handlers.budgets import router as budgets_router
 from app.handlers.categories import router as categories_router
+from app.handlers.fx import router as fx_router
+from app.handlers.recurring import router as recurring_router
 from app.handlers.reports import router as reports_router
+from app.handlers.splits import router as splits_router
 from app.handlers.start import router as start_router
 from app.handlers.transactions import router as transactions_router
+from app.handlers.transfers import router as transfers_router
 from app.handlers.webapp import router as webapp_router
 from app.handlers.wallets import router as wallets_router
+from app.handlers.weights import router as weights_router
 from app.handlers.workspaces import router as workspaces_router
 
 __all__ = [
+    "budgets_router",
     "categories_router",
+    "fx_router",
+    "recurring_router",
     "reports_router",
+    "splits_router",
     "start_router",
     "transactions_router",
+    "transfers_router",
     "webapp_router",
     "wallets_router",
+    "weights_router",
     "workspaces_router",
 ]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from app.db.session import async_session_factory
+from app.handlers.utils import get_args, parse_amount_currency
+from app.services.budgets import (
+    DEFAULT_THRESHOLDS,
+    format_budget_report,
+    format_thresholds,
+    list_budget_status,
+    parse_thresholds,
+    set_budget,
+)
+from app.services.categories import get_or_create_category
+from app.services.users import ensure_user
+from app.services.utils import format_minor
+from app.services.workspaces import get_active_workspace
+
+router = Router()
+
+
+@router.message(Command("budget"))
+async def budget_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) < 2:
+        await message.answer("Usage: /budget <category> <amount> [CUR] [thresholds, e.g. 80,100]")
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+
+        try:
+            amount_minor, currency, idx = parse_amount_currency(
+                args[1:], workspace.base_currency
+            )
+            rest = args[1 + idx :]
+            thresholds = parse_thresholds(rest[0]) if rest else DEFAULT_THRESHOLDS
+        except ValueError as exc:
+            await message.answer(f"{exc}. Example: /budget cafe 200 80,100")
+            return
+
+        category = await get_or_create_category(session, workspace, args[0], "expense")
+        await set_budget(session, workspace, category.id, currency, amount_minor, thresholds)
+
+    await message.answer(
+        f"Budget set: {category.name} {format_minor(amount_minor, currency)} per month, "
+        f"alerts at {format_thresholds(thresholds)}%."
+    )
+
+
+@router.message(Command("budgets"))
+async def budgets_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+        statuses = await list_budget_status(session, workspace)
+
+    if not statuses:
+        await message.answer("No budgets yet. Use /budget <category> <amount>.")
+        return
+    await message.answer(format_budget_report(statuses))
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from app.db.session import async_session_factory
+from app.handlers.utils import get_args
+from app.services.fx import format_rate, latest_rates, parse_rate, set_rate
+from app.services.users import ensure_user
+from app.services.utils import normalize_currency
+from app.services.workspaces import get_active_workspace
+
+router = Router()
+
+
+@router.message(Command("fx"))
+async def fx_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) == 1 or len(args) > 3:
+        await message.answer("Usage: /fx <CUR> <rate_to_base> [YYYY-MM-DD]")
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+
+        if not args:
+            rates = await latest_rates(session, workspace)
+            if not rates:
+                await message.answer(
+                    "No FX rates yet. Example: /fx EUR 1.08 sets 1 EUR = 1.08 "
+                    f"{workspace.base_currency}."
+                )
+                return
+            lines = [f"FX rates to {workspace.base_currency}:"]
+            for currency, (rate_date, rate) in rates.items():
+                lines.append(f"- 1 {currency} = {format_rate(rate)} ({rate_date.isoformat()})")
+            await message.answer("\n".join(lines))
+            return
+
+        currency = normalize_currency(args[0])
+        if len(currency) != 3 or not currency.isalpha():
+            await message.answer("Currency must be a 3-letter code.")
+            return
+        if currency == workspace.base_currency:
+            await message.answer("The base currency always converts at 1.")
+            return
+        try:
+            rate = parse_rate(args[1])
+            rate_date = dt.date.fromisoformat(args[2]) if len(args) == 3 else None
+        except ValueError:
+            await message.answer("Invalid rate or date. Example: /fx EUR 1.08 2025-03-01")
+            return
+        await set_rate(session, workspace, currency, rate, rate_date)
+
+    await message.answer(f"FX rate set: 1 {currency} = {rate.normalize():f} {workspace.base_currency}.")
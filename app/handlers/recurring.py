@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from app.db.models import RecurrenceInterval
+from app.db.session import async_session_factory
+from app.handlers.utils import get_args, parse_amount_currency
+from app.services.categories import get_or_create_category, list_categories
+from app.services.recurring import (
+    create_recurring_rule,
+    list_recurring_rules,
+    stop_recurring_rule,
+)
+from app.services.users import ensure_user
+from app.services.utils import format_minor
+from app.services.wallets import get_default_wallet
+from app.services.workspaces import get_active_workspace
+
+router = Router()
+
+INTERVALS = {interval.value for interval in RecurrenceInterval}
+
+
+@router.message(Command("recurring"))
+async def list_recurring_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+        rules = await list_recurring_rules(session, workspace)
+        categories = {
+            category.id: category.name for category in await list_categories(session, workspace)
+        }
+
+    if not rules:
+        await message.answer("No recurring expenses. Use /recurring_add.")
+        return
+    lines = ["Recurring expenses:"]
+    for rule in rules:
+        category = categories.get(rule.category_id, "-")
+        lines.append(
+            f"#{rule.id} {rule.interval.value}: {category} "
+            f"{format_minor(rule.amount_minor, rule.currency)}, "
+            f"next {rule.next_run_at:%Y-%m-%d}"
+        )
+    await message.answer("\n".join(lines))
+
+
+@router.message(Command("recurring_add"))
+async def add_recurring_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) < 3 or args[0].lower() not in INTERVALS:
+        await message.answer(
+            "Usage: /recurring_add <daily|weekly|monthly> <amount> [CUR] <category> [note]"
+        )
+        return
+    interval = args[0].lower()
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+
+        try:
+            amount_minor, currency, idx = parse_amount_currency(
+                args[1:], workspace.base_currency
+            )
+        except ValueError:
+            await message.answer("Invalid amount. Example: /recurring_add monthly 900 rent")
+            return
+        rest = args[1 + idx :]
+        if not rest:
+            await message.answer("Category is required.")
+            return
+
+        wallet = await get_default_wallet(session, workspace, user, currency)
+        if wallet is None:
+            await message.answer(f"No wallet in {currency}. Create one with /wallet_add.")
+            return
+        category = await get_or_create_category(session, workspace, rest[0], "expense")
+        rule = await create_recurring_rule(
+            session,
+            workspace=workspace,
+            wallet=wallet,
+            payer=user,
+            amount_minor=amount_minor,
+            currency=currency,
+            category_id=category.id,
+            note=" ".join(rest[1:]) or None,
+            interval=interval,
+        )
+
+    await message.answer(
+        f"Recurring expense #{rule.id}: {category.name} "
+        f"{format_minor(rule.amount_minor, rule.currency)} {interval}, starting today."
+    )
+
+
+@router.message(Command("recurring_stop"))
+async def stop_recurring_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) != 1 or not args[0].lstrip("#").isdigit():
+        await message.answer("Usage: /recurring_stop <id>")
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+        stopped = await stop_recurring_rule(session, workspace, int(args[0].lstrip("#")))
+
+    if not stopped:
+        await message.answer("Recurring expense not found. See /recurring.")
+        return
+    await message.answer("Recurring expense stopped.")
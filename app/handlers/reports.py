@@ -5,7 +5,14 @@ from aiogram.filters import Command
 from aiogram.types import Message
 
 from app.db.session import async_session_factory
-from app.services.balance import calculate_balances, format_balance_report, get_workspace_members
+from app.services.balance import (
+    calculate_balances,
+    consolidate_workspace_balances,
+    format_balance_report,
+    format_settlement_report,
+    get_settlement_suggestions,
+    get_workspace_members,
+)
 from app.services.reporting import monthly_expense_report
 from app.services.users import ensure_user
 from app.services.workspaces import get_active_workspace
@@ -25,9 +32,27 @@ async def balance_command(message: Message) -> None:
             await message.answer("No active workspace. Use /setup or /join first.")
             return
         balances = await calculate_balances(session, workspace)
+        consolidated = await consolidate_workspace_balances(session, workspace, balances)
         members = await get_workspace_members(session, workspace)
 
-    await message.answer(format_balance_report(balances, members))
+    await message.answer(format_balance_report(balances, members, consolidated))
+
+
+@router.message(Command("settle"))
+async def settle_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+        suggestions = await get_settlement_suggestions(session, workspace)
+        members = await get_workspace_members(session, workspace)
+
+    await message.answer(format_settlement_report(suggestions, members))
 
 
 @router.message(Command("report"))
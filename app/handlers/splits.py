@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from app.db.session import async_session_factory
+from app.handlers.utils import get_args
+from app.services.snapshots import get_workspace_snapshot
+from app.services.splits import list_split_templates, parse_template_weights, set_split_template
+from app.services.users import ensure_user
+from app.services.utils import display_name
+from app.services.workspaces import find_member, get_active_workspace
+
+router = Router()
+
+
+@router.message(Command("split_template"))
+async def split_template_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) < 2:
+        await message.answer("Usage: /split_template <name> <@member>=<weight> ...")
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+
+        weights: dict[int, int] = {}
+        for token in args[1:]:
+            reference, _, raw_weight = token.partition("=")
+            member = await find_member(session, workspace, reference)
+            if member is None:
+                await message.answer(f"Member not found in this workspace: {reference}")
+                return
+            try:
+                weights[member.id] = int(raw_weight)
+            except ValueError:
+                await message.answer(f"Invalid weight in {token}. Example: @alex=2")
+                return
+        try:
+            await set_split_template(session, workspace, args[0], weights)
+        except ValueError as exc:
+            await message.answer(str(exc))
+            return
+
+    await message.answer(
+        f"Split template '{args[0].lower()}' saved. Use it with /add <amount> <category> "
+        f"split:{args[0].lower()}"
+    )
+
+
+@router.message(Command("split_templates"))
+async def split_templates_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+        templates = await list_split_templates(session, workspace)
+        snapshot = await get_workspace_snapshot(session, workspace)
+
+    if not templates:
+        await message.answer("No split templates yet. Use /split_template <name> @a=1 @b=2.")
+        return
+    names = {member.user_id: display_name(member) for member in snapshot.members}
+    lines = ["Split templates:"]
+    for template in templates:
+        parts = ", ".join(
+            f"{names.get(user_id, f'user:{user_id}')}={weight}"
+            for user_id, weight in parse_template_weights(template.weights).items()
+        )
+        lines.append(f"- {template.name}: {parts}")
+    await message.answer("\n".join(lines))
@@ -33,8 +33,21 @@ async def help_command(message: Message) -> None:
         "/wallet_add <name> <CUR> [shared|personal]\n"
         "/categories [expense|income]\n"
         "/category_add <name> [expense|income]\n"
-        "/add <amount> [CUR] <category> [note]\n"
+        "/add <amount> [CUR] <category> [note] [split:<template>]\n"
         "/income <amount> [CUR] <category> [note]\n"
+        "/paid <@member> <amount> [CUR] [note] - record a settlement\n"
+        "/transfer <amount> <from_wallet> <to_wallet> [note]\n"
         "/balance - who owes whom\n"
-        "/report - monthly expense report"
+        "/settle - who pays whom to settle up\n"
+        "/report - monthly expense report\n"
+        "/fx [CUR rate [YYYY-MM-DD]] - list/set FX rates to base currency\n"
+        "/budget <category> <amount> [CUR] [80,100] - monthly budget with alerts\n"
+        "/budgets - budget usage this month\n"
+        "/recurring - list recurring expenses\n"
+        "/recurring_add <daily|weekly|monthly> <amount> [CUR] <category> [note]\n"
+        "/recurring_stop <id>\n"
+        "/weight <@member> <weight> - share of new expenses (owner only)\n"
+        "/compact_splits <on|off> - store weighted splits without per-member rows (owner only)\n"
+        "/split_template <name> <@member>=<weight> ... - save a named split\n"
+        "/split_templates - list split templates"
     )
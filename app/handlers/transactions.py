@@ -5,39 +5,25 @@ from aiogram.filters import Command
 from aiogram.types import Message
 
 from app.db.session import async_session_factory
-from app.handlers.utils import get_args
+from app.handlers.utils import get_args, parse_amount_currency
 from app.services.categories import get_or_create_category
+from app.services.splits import SplitSpec, check_split
 from app.services.transactions import create_expense, create_income
 from app.services.users import ensure_user
-from app.services.utils import format_minor, normalize_currency, parse_amount_to_minor
+from app.services.utils import format_minor
 from app.services.wallets import get_default_wallet
 from app.services.workspaces import get_active_workspace
 
 router = Router()
 
 
-def _parse_amount_currency(args: list[str], default_currency: str) -> tuple[int, str, int]:
-    if not args:
-        raise ValueError("Missing amount")
-    amount_raw = args[0]
-    currency = default_currency
-    idx = 1
-    if len(args) >= 2 and len(args[1]) == 3 and args[1].isalpha():
-        currency = normalize_currency(args[1])
-        idx = 2
-    amount_minor = parse_amount_to_minor(amount_raw, currency)
-    if amount_minor <= 0:
-        raise ValueError("Amount must be positive")
-    return amount_minor, currency, idx
-
-
 @router.message(Command("add"))
 async def add_expense(message: Message) -> None:
     if message.from_user is None:
         return
     args = get_args(message)
     if len(args) < 2:
-        await message.answer("Usage: /add <amount> [CUR] <category> [note]")
+        await message.answer("Usage: /add <amount> [CUR] <category> [note] [split:<template>]")
         return
 
     async with async_session_factory() as session:
@@ -48,7 +34,7 @@ async def add_expense(message: Message) -> None:
             return
 
         try:
-            amount_minor, currency, idx = _parse_amount_currency(
+            amount_minor, currency, idx = parse_amount_currency(
                 args, workspace.base_currency
             )
         except ValueError:
@@ -60,7 +46,18 @@ async def add_expense(message: Message) -> None:
             return
 
         category_name = args[idx]
-        note = " ".join(args[idx + 1 :]) or None
+        rest = args[idx + 1 :]
+        split = None
+        if rest and rest[-1].startswith("split:"):
+            split = SplitSpec.named(rest.pop().removeprefix("split:"))
+        note = " ".join(rest) or None
+
+        if split is not None:
+            try:
+                await check_split(session, workspace, split, amount_minor)
+            except ValueError as exc:
+                await message.answer(f"{exc}. See /split_templates.")
+                return
 
         wallet = await get_default_wallet(session, workspace, user, currency)
         if wallet is None:
@@ -69,17 +66,24 @@ async def add_expense(message: Message) -> None:
             )
             return
 
-        category = await get_or_create_category(session, workspace, category_name, "expense")
-        tx = await create_expense(
-            session,
-            workspace=workspace,
-            wallet=wallet,
-            amount_minor=amount_minor,
-            currency=currency,
-            note=note,
-            payer=user,
-            category_id=category.id,
+        category = await get_or_create_category(
+            session, workspace, category_name, "expense", resolve_typos=True
         )
+        try:
+            tx = await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=amount_minor,
+                currency=currency,
+                note=note,
+                payer=user,
+                category_id=category.id,
+                split=split,
+            )
+        except ValueError as exc:
+            await message.answer(f"{exc}. See /split_templates.")
+            return
 
     await message.answer(
         f"Expense added: {category.name} {format_minor(tx.amount_minor, tx.currency)}."
@@ -103,7 +107,7 @@ async def add_income(message: Message) -> None:
             return
 
         try:
-            amount_minor, currency, idx = _parse_amount_currency(
+            amount_minor, currency, idx = parse_amount_currency(
                 args, workspace.base_currency
             )
         except ValueError:
@@ -124,7 +128,9 @@ async def add_income(message: Message) -> None:
             )
             return
 
-        category = await get_or_create_category(session, workspace, category_name, "income")
+        category = await get_or_create_category(
+            session, workspace, category_name, "income", resolve_typos=True
+        )
         tx = await create_income(
             session,
             workspace=workspace,
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from app.db.session import async_session_factory
+from app.handlers.utils import get_args, parse_amount_currency
+from app.services.transfers import create_transfer, record_settlement
+from app.services.users import ensure_user
+from app.services.utils import display_name, format_minor, parse_amount_to_minor
+from app.services.wallets import get_default_wallet, get_wallet_by_name
+from app.services.workspaces import find_member, get_active_workspace
+
+router = Router()
+
+
+@router.message(Command("paid"))
+async def paid_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) < 2:
+        await message.answer("Usage: /paid <@member> <amount> [CUR] [note]")
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+
+        payee = await find_member(session, workspace, args[0])
+        if payee is None:
+            await message.answer("Member not found. Use their @username or Telegram id.")
+            return
+
+        try:
+            amount_minor, currency, idx = parse_amount_currency(
+                args[1:], workspace.base_currency
+            )
+        except ValueError:
+            await message.answer("Invalid amount. Example: /paid @alex 25")
+            return
+        note = " ".join(args[1 + idx :]) or None
+
+        wallet = await get_default_wallet(session, workspace, user, currency)
+        if wallet is None:
+            await message.answer(
+                f"No wallet in {currency}. Create one with /wallet_add."
+            )
+            return
+
+        try:
+            tx = await record_settlement(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                payer=user,
+                payee=payee,
+                amount_minor=amount_minor,
+                currency=currency,
+                note=note,
+            )
+        except ValueError as exc:
+            await message.answer(str(exc))
+            return
+
+    await message.answer(
+        f"Settlement recorded: you paid {display_name(payee)} "
+        f"{format_minor(tx.amount_minor, tx.currency)}."
+    )
+
+
+@router.message(Command("transfer"))
+async def transfer_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) < 3:
+        await message.answer(
+            "Usage: /transfer <amount> <from_wallet> <to_wallet> [note]\n"
+            "Use _ for spaces in wallet names."
+        )
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+
+        wallets = []
+        for name in args[1:3]:
+            wallet = await get_wallet_by_name(session, workspace, name)
+            if wallet is None:
+                wallet = await get_wallet_by_name(session, workspace, name.replace("_", " "))
+            if wallet is None:
+                await message.answer(f"Wallet '{name}' not found. See /wallets.")
+                return
+            wallets.append(wallet)
+        from_wallet, to_wallet = wallets
+
+        try:
+            amount_minor = parse_amount_to_minor(args[0], from_wallet.currency)
+        except ValueError:
+            await message.answer("Invalid amount. Example: /transfer 50 Shared Personal_Alex")
+            return
+        note = " ".join(args[3:]) or None
+
+        try:
+            tx = await create_transfer(
+                session,
+                workspace=workspace,
+                from_wallet=from_wallet,
+                to_wallet=to_wallet,
+                amount_minor=amount_minor,
+                note=note,
+                user=user,
+            )
+        except ValueError as exc:
+            await message.answer(str(exc))
+            return
+
+    await message.answer(
+        f"Transfer recorded: {from_wallet.name} -> {to_wallet.name} "
+        f"{format_minor(tx.amount_minor, tx.currency)}."
+    )
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from aiogram.types import Message
 
+from app.services.utils import normalize_currency, parse_amount_to_minor
+
 
 def get_args(message: Message) -> list[str]:
     if not message.text:
@@ -10,3 +12,18 @@ def get_args(message: Message) -> list[str]:
     if len(parts) <= 1:
         return []
     return parts[1:]
+
+
+def parse_amount_currency(args: list[str], default_currency: str) -> tuple[int, str, int]:
+    if not args:
+        raise ValueError("Missing amount")
+    amount_raw = args[0]
+    currency = default_currency
+    idx = 1
+    if len(args) >= 2 and len(args[1]) == 3 and args[1].isalpha():
+        currency = normalize_currency(args[1])
+        idx = 2
+    amount_minor = parse_amount_to_minor(amount_raw, currency)
+    if amount_minor <= 0:
+        raise ValueError("Amount must be positive")
+    return amount_minor, currency, idx
@@ -4,14 +4,14 @@ from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import KeyboardButton, Message, ReplyKeyboardMarkup, WebAppInfo
 
-from app.config import load_settings
+from app.core.config import get_settings
 
 router = Router()
 
 
 @router.message(Command("open"))
 async def open_webapp(message: Message) -> None:
-    settings = load_settings()
+    settings = get_settings()
     if not settings.webapp_url:
         await message.answer("WEBAPP_URL is not configured.")
         return
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from app.db.models import MembershipRole
+from app.db.session import async_session_factory
+from app.handlers.utils import get_args
+from app.services.snapshots import get_workspace_snapshot
+from app.services.users import ensure_user
+from app.services.utils import display_name
+from app.services.workspaces import (
+    find_member,
+    get_active_workspace,
+    set_implicit_splits,
+    set_share_weight,
+)
+
+router = Router()
+
+
+@router.message(Command("weight"))
+async def weight_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) != 2:
+        await message.answer("Usage: /weight <@member> <weight>")
+        return
+
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+        snapshot = await get_workspace_snapshot(session, workspace)
+        caller = snapshot.member(user.id)
+        if caller is None or caller.role != MembershipRole.owner:
+            await message.answer("Only the workspace owner can change share weights.")
+            return
+        member = await find_member(session, workspace, args[0])
+        if member is None:
+            await message.answer("Member not found in this workspace.")
+            return
+        try:
+            share_weight = int(args[1])
+            await set_share_weight(session, workspace, member.id, share_weight)
+        except ValueError as exc:
+            await message.answer(f"{exc}. Example: /weight @alex 2")
+            return
+
+    await message.answer(
+        f"Share weight of {display_name(member)} set to {share_weight}. "
+        "New expenses are split by weight."
+    )
+
+
+@router.message(Command("compact_splits"))
+async def compact_splits_command(message: Message) -> None:
+    if message.from_user is None:
+        return
+    args = get_args(message)
+    if len(args) != 1 or args[0].lower() not in ("on", "off"):
+        await message.answer("Usage: /compact_splits <on|off>")
+        return
+
+    enabled = args[0].lower() == "on"
+    async with async_session_factory() as session:
+        user = await ensure_user(session, message.from_user)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            await message.answer("No active workspace. Use /setup or /join first.")
+            return
+        snapshot = await get_workspace_snapshot(session, workspace)
+        caller = snapshot.member(user.id)
+        if caller is None or caller.role != MembershipRole.owner:
+            await message.answer("Only the workspace owner can change split storage.")
+            return
+        await set_implicit_splits(session, workspace, enabled, user.id)
+
+    if enabled:
+        await message.answer(
+            "Compact splits on: expenses split by weight no longer store a row per member."
+        )
+    else:
+        await message.answer("Compact splits off: every expense stores a row per member.")
@@ -0,0 +1,37 @@
+"""Bulk-load FX rates from a local ``date,currency,rate`` CSV into one workspace.
+
+Usage: ``python -m app.load_fx_rates <workspace_id> <rates.csv>``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from app.db.session import async_session_factory
+from app.services.fx import load_rates_csv
+from app.services.workspaces import get_workspace_by_id
+
+
+async def load(workspace_id: int, path: Path) -> int:
+    async with async_session_factory() as session:
+        workspace = await get_workspace_by_id(session, workspace_id)
+        if workspace is None:
+            raise SystemExit(f"Workspace {workspace_id} not found")
+        return await load_rates_csv(session, workspace, path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workspace_id", type=int)
+    parser.add_argument("path", type=Path)
+    args = parser.parse_args()
+    try:
+        count = asyncio.run(load(args.workspace_id, args.path))
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    print(f"Loaded {count} rates into workspace {args.workspace_id}")
+
+
+if __name__ == "__main__":
+    main()
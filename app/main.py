@@ -4,15 +4,20 @@ from fastapi import FastAPI
 
 from app.api.routes.auth import router as auth_router
 from app.api.routes.users import router as users_router
+from app.api.serialization import FastJSONResponse
 from app.core.config import get_settings
 from app.core.logging import setup_logging
 from app.core.middleware import InMemoryRateLimitMiddleware, RequestContextMiddleware
 
 settings = get_settings()
-setup_logging()
+setup_logging(settings.log_level)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title='Prospera Wallet API', version='1.0.0')
+app = FastAPI(
+    title='Prospera Wallet API',
+    version='1.0.0',
+    default_response_class=FastJSONResponse,
+)
 app.add_middleware(RequestContextMiddleware)
 app.add_middleware(InMemoryRateLimitMiddleware, limit_per_minute=settings.rate_limit_per_minute)
 app.include_router(users_router, prefix=settings.api_prefix)
@@ -47,6 +47,8 @@ class SettlementSuggestion(BaseModel):
     from_user: int
     to_user: int
     amount: Decimal
+    currency: str
+    amount_minor: int
 
 
 class TransferRequest(BaseModel):
@@ -0,0 +1,46 @@
+from typing import Annotated, Any
+
+from pydantic import BaseModel, BeforeValidator
+
+
+def _as_text(value: Any) -> Any:
+    # The Mini App may send amounts, notes and names as JSON numbers.
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+Text = Annotated[str, BeforeValidator(_as_text)]
+
+
+class ExpensePayload(BaseModel):
+    amount: Text
+    category: Text
+    note: Text | None = None
+    currency: Text | None = None
+    # At most one custom split is used, in this order; none splits by share weight.
+    split_template: Text | None = None
+    split_members: list[int] | None = None
+    split_exact: dict[int, Text] | None = None
+    split_percent: dict[int, Text] | None = None
+
+
+class IncomePayload(BaseModel):
+    amount: Text
+    category: Text
+    note: Text | None = None
+    currency: Text | None = None
+
+
+class SettlementPayload(BaseModel):
+    to_user: int
+    amount: Text
+    note: Text | None = None
+    currency: Text | None = None
+
+
+class TransferPayload(BaseModel):
+    from_wallet_id: int
+    to_wallet_id: int
+    amount: Text
+    note: Text | None = None
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.dialect import upsert_insert
+from app.db.models import AnomalyStat, Transaction, Workspace
+from app.services.snapshots import WorkspaceSnapshot, get_workspace_snapshot
+from app.services.utils import as_utc, format_minor
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_WINDOW = dt.timedelta(minutes=10)
+OUTLIER_Z = 3.0
+MIN_SAMPLES = 5
+# Floor on the deviation of log(amount), so a member who always pays the same amount is
+# not flagged for paying a few percent more; 0.25 means roughly 2x above the mean at z=3.
+MIN_STDDEV = 0.25
+FLUSH_INTERVAL_SECONDS = 300.0
+# Oldest recent expenses are forgotten beyond this, even inside the duplicate window.
+MAX_RECENT = 50_000
+
+# (workspace_id, user_id, category_key, currency); category_key 0 means uncategorized.
+StatKey = tuple[int, int, int, str]
+# (workspace_id, user_id, category_key, amount_minor, currency)
+RecentKey = tuple[int, int, int, int, str]
+_PENDING_KEY = "anomaly_samples"
+
+
+class RunningStats:
+    """Count, sum and sum of squares of log(amount) for one member and category.
+
+    Plain sums add up, so partial statistics from several processes merge exactly.
+    """
+
+    __slots__ = ("count", "total", "total_sq")
+
+    def __init__(self, count: int = 0, total: float = 0.0, total_sq: float = 0.0) -> None:
+        self.count = count
+        self.total = total
+        self.total_sq = total_sq
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+
+    def merged(self, other: RunningStats | None) -> RunningStats:
+        if other is None:
+            return self
+        return RunningStats(
+            self.count + other.count, self.total + other.total, self.total_sq + other.total_sq
+        )
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def zscore(self, value: float) -> float | None:
+        if self.count < MIN_SAMPLES:
+            return None
+        return (value - self.mean) / max(self.stddev, MIN_STDDEV)
+
+
+def _stat_key(tx: Transaction) -> StatKey:
+    return (tx.workspace_id, tx.created_by, tx.category_id or 0, tx.currency)
+
+
+def _recent_key(tx: Transaction) -> RecentKey:
+    return (tx.workspace_id, tx.created_by, tx.category_id or 0, tx.amount_minor, tx.currency)
+
+
+def _log_amount(amount_minor: int) -> float:
+    return math.log(max(amount_minor, 1))
+
+
+@dataclass(frozen=True)
+class _Sample:
+    stat_key: StatKey
+    recent_key: RecentKey
+    amount_minor: int
+    occurred_at: dt.datetime
+
+
+@dataclass(frozen=True)
+class AnomalyFlag:
+    workspace_id: int
+    workspace_name: str
+    kind: str
+    category_name: str
+    amount_minor: int
+    currency: str
+    recipients: tuple[int, ...]
+
+    def message(self) -> str:
+        amount = format_minor(self.amount_minor, self.currency)
+        if self.kind == "duplicate":
+            minutes = int(DUPLICATE_WINDOW.total_seconds() // 60)
+            return (
+                f"Possible duplicate ({self.workspace_name}): you recorded {amount} "
+                f"for {self.category_name} twice within {minutes} minutes."
+            )
+        return (
+            f"Unusual expense ({self.workspace_name}): {amount} for {self.category_name} "
+            "is far above what you usually spend there."
+        )
+
+
+class AnomalyDetector:
+    """Flags outlier and duplicate-looking expenses.
+
+    Duplicates are found in memory: the expenses this process committed within the
+    duplicate window (at most ``max_recent`` of them), plus those still pending in the
+    session's transaction. An expense repeated through another process goes unnoticed.
+    Outliers are scored against the stored sums of a workspace, loaded in one query the
+    first time this process needs them, plus the samples this process has committed
+    since. Those samples are added to the stored sums periodically; after a flush the
+    stored sums are read again, which brings in other processes' samples. Samples and
+    recent expenses are taken only once the expense's transaction commits.
+    """
+
+    def __init__(
+        self,
+        duplicate_window: dt.timedelta = DUPLICATE_WINDOW,
+        z_threshold: float = OUTLIER_Z,
+        max_recent: int = MAX_RECENT,
+    ) -> None:
+        self.duplicate_window = duplicate_window
+        self.z_threshold = z_threshold
+        self.max_recent = max_recent
+        # Recent expense -> (monotonic time it was recorded, its occurred_at)
+        self._recent: OrderedDict[RecentKey, tuple[float, dt.datetime]] = OrderedDict()
+        self._stored: dict[StatKey, RunningStats] = {}
+        self._pending: dict[StatKey, RunningStats] = {}
+        self._loaded: set[int] = set()
+        self._task: asyncio.Task | None = None
+
+    async def ensure_loaded(self, session: AsyncSession, workspace_id: int) -> None:
+        if workspace_id in self._loaded:
+            return
+        result = await session.execute(
+            select(
+                AnomalyStat.user_id,
+                AnomalyStat.category_key,
+                AnomalyStat.currency,
+                AnomalyStat.sample_count,
+                AnomalyStat.sum_log,
+                AnomalyStat.sum_log_sq,
+            ).where(AnomalyStat.workspace_id == workspace_id)
+        )
+        for user_id, category_key, currency, count, total, total_sq in result.all():
+            key = (workspace_id, user_id, category_key, currency)
+            self._stored[key] = RunningStats(count, total, total_sq)
+        self._loaded.add(workspace_id)
+
+    def is_duplicate(self, session: AsyncSession, tx: Transaction) -> bool:
+        """Whether the payer recorded the same expense shortly before ``tx``."""
+        key = _recent_key(tx)
+        earliest = as_utc(tx.occurred_at) - self.duplicate_window
+        self._expire()
+        recent = self._recent.get(key)
+        if recent is not None and recent[1] >= earliest:
+            return True
+        return any(
+            sample.recent_key == key and sample.occurred_at >= earliest
+            for sample in session.info.get(_PENDING_KEY, ())
+        )
+
+    def remember(self, key: RecentKey, occurred_at: dt.datetime) -> None:
+        self._recent[key] = (time.monotonic(), occurred_at)
+        self._recent.move_to_end(key)
+        self._expire()
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.duplicate_window.total_seconds()
+        while self._recent and (
+            len(self._recent) > self.max_recent or next(iter(self._recent.values()))[0] < cutoff
+        ):
+            self._recent.popitem(last=False)
+
+    def is_outlier(self, key: StatKey, amount_minor: int) -> bool:
+        stats = self.stats(*key)
+        if stats is None:
+            return False
+        zscore = stats.zscore(_log_amount(amount_minor))
+        return zscore is not None and zscore >= self.z_threshold
+
+    def record(self, key: StatKey, amount_minor: int) -> None:
+        self._pending.setdefault(key, RunningStats()).push(_log_amount(amount_minor))
+
+    def record_on_commit(self, session: AsyncSession, tx: Transaction) -> None:
+        """Take the sample when the session's transaction commits; drop it on rollback."""
+        pending = session.info.get(_PENDING_KEY)
+        if pending is None:
+            pending = session.info[_PENDING_KEY] = []
+            sync_session = session.sync_session
+            event.listen(sync_session, "after_commit", self._after_commit)
+            event.listen(sync_session, "after_soft_rollback", self._after_rollback)
+        pending.append(
+            _Sample(_stat_key(tx), _recent_key(tx), tx.amount_minor, as_utc(tx.occurred_at))
+        )
+
+    def _after_commit(self, sync_session: Any) -> None:
+        samples, sync_session.info[_PENDING_KEY] = sync_session.info[_PENDING_KEY], []
+        for sample in samples:
+            self.record(sample.stat_key, sample.amount_minor)
+            self.remember(sample.recent_key, sample.occurred_at)
+
+    def _after_rollback(self, sync_session: Any, previous_transaction: Any) -> None:
+        sync_session.info[_PENDING_KEY] = []
+
+    def stats(
+        self,
+        workspace_id: int,
+        user_id: int,
+        category_id: int | None,
+        currency: str,
+    ) -> RunningStats | None:
+        key = (workspace_id, user_id, category_id or 0, currency)
+        stored = self._stored.get(key)
+        pending = self._pending.get(key)
+        if stored is None:
+            return pending
+        return stored.merged(pending)
+
+    async def flush(self, session_factory: async_sessionmaker) -> int:
+        """Add this process's new samples to the stored sums; returns the number of rows."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        rows = [
+            {
+                "workspace_id": workspace_id,
+                "user_id": user_id,
+                "category_key": category_key,
+                "currency": currency,
+                "sample_count": stats.count,
+                "sum_log": stats.total,
+                "sum_log_sq": stats.total_sq,
+            }
+            for (workspace_id, user_id, category_key, currency), stats in pending.items()
+        ]
+        try:
+            async with session_factory() as session:
+                stmt = upsert_insert(session, AnomalyStat)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["workspace_id", "user_id", "category_key", "currency"],
+                    set_={
+                        "sample_count": AnomalyStat.sample_count + stmt.excluded.sample_count,
+                        "sum_log": AnomalyStat.sum_log + stmt.excluded.sum_log,
+                        "sum_log_sq": AnomalyStat.sum_log_sq + stmt.excluded.sum_log_sq,
+                        "updated_at": func.now(),
+                    },
+                )
+                await session.execute(stmt, rows)
+                await session.commit()
+        except BaseException:
+            for key, stats in pending.items():
+                self._pending[key] = stats.merged(self._pending.get(key))
+            raise
+        # The stored sums now include these samples and other processes' flushes.
+        self._stored.clear()
+        self._loaded.clear()
+        return len(rows)
+
+    async def _run(self, session_factory: async_sessionmaker, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush(session_factory)
+            except Exception:
+                logger.exception("Anomaly statistics flush failed")
+
+    def start(
+        self,
+        session_factory: async_sessionmaker,
+        interval: float = FLUSH_INTERVAL_SECONDS,
+    ) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory, interval))
+
+    async def stop(self, session_factory: async_sessionmaker) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush(session_factory)
+        except Exception:
+            logger.exception("Final anomaly statistics flush failed")
+
+    def clear(self) -> None:
+        self._stored.clear()
+        self._pending.clear()
+        self._loaded.clear()
+        self._recent.clear()
+
+
+anomaly_detector = AnomalyDetector()
+
+
+def _category_names(snapshot: WorkspaceSnapshot) -> dict[int, str]:
+    names = snapshot.derived.get("category_names")
+    if names is None:
+        names = {category.id: category.name for category in snapshot.categories}
+        snapshot.derived["category_names"] = names
+    return names
+
+
+async def screen_expense(
+    session: AsyncSession,
+    workspace: Workspace,
+    tx: Transaction,
+) -> list[AnomalyFlag]:
+    """Flag ``tx`` (already flushed); its sample is taken when the caller commits."""
+    key = _stat_key(tx)
+    await anomaly_detector.ensure_loaded(session, workspace.id)
+    kinds = []
+    if anomaly_detector.is_duplicate(session, tx):
+        kinds.append("duplicate")
+    if anomaly_detector.is_outlier(key, tx.amount_minor):
+        kinds.append("outlier")
+    anomaly_detector.record_on_commit(session, tx)
+    if not kinds:
+        return []
+    snapshot = await get_workspace_snapshot(session, workspace)
+    payer = snapshot.member(tx.created_by)
+    category_name = _category_names(snapshot).get(tx.category_id or 0, "uncategorized")
+    return [
+        AnomalyFlag(
+            workspace_id=workspace.id,
+            workspace_name=workspace.name,
+            kind=kind,
+            category_name=category_name,
+            amount_minor=tx.amount_minor,
+            currency=tx.currency,
+            recipients=(payer.tg_id,) if payer is not None else (),
+        )
+        for kind in kinds
+    ]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 2.0
+BATCH_SIZE = 500
+# Oldest entries are dropped beyond this while the database is unreachable.
+MAX_BUFFERED = 50_000
+
+
+@dataclass(frozen=True)
+class AuditEvent:
+    action: str
+    entity: str
+    entity_id: int | None
+    workspace_id: int | None
+    actor_user_id: int | None
+    details: dict[str, Any] = field(default_factory=dict)
+    created_at: dt.datetime = field(default_factory=lambda: dt.datetime.now(dt.timezone.utc))
+
+    def row(self) -> dict[str, Any]:
+        return {
+            "action": self.action,
+            "entity": self.entity,
+            "entity_id": self.entity_id,
+            "workspace_id": self.workspace_id,
+            "actor_user_id": self.actor_user_id,
+            "details": json.dumps(self.details, default=str) if self.details else None,
+            "created_at": self.created_at,
+        }
+
+
+class AuditWriter:
+    """Buffers audit events in memory and appends them to ``audit_log`` in batches.
+
+    ``record`` never touches the database, so auditing adds no round trip to the
+    request; a background task writes multi-row INSERTs every ``flush_interval``
+    seconds, or sooner once ``batch_size`` events are waiting.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        batch_size: int = BATCH_SIZE,
+        max_buffered: int = MAX_BUFFERED,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._buffer: deque[AuditEvent] = deque()
+        self._max_buffered = max_buffered
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def pending(self) -> list[AuditEvent]:
+        return list(self._buffer)
+
+    def record(self, event: AuditEvent) -> None:
+        self._buffer.append(event)
+        while len(self._buffer) > self._max_buffered:
+            self._buffer.popleft()
+            self.dropped += 1
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self, session_factory: async_sessionmaker) -> int:
+        """Write everything buffered so far; returns the number of entries written."""
+        written = 0
+        while self._buffer:
+            count = min(len(self._buffer), self.batch_size)
+            batch = [self._buffer.popleft() for _ in range(count)]
+            try:
+                async with session_factory() as session:
+                    await session.execute(insert(AuditLog).values([event.row() for event in batch]))
+                    await session.commit()
+            except BaseException:
+                # Put the batch back in order, also when cancelled; the next flush retries it.
+                self._buffer.extendleft(reversed(batch))
+                raise
+            written += count
+        return written
+
+    async def _run(self, session_factory: async_sessionmaker) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush(session_factory)
+            except Exception:
+                logger.exception("Audit log flush failed; %s entries buffered", len(self._buffer))
+            if self._stopping:
+                return
+
+    def start(self, session_factory: async_sessionmaker) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self, session_factory: async_sessionmaker) -> None:
+        """Let the background task finish its current batch and drain, then flush the rest."""
+        if self._task is not None:
+            assert self._wakeup is not None
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._wakeup = None
+        try:
+            await self.flush(session_factory)
+        except Exception:
+            logger.exception("Final audit log flush failed; %s entries lost", len(self._buffer))
+
+    def clear(self) -> None:
+        self._buffer.clear()
+        self.dropped = 0
+
+
+audit_writer = AuditWriter()
+
+
+def record_audit(
+    action: str,
+    entity: str,
+    entity_id: int | None,
+    workspace_id: int | None,
+    actor_user_id: int | None,
+    **details: Any,
+) -> None:
+    """Queue an audit entry; call it after the audited change has committed."""
+    audit_writer.record(
+        AuditEvent(
+            action=action,
+            entity=entity,
+            entity_id=entity_id,
+            workspace_id=workspace_id,
+            actor_user_id=actor_user_id,
+            details=details,
+        )
+    )
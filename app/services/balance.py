@@ -1,32 +1,99 @@
 from __future__ import annotations
 
+import datetime as dt
 from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.db.models import Membership, Transaction, TransactionType, Workspace
+from app.db.dialect import upsert_insert
+from app.db.models import (
+    MemberBalance,
+    Transaction,
+    TransactionSplit,
+    TransactionType,
+    Workspace,
+)
+from app.services.fx import consolidate_balances, rate_cache
+from app.services.membership_history import get_membership_timeline
+from app.services.settlement import Transfer, minimal_transfers
+from app.services.snapshots import MemberRef, get_workspace_snapshot
 from app.services.utils import display_name, format_minor
 
 
-def _build_name_map(memberships: list[Membership]) -> dict[int, str]:
-    name_map: dict[int, str] = {}
-    for membership in memberships:
-        if membership.user:
-            name_map[membership.user_id] = display_name(membership.user)
-        else:
-            name_map[membership.user_id] = f"user:{membership.user_id}"
-    return name_map
+@dataclass(frozen=True)
+class _CachedSettlements:
+    ledger_stamp: tuple
+    suggestions: dict[str, list[Transfer]]
 
 
-async def get_workspace_members(session: AsyncSession, workspace: Workspace) -> list[Membership]:
-    result = await session.execute(
-        select(Membership)
-        .options(selectinload(Membership.user))
-        .where(Membership.workspace_id == workspace.id)
+@dataclass(frozen=True)
+class ConsolidatedBalances:
+    base_currency: str
+    balances: dict[int, int]
+    missing_rates: list[str] = field(default_factory=list)
+
+
+# workspace_id -> suggestions computed for the ledger state identified by the stamp
+_settlement_cache: dict[int, _CachedSettlements] = {}
+
+
+def _build_name_map(members: list[MemberRef]) -> dict[int, str]:
+    return {member.user_id: display_name(member) for member in members}
+
+
+async def get_workspace_members(session: AsyncSession, workspace: Workspace) -> list[MemberRef]:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    return list(snapshot.members)
+
+
+def split_balance_deltas(payer_id: int, shares: Iterable[tuple[int, int]]) -> dict[int, int]:
+    """Net balance change when ``payer_id`` covers each (user_id, amount_minor) share.
+
+    Applies to expenses (one share per member) and settlements (one share for the payee).
+    """
+    deltas: dict[int, int] = defaultdict(int)
+    for user_id, amount_minor in shares:
+        if user_id == payer_id or amount_minor == 0:
+            continue
+        deltas[payer_id] += amount_minor
+        deltas[user_id] -= amount_minor
+    return dict(deltas)
+
+
+async def apply_balance_deltas(
+    session: AsyncSession,
+    workspace_id: int,
+    currency: str,
+    deltas: dict[int, int],
+) -> None:
+    """Add ``deltas`` to the running member balances; the caller commits.
+
+    Rows are written in user id order, so concurrent writers lock them in the same order.
+    """
+    rows = [
+        {
+            "workspace_id": workspace_id,
+            "user_id": user_id,
+            "currency": currency,
+            "balance_minor": delta,
+        }
+        for user_id, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = upsert_insert(session, MemberBalance)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["workspace_id", "user_id", "currency"],
+        set_={
+            "balance_minor": MemberBalance.balance_minor + stmt.excluded.balance_minor,
+            "updated_at": func.now(),
+        },
     )
-    return list(result.scalars().all())
+    await session.execute(stmt, rows)
 
 
 async def calculate_balances(
@@ -35,29 +102,160 @@ async def calculate_balances(
 ) -> dict[str, dict[int, int]]:
     balances: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
     result = await session.execute(
-        select(Transaction)
-        .options(selectinload(Transaction.splits))
+        select(MemberBalance.currency, MemberBalance.user_id, MemberBalance.balance_minor)
+        .where(MemberBalance.workspace_id == workspace.id)
+        .order_by(MemberBalance.currency, MemberBalance.user_id)
+    )
+    for currency, user_id, balance_minor in result.all():
+        balances[currency][user_id] = balance_minor
+    return balances
+
+
+async def recompute_balances(
+    session: AsyncSession,
+    workspace: Workspace,
+) -> dict[str, dict[int, int]]:
+    """Rebuild balances from the full transaction history (for audits and repairs).
+
+    Stored split rows are netted per (currency, payer, member) in SQL. Expenses with an
+    implicit default split are read in membership-epoch order and allocated against the
+    epoch's weights, which the timeline compiles once per epoch.
+    """
+    balances: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    stored = await session.execute(
+        select(
+            Transaction.currency,
+            Transaction.created_by,
+            TransactionSplit.user_id,
+            func.sum(TransactionSplit.amount_minor),
+        )
+        .join(
+            TransactionSplit,
+            # occurred_at pairs each split partition with its transaction partition.
+            (TransactionSplit.transaction_id == Transaction.id)
+            & (TransactionSplit.occurred_at == Transaction.occurred_at),
+        )
         .where(
             Transaction.workspace_id == workspace.id,
-            Transaction.type == TransactionType.expense,
+            Transaction.type.in_([TransactionType.expense, TransactionType.transfer]),
+            Transaction.created_by.is_not(None),
+            TransactionSplit.user_id != Transaction.created_by,
         )
+        .group_by(Transaction.currency, Transaction.created_by, TransactionSplit.user_id)
     )
-    transactions = result.scalars().all()
-    for tx in transactions:
-        payer_id = tx.created_by
-        if payer_id is None:
-            continue
-        for split in tx.splits:
-            if split.user_id == payer_id:
+    for currency, payer_id, user_id, amount_minor in stored.all():
+        balances[currency][payer_id] += amount_minor
+        balances[currency][user_id] -= amount_minor
+
+    implicit = await session.execute(
+        select(
+            Transaction.split_version,
+            Transaction.id,
+            Transaction.currency,
+            Transaction.created_by,
+            Transaction.amount_minor,
+        )
+        .where(
+            Transaction.workspace_id == workspace.id,
+            Transaction.split_version.is_not(None),
+            Transaction.created_by.is_not(None),
+        )
+        .order_by(Transaction.split_version)
+    )
+    rows = implicit.all()
+    if rows:
+        timeline = await get_membership_timeline(session, workspace)
+        for version, tx_id, currency, payer_id, amount_minor in rows:
+            split = timeline.split(version)
+            if split is None:
                 continue
-            balances[tx.currency][payer_id] += split.amount_minor
-            balances[tx.currency][split.user_id] -= split.amount_minor
+            shares = split.allocate(amount_minor, seed=tx_id)
+            for user_id, delta in split_balance_deltas(payer_id, shares).items():
+                balances[currency][user_id] += delta
     return balances
 
 
+async def _ledger_stamp(session: AsyncSession, workspace: Workspace) -> int | None:
+    # Transaction ids only grow, so the newest id changes whenever any process
+    # records a transaction in this workspace.
+    result = await session.execute(
+        select(func.max(Transaction.id)).where(Transaction.workspace_id == workspace.id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def consolidate_workspace_balances(
+    session: AsyncSession,
+    workspace: Workspace,
+    balances: dict[str, dict[int, int]],
+    on_date: dt.date | None = None,
+) -> ConsolidatedBalances | None:
+    """Net all currencies into the workspace base currency; None if there is nothing to net."""
+    if not any(currency != workspace.base_currency for currency in balances):
+        return None
+    if on_date is None:
+        on_date = dt.datetime.now(dt.timezone.utc).date()
+    rates = await rate_cache.get(session, workspace.id)
+    consolidated, missing = consolidate_balances(
+        balances, rates, workspace.base_currency, on_date
+    )
+    return ConsolidatedBalances(workspace.base_currency, consolidated, missing)
+
+
+def clear_settlement_cache() -> None:
+    _settlement_cache.clear()
+
+
+async def get_settlement_suggestions(
+    session: AsyncSession,
+    workspace: Workspace,
+) -> dict[str, list[Transfer]]:
+    """Fewest transfers that settle the workspace.
+
+    When every currency has an FX rate, balances are netted into the base currency first,
+    so members settle once instead of once per currency.
+    """
+    today = dt.datetime.now(dt.timezone.utc).date()
+    rates = await rate_cache.get(session, workspace.id)
+    stamp = (await _ledger_stamp(session, workspace), rates.stamp, today)
+    cached = _settlement_cache.get(workspace.id)
+    if cached is not None and cached.ledger_stamp == stamp:
+        return cached.suggestions
+
+    balances = await calculate_balances(session, workspace)
+    consolidated = await consolidate_workspace_balances(session, workspace, balances, today)
+    if consolidated is not None and not consolidated.missing_rates:
+        balances = {consolidated.base_currency: consolidated.balances}
+    suggestions: dict[str, list[Transfer]] = {}
+    for currency, currency_balances in balances.items():
+        transfers = minimal_transfers(dict(currency_balances))
+        if transfers:
+            suggestions[currency] = transfers
+    _settlement_cache[workspace.id] = _CachedSettlements(stamp, suggestions)
+    return suggestions
+
+
+def _format_balance_block(
+    lines: list[str],
+    currency_balances: dict[int, int],
+    currency: str,
+    name_map: dict[int, str],
+) -> None:
+    has_entries = False
+    for user_id, amount_minor in sorted(currency_balances.items(), key=lambda item: -item[1]):
+        if amount_minor == 0:
+            continue
+        name = name_map.get(user_id, f"user:{user_id}")
+        lines.append(f"- {name}: {format_minor(amount_minor, currency)}")
+        has_entries = True
+    if not has_entries:
+        lines.append("- all settled")
+
+
 def format_balance_report(
     balances: dict[str, dict[int, int]],
-    members: list[Membership],
+    members: list[MemberRef],
+    consolidated: ConsolidatedBalances | None = None,
 ) -> str:
     if not balances:
         return "All settled or no expenses yet."
@@ -66,13 +264,31 @@ def format_balance_report(
     lines: list[str] = []
     for currency, currency_balances in balances.items():
         lines.append(f"{currency}:")
-        has_entries = False
-        for user_id, amount_minor in sorted(currency_balances.items(), key=lambda item: -item[1]):
-            if amount_minor == 0:
-                continue
-            name = name_map.get(user_id, f"user:{user_id}")
-            lines.append(f"- {name}: {format_minor(amount_minor, currency)}")
-            has_entries = True
-        if not has_entries:
-            lines.append("- all settled")
+        _format_balance_block(lines, currency_balances, currency, name_map)
+    if consolidated is not None:
+        lines.append(f"Total in {consolidated.base_currency}:")
+        _format_balance_block(lines, consolidated.balances, consolidated.base_currency, name_map)
+        if consolidated.missing_rates:
+            missing = ", ".join(consolidated.missing_rates)
+            lines.append(f"(no FX rate for {missing}; set one with /fx)")
+    return "\n".join(lines)
+
+
+def format_settlement_report(
+    suggestions: dict[str, list[Transfer]],
+    members: list[MemberRef],
+) -> str:
+    if not suggestions:
+        return "All settled, nobody owes anything."
+
+    name_map = _build_name_map(members)
+    lines: list[str] = []
+    for currency, transfers in suggestions.items():
+        lines.append(f"{currency}:")
+        for transfer in transfers:
+            payer = name_map.get(transfer.from_user, f"user:{transfer.from_user}")
+            payee = name_map.get(transfer.to_user, f"user:{transfer.to_user}")
+            lines.append(
+                f"- {payer} pays {payee}: {format_minor(transfer.amount_minor, currency)}"
+            )
     return "\n".join(lines)
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.dialect import upsert_insert
+from app.db.models import Budget, BudgetCounter, Transaction, TransactionType, Workspace
+from app.services.snapshots import (
+    BudgetRef,
+    WorkspaceSnapshot,
+    bump_workspace_version,
+    get_workspace_snapshot,
+)
+from app.services.utils import format_minor
+
+DEFAULT_THRESHOLDS = (80, 100)
+
+
+@dataclass(frozen=True)
+class BudgetAlert:
+    workspace_id: int
+    workspace_name: str
+    category_name: str
+    currency: str
+    limit_minor: int
+    spent_minor: int
+    threshold: int
+    recipients: tuple[int, ...]
+
+    def message(self) -> str:
+        verb = "reached" if self.threshold >= 100 else "passed"
+        return (
+            f"Budget alert ({self.workspace_name}): {self.category_name} {verb} "
+            f"{self.threshold}% of {format_minor(self.limit_minor, self.currency)} "
+            f"this month ({format_minor(self.spent_minor, self.currency)} spent)."
+        )
+
+
+@dataclass(frozen=True)
+class BudgetStatus:
+    category_name: str
+    currency: str
+    limit_minor: int
+    spent_minor: int
+    thresholds: tuple[int, ...]
+
+
+def parse_thresholds(raw: str) -> tuple[int, ...]:
+    """Parse ``"50,80,100"`` into sorted unique percentages."""
+    try:
+        values = {int(part.strip().rstrip("%")) for part in raw.split(",") if part.strip()}
+    except ValueError as exc:
+        raise ValueError("Thresholds must be percentages like 80,100") from exc
+    if not values or any(value <= 0 or value > 1000 for value in values):
+        raise ValueError("Thresholds must be percentages between 1 and 1000")
+    return tuple(sorted(values))
+
+
+def format_thresholds(thresholds: tuple[int, ...]) -> str:
+    return ",".join(str(value) for value in thresholds)
+
+
+def month_start(moment: dt.datetime | dt.date) -> dt.date:
+    return dt.date(moment.year, moment.month, 1)
+
+
+def crossed_thresholds(
+    limit_minor: int,
+    thresholds: tuple[int, ...],
+    spent_before: int,
+    spent_after: int,
+) -> list[int]:
+    """Thresholds whose amount lies in ``(spent_before, spent_after]``."""
+    crossed = []
+    for threshold in thresholds:
+        # Ceiling, so 80% of 10.01 is only reached at 8.01.
+        amount = -(-limit_minor * threshold // 100)
+        if spent_before < amount <= spent_after:
+            crossed.append(threshold)
+    return crossed
+
+
+def _budget_lookup(snapshot: WorkspaceSnapshot) -> dict[tuple[int, str], BudgetRef]:
+    lookup = snapshot.derived.get("budgets")
+    if lookup is None:
+        lookup = {(budget.category_id, budget.currency): budget for budget in snapshot.budgets}
+        snapshot.derived["budgets"] = lookup
+    return lookup
+
+
+async def record_budget_spends(
+    session: AsyncSession,
+    workspace: Workspace,
+    spends: dict[tuple[int, str, dt.date], int],
+) -> list[BudgetAlert]:
+    """Add (category_id, currency, month) spend to the budget counters; the caller commits.
+
+    Costs one dictionary lookup per unbudgeted key and one upsert per budgeted key,
+    independent of how many expenses the month already holds. The spent transactions
+    must already be written: a missing counter for a past month (a backdated expense) is
+    seeded from that month's transactions, which then include them.
+    """
+    if not spends:
+        return []
+    snapshot = await get_workspace_snapshot(session, workspace)
+    budgets = _budget_lookup(snapshot)
+    current = month_start(dt.datetime.now(dt.timezone.utc))
+    alerts: list[BudgetAlert] = []
+    for (category_id, currency, period), amount_minor in spends.items():
+        budget = budgets.get((category_id, currency))
+        if budget is None:
+            continue
+        seed = amount_minor
+        if period < current and not await _counter_exists(
+            session, workspace, category_id, currency, period
+        ):
+            seed = await _month_spend(session, workspace, category_id, currency, period)
+        stmt = upsert_insert(session, BudgetCounter).values(
+            workspace_id=workspace.id,
+            category_id=category_id,
+            currency=currency,
+            period=period,
+            spent_minor=seed,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["workspace_id", "category_id", "currency", "period"],
+            set_={
+                "spent_minor": BudgetCounter.spent_minor + amount_minor,
+                "updated_at": func.now(),
+            },
+        ).returning(BudgetCounter.spent_minor)
+        spent_after = (await session.execute(stmt)).scalar_one()
+
+        crossed = crossed_thresholds(
+            budget.limit_minor,
+            parse_thresholds(budget.thresholds),
+            spent_after - amount_minor,
+            spent_after,
+        )
+        if not crossed:
+            continue
+        category_name = next(
+            (category.name for category in snapshot.categories if category.id == category_id),
+            f"category:{category_id}",
+        )
+        recipients = tuple(member.tg_id for member in snapshot.members)
+        alerts.extend(
+            BudgetAlert(
+                workspace_id=workspace.id,
+                workspace_name=workspace.name,
+                category_name=category_name,
+                currency=currency,
+                limit_minor=budget.limit_minor,
+                spent_minor=spent_after,
+                threshold=threshold,
+                recipients=recipients,
+            )
+            for threshold in crossed
+        )
+    return alerts
+
+
+async def _counter_exists(
+    session: AsyncSession,
+    workspace: Workspace,
+    category_id: int,
+    currency: str,
+    period: dt.date,
+) -> bool:
+    result = await session.execute(
+        select(BudgetCounter.id).where(
+            BudgetCounter.workspace_id == workspace.id,
+            BudgetCounter.category_id == category_id,
+            BudgetCounter.currency == currency,
+            BudgetCounter.period == period,
+        )
+    )
+    return result.first() is not None
+
+
+async def _month_spend(
+    session: AsyncSession,
+    workspace: Workspace,
+    category_id: int,
+    currency: str,
+    period: dt.date,
+) -> int:
+    start = dt.datetime.combine(period, dt.time(), tzinfo=dt.timezone.utc)
+    end = dt.datetime.combine(
+        month_start(period + dt.timedelta(days=31)), dt.time(), tzinfo=dt.timezone.utc
+    )
+    result = await session.execute(
+        select(func.coalesce(func.sum(Transaction.amount_minor), 0)).where(
+            Transaction.workspace_id == workspace.id,
+            Transaction.type == TransactionType.expense,
+            Transaction.category_id == category_id,
+            Transaction.currency == currency,
+            Transaction.occurred_at >= start,
+            Transaction.occurred_at < end,
+        )
+    )
+    return int(result.scalar_one())
+
+
+async def set_budget(
+    session: AsyncSession,
+    workspace: Workspace,
+    category_id: int,
+    currency: str,
+    limit_minor: int,
+    thresholds: tuple[int, ...] = DEFAULT_THRESHOLDS,
+) -> None:
+    """Create or replace a monthly budget and seed its counter for the current month.
+
+    Counters only exist for budgeted categories, so the month so far is summed once here.
+    """
+    if limit_minor <= 0:
+        raise ValueError("Budget must be positive")
+    stmt = upsert_insert(session, Budget).values(
+        workspace_id=workspace.id,
+        category_id=category_id,
+        currency=currency,
+        limit_minor=limit_minor,
+        thresholds=format_thresholds(thresholds),
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["workspace_id", "category_id", "currency"],
+            set_={
+                "limit_minor": stmt.excluded.limit_minor,
+                "thresholds": stmt.excluded.thresholds,
+            },
+        )
+    )
+
+    period = month_start(dt.datetime.now(dt.timezone.utc))
+    spent = await _month_spend(session, workspace, category_id, currency, period)
+    counter = upsert_insert(session, BudgetCounter).values(
+        workspace_id=workspace.id,
+        category_id=category_id,
+        currency=currency,
+        period=period,
+        spent_minor=spent,
+    )
+    await session.execute(
+        counter.on_conflict_do_update(
+            index_elements=["workspace_id", "category_id", "currency", "period"],
+            set_={"spent_minor": counter.excluded.spent_minor, "updated_at": func.now()},
+        )
+    )
+    await bump_workspace_version(session, workspace)
+    await session.commit()
+
+
+async def list_budget_status(
+    session: AsyncSession,
+    workspace: Workspace,
+    period: dt.date | None = None,
+) -> list[BudgetStatus]:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    if not snapshot.budgets:
+        return []
+    if period is None:
+        period = month_start(dt.datetime.now(dt.timezone.utc))
+    result = await session.execute(
+        select(BudgetCounter.category_id, BudgetCounter.currency, BudgetCounter.spent_minor).where(
+            BudgetCounter.workspace_id == workspace.id,
+            BudgetCounter.period == period,
+        )
+    )
+    spent = {(category_id, currency): amount for category_id, currency, amount in result.all()}
+    names = {category.id: category.name for category in snapshot.categories}
+    statuses = [
+        BudgetStatus(
+            category_name=names.get(budget.category_id, f"category:{budget.category_id}"),
+            currency=budget.currency,
+            limit_minor=budget.limit_minor,
+            spent_minor=spent.get((budget.category_id, budget.currency), 0),
+            thresholds=parse_thresholds(budget.thresholds),
+        )
+        for budget in snapshot.budgets
+    ]
+    return sorted(statuses, key=lambda status: (status.category_name, status.currency))
+
+
+def format_budget_report(statuses: list[BudgetStatus]) -> str:
+    lines = ["Budgets this month:"]
+    for status in statuses:
+        percent = status.spent_minor * 100 // status.limit_minor
+        lines.append(
+            f"- {status.category_name}: {format_minor(status.spent_minor, status.currency)} / "
+            f"{format_minor(status.limit_minor, status.currency)} ({percent}%)"
+        )
+    return "\n".join(lines)
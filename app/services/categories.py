@@ -1,21 +1,160 @@
 from __future__ import annotations
 
+from collections import defaultdict
+
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Category, CategoryType, Workspace
+from app.services.snapshots import (
+    CategoryRef,
+    bump_workspace_version,
+    get_workspace_snapshot,
+)
+
+# Minimum trigram (Dice) similarity for a category to be offered as a suggestion.
+SUGGESTION_THRESHOLD = 0.3
+
+
+def clean_category_name(name: str) -> str:
+    return " ".join(name.split())
+
+
+def normalize_category_name(name: str) -> str:
+    # Matches lower(name) in SQL so cache and fallback queries agree.
+    return clean_category_name(name).lower()
+
+
+def _trigrams(normalized: str) -> set[str]:
+    padded = f"  {normalized} "
+    return {padded[idx : idx + 3] for idx in range(len(padded) - 2)}
+
+
+def _edit_distance(left: str, right: str, limit: int) -> int:
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds ``limit``."""
+    if abs(len(left) - len(right)) > limit:
+        return limit + 1
+    previous2: list[int] = []
+    previous = list(range(len(right) + 1))
+    for i, left_char in enumerate(left, start=1):
+        current = [i] + [0] * len(right)
+        for j, right_char in enumerate(right, start=1):
+            cost = 0 if left_char == right_char else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                i > 1
+                and j > 1
+                and left_char == right[j - 2]
+                and left[i - 2] == right_char
+            ):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def typo_tolerance(normalized: str) -> int:
+    """Edits allowed when resolving a typo; short names must match exactly."""
+    if len(normalized) < 5:
+        return 0
+    if len(normalized) < 9:
+        return 1
+    return 2
+
+
+class CategoryIndex:
+    """Normalized-name and trigram lookups over one workspace's categories."""
+
+    def __init__(self) -> None:
+        self._by_name: dict[tuple[CategoryType, str], CategoryRef] = {}
+        self._trigrams: dict[CategoryType, dict[str, set[str]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+
+    def add(self, ref: CategoryRef) -> None:
+        normalized = normalize_category_name(ref.name)
+        key = (ref.type, normalized)
+        existing = self._by_name.get(key)
+        # Legacy rows may differ only by case; the oldest one wins, like the unique lookup.
+        if existing is not None and existing.id <= ref.id:
+            return
+        self._by_name[key] = ref
+        grams = self._trigrams[ref.type]
+        for gram in _trigrams(normalized):
+            grams[gram].add(normalized)
+
+    def get(self, category_type: CategoryType, name: str) -> CategoryRef | None:
+        return self._by_name.get((category_type, normalize_category_name(name)))
+
+    def suggest(
+        self,
+        category_type: CategoryType,
+        name: str,
+        limit: int = 3,
+    ) -> list[CategoryRef]:
+        normalized = normalize_category_name(name)
+        query = _trigrams(normalized)
+        shared: dict[str, int] = defaultdict(int)
+        grams = self._trigrams.get(category_type, {})
+        for gram in query:
+            for candidate in grams.get(gram, ()):
+                shared[candidate] += 1
+        scored = []
+        for candidate, count in shared.items():
+            score = 2 * count / (len(query) + len(_trigrams(candidate)))
+            if score >= SUGGESTION_THRESHOLD:
+                scored.append((-score, candidate))
+        scored.sort()
+        return [self._by_name[(category_type, candidate)] for _, candidate in scored[:limit]]
+
+    def resolve_typo(self, category_type: CategoryType, name: str) -> CategoryRef | None:
+        """The single existing category within the typo tolerance of ``name``, if any."""
+        normalized = normalize_category_name(name)
+        limit = typo_tolerance(normalized)
+        if limit == 0:
+            return None
+        best: list[tuple[int, CategoryRef]] = []
+        for ref in self.suggest(category_type, normalized, limit=5):
+            distance = _edit_distance(normalized, normalize_category_name(ref.name), limit)
+            if distance <= limit:
+                best.append((distance, ref))
+        if not best:
+            return None
+        best.sort(key=lambda item: item[0])
+        if len(best) > 1 and best[0][0] == best[1][0]:
+            return None
+        return best[0][1]
+
+
+async def get_category_index(session: AsyncSession, workspace: Workspace) -> CategoryIndex:
+    """The category index of the workspace snapshot, built once per snapshot version."""
+    snapshot = await get_workspace_snapshot(session, workspace)
+    index = snapshot.derived.get("categories")
+    if index is None:
+        index = CategoryIndex()
+        for ref in snapshot.categories:
+            index.add(ref)
+        snapshot.derived["categories"] = index
+    return index
+
+
+def _ref(category: Category) -> CategoryRef:
+    return CategoryRef(id=category.id, name=category.name, type=category.type)
 
 
 async def list_categories(
     session: AsyncSession,
     workspace: Workspace,
     category_type: str | None = None,
-) -> list[Category]:
-    stmt = select(Category).where(Category.workspace_id == workspace.id)
-    if category_type:
-        stmt = stmt.where(Category.type == CategoryType(category_type))
-    result = await session.execute(stmt.order_by(Category.name))
-    return list(result.scalars().all())
+) -> list[CategoryRef]:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    categories = [
+        category
+        for category in snapshot.categories
+        if category_type is None or category.type == CategoryType(category_type)
+    ]
+    return sorted(categories, key=lambda category: (category.name, category.id))
 
 
 async def get_category_by_name(
@@ -25,11 +164,14 @@ async def get_category_by_name(
     category_type: str,
 ) -> Category | None:
     result = await session.execute(
-        select(Category).where(
+        select(Category)
+        .where(
             Category.workspace_id == workspace.id,
             Category.type == CategoryType(category_type),
-            func.lower(Category.name) == name.lower(),
+            func.lower(Category.name) == normalize_category_name(name),
         )
+        .order_by(Category.id)
+        .limit(1)
     )
     return result.scalar_one_or_none()
 
@@ -39,19 +181,42 @@ async def get_or_create_category(
     workspace: Workspace,
     name: str,
     category_type: str,
-) -> Category:
+    resolve_typos: bool = False,
+) -> CategoryRef:
+    """Resolve ``name`` to a category, tolerating case and spacing.
+
+    With ``resolve_typos`` (entering a transaction) a single existing category within
+    typo distance is used instead of creating a new one; explicit creation never guesses.
+    Known names never touch the database; unknown ones check the table (rows written
+    without a version bump) before a new category is added.
+    """
+    kind = CategoryType(category_type)
+    index = await get_category_index(session, workspace)
+    ref = index.get(kind, name)
+    if ref is not None:
+        return ref
+
     category = await get_category_by_name(session, workspace, name, category_type)
-    if category:
-        return category
+    if category is not None:
+        ref = _ref(category)
+        index.add(ref)
+        return ref
+
+    if resolve_typos:
+        ref = index.resolve_typo(kind, name)
+        if ref is not None:
+            return ref
+
     category = Category(
         workspace_id=workspace.id,
-        name=name,
-        type=CategoryType(category_type),
+        name=clean_category_name(name),
+        type=kind,
     )
     session.add(category)
+    await bump_workspace_version(session, workspace)
     await session.commit()
     await session.refresh(category)
-    return category
+    return _ref(category)
 
 
 async def ensure_default_categories(session: AsyncSession, workspace: Workspace) -> None:
@@ -59,17 +224,21 @@ async def ensure_default_categories(session: AsyncSession, workspace: Workspace)
         ("Other", "expense"),
         ("Other", "income"),
     ]
+    index = await get_category_index(session, workspace)
     created = False
     for name, category_type in defaults:
+        if index.get(CategoryType(category_type), name) is not None:
+            continue
         existing = await get_category_by_name(session, workspace, name, category_type)
         if existing is None:
             session.add(
                 Category(
                     workspace_id=workspace.id,
                     name=name,
-                type=CategoryType(category_type),
+                    type=CategoryType(category_type),
                 )
             )
             created = True
     if created:
+        await bump_workspace_version(session, workspace)
         await session.commit()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.invalidation import InvalidationEvent, bus
+from app.db.models import Workspace
+
+
+class DataVersionCache:
+    """Per-process view of ``workspaces.data_version`` and of each Telegram user's
+    active workspace, so conditional Mini App reads can be answered without a query.
+
+    Full reads record what they loaded; bumps from any process raise the cached version
+    through the invalidation bus. Versions only move forward, so a read that loaded an
+    older row never lowers what an event already reported. A stale user mapping is
+    harmless: switching workspaces bumps the previous one.
+    """
+
+    def __init__(self) -> None:
+        self._workspaces: dict[int, int] = {}
+        self._users: dict[int, int] = {}
+
+    def remember(self, tg_id: int, workspace: Workspace) -> None:
+        self._users[tg_id] = workspace.id
+        self._advance(workspace.id, workspace.data_version)
+
+    def current(self, tg_id: int) -> tuple[int, int] | None:
+        """``(workspace_id, data_version)`` of the user's active workspace, if known."""
+        workspace_id = self._users.get(tg_id)
+        if workspace_id is None:
+            return None
+        version = self._workspaces.get(workspace_id)
+        if version is None:
+            return None
+        return workspace_id, version
+
+    def _advance(self, workspace_id: int, version: int) -> None:
+        if version > self._workspaces.get(workspace_id, -1):
+            self._workspaces[workspace_id] = version
+
+    def clear(self) -> None:
+        self._workspaces.clear()
+        self._users.clear()
+
+    def on_event(self, event: InvalidationEvent) -> None:
+        self._advance(event.id, event.version)
+
+
+data_versions = DataVersionCache()
+bus.subscribe("workspace_data", data_versions.on_event, on_reset=data_versions.clear)
+
+
+async def bump_data_version(session: AsyncSession, workspace: Workspace) -> int:
+    """Advance the workspace data version inside the caller's transaction; the caller commits."""
+    version = (
+        await session.execute(
+            update(Workspace)
+            .where(Workspace.id == workspace.id)
+            .values(data_version=Workspace.data_version + 1)
+            .returning(Workspace.data_version)
+        )
+    ).scalar_one()
+    set_committed_value(workspace, "data_version", version)
+    await bus.publish(session, "workspace_data", workspace.id, version)
+    return version
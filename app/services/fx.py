@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import csv
+import datetime as dt
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import FxRate, Workspace
+from app.services.data_versions import bump_data_version
+from app.services.utils import CURRENCY_DECIMALS, normalize_currency
+
+# fx_rates.rate_to_base is NUMERIC(18, 8), so rates are exact integers at this scale.
+RATE_SCALE = 10**8
+RATE_QUANTUM = Decimal("0.00000001")
+# NUMERIC(18, 8) leaves ten digits before the decimal point.
+MAX_RATE = Decimal("9999999999.99999999")
+
+
+@dataclass
+class CurrencyRates:
+    dates: list[dt.date] = field(default_factory=list)
+    rates: list[int] = field(default_factory=list)
+
+    def rate_on(self, on_date: dt.date) -> int | None:
+        """Latest scaled rate published on or before ``on_date``."""
+        idx = bisect_right(self.dates, on_date)
+        if idx == 0:
+            return None
+        return self.rates[idx - 1]
+
+
+@dataclass
+class WorkspaceRates:
+    stamp: int | None
+    currencies: dict[str, CurrencyRates]
+
+    def rate_on(self, currency: str, base_currency: str, on_date: dt.date) -> int | None:
+        if currency == base_currency:
+            return RATE_SCALE
+        rates = self.currencies.get(currency)
+        if rates is None:
+            return None
+        return rates.rate_on(on_date)
+
+
+class FxRateCache:
+    """Per-process, date-indexed rate tables keyed by workspace.
+
+    A cached table is reused while the workspace's newest ``fx_rates`` id is unchanged;
+    ``set_rate`` always writes a fresh row, so any process picks up new rates on its next
+    lookup.
+    """
+
+    def __init__(self) -> None:
+        self._workspaces: dict[int, WorkspaceRates] = {}
+
+    async def get(self, session: AsyncSession, workspace_id: int) -> WorkspaceRates:
+        stamp = (
+            await session.execute(
+                select(func.max(FxRate.id)).where(FxRate.workspace_id == workspace_id)
+            )
+        ).scalar_one_or_none()
+        cached = self._workspaces.get(workspace_id)
+        if cached is not None and cached.stamp == stamp:
+            return cached
+
+        result = await session.execute(
+            select(FxRate.quote_currency, FxRate.rate_date, FxRate.rate_to_base)
+            .where(FxRate.workspace_id == workspace_id)
+            .order_by(FxRate.quote_currency, FxRate.rate_date)
+        )
+        currencies: dict[str, CurrencyRates] = {}
+        for currency, rate_date, rate in result.all():
+            table = currencies.setdefault(currency, CurrencyRates())
+            table.dates.append(rate_date)
+            table.rates.append(scale_rate(rate))
+        cached = WorkspaceRates(stamp=stamp, currencies=currencies)
+        self._workspaces[workspace_id] = cached
+        return cached
+
+    def invalidate(self, workspace_id: int) -> None:
+        self._workspaces.pop(workspace_id, None)
+
+    def clear(self) -> None:
+        self._workspaces.clear()
+
+
+rate_cache = FxRateCache()
+
+
+def scale_rate(rate: Decimal) -> int:
+    return int(Decimal(rate).scaleb(8).to_integral_value())
+
+
+def _conversion_factors(currency: str, base_currency: str, rate: int) -> tuple[int, int]:
+    numerator = rate * 10 ** CURRENCY_DECIMALS.get(base_currency, 2)
+    denominator = RATE_SCALE * 10 ** CURRENCY_DECIMALS.get(currency, 2)
+    return numerator, denominator
+
+
+def _round_div(numerator: int, denominator: int) -> int:
+    """Integer division rounding half away from zero."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def convert_minor(amount_minor: int, currency: str, base_currency: str, rate: int) -> int:
+    numerator, denominator = _conversion_factors(currency, base_currency, rate)
+    return _round_div(amount_minor * numerator, denominator)
+
+
+def convert_many(
+    amounts: dict[int, int],
+    currency: str,
+    base_currency: str,
+    rate: int,
+) -> dict[int, int]:
+    """Convert a block of amounts so the converted total equals the converted sum.
+
+    Floors every amount, then hands the leftover minor units to the largest remainders,
+    which keeps a zero-sum balance block zero-sum after conversion.
+    """
+    numerator, denominator = _conversion_factors(currency, base_currency, rate)
+    converted: dict[int, int] = {}
+    remainders: list[tuple[int, int]] = []
+    for key, amount in amounts.items():
+        quotient, remainder = divmod(amount * numerator, denominator)
+        converted[key] = quotient
+        remainders.append((-remainder, key))
+    target = _round_div(sum(amounts.values()) * numerator, denominator)
+    leftover = target - sum(converted.values())
+    for _, key in sorted(remainders)[:leftover]:
+        converted[key] += 1
+    return converted
+
+
+def consolidate_balances(
+    balances: dict[str, dict[int, int]],
+    rates: WorkspaceRates,
+    base_currency: str,
+    on_date: dt.date,
+) -> tuple[dict[int, int], list[str]]:
+    """Net per-currency balances into ``base_currency``.
+
+    Returns the consolidated balances and the currencies skipped for lack of a rate.
+    """
+    consolidated: dict[int, int] = {}
+    missing: list[str] = []
+    for currency, currency_balances in balances.items():
+        rate = rates.rate_on(currency, base_currency, on_date)
+        if rate is None:
+            missing.append(currency)
+            continue
+        for user_id, amount in convert_many(
+            dict(currency_balances), currency, base_currency, rate
+        ).items():
+            consolidated[user_id] = consolidated.get(user_id, 0) + amount
+    return consolidated, missing
+
+
+def parse_rate(raw: str) -> Decimal:
+    try:
+        rate = Decimal(raw.replace(",", "."))
+    except InvalidOperation as exc:
+        raise ValueError("Invalid rate") from exc
+    if not rate.is_finite():
+        raise ValueError("Rate must be positive")
+    try:
+        rate = rate.quantize(RATE_QUANTUM)
+    except InvalidOperation as exc:
+        raise ValueError("Rate is too large") from exc
+    # Checked after rounding: a tiny positive rate would otherwise be stored as zero.
+    if rate <= 0:
+        raise ValueError("Rate must be positive")
+    if rate > MAX_RATE:
+        raise ValueError("Rate is too large")
+    return rate
+
+
+async def set_rates(
+    session: AsyncSession,
+    workspace: Workspace,
+    rows: list[tuple[dt.date, str, Decimal]],
+) -> int:
+    """Store (rate_date, quote_currency, rate_to_base) rows, replacing same-day rates."""
+    if not rows:
+        return 0
+    latest = {(rate_date, normalize_currency(currency)): rate for rate_date, currency, rate in rows}
+    for rate_date, currency in latest:
+        await session.execute(
+            delete(FxRate).where(
+                FxRate.workspace_id == workspace.id,
+                FxRate.rate_date == rate_date,
+                FxRate.quote_currency == currency,
+            )
+        )
+    await session.execute(
+        insert(FxRate),
+        [
+            {
+                "workspace_id": workspace.id,
+                "rate_date": rate_date,
+                "quote_currency": currency,
+                "rate_to_base": rate,
+            }
+            for (rate_date, currency), rate in latest.items()
+        ],
+    )
+    await bump_data_version(session, workspace)
+    await session.commit()
+    rate_cache.invalidate(workspace.id)
+    return len(latest)
+
+
+async def set_rate(
+    session: AsyncSession,
+    workspace: Workspace,
+    currency: str,
+    rate: Decimal,
+    rate_date: dt.date | None = None,
+) -> None:
+    if rate_date is None:
+        rate_date = dt.datetime.now(dt.timezone.utc).date()
+    await set_rates(session, workspace, [(rate_date, currency, rate)])
+
+
+def read_rates_csv(path: Path) -> list[tuple[dt.date, str, Decimal]]:
+    """Read ``date,currency,rate`` rows (ISO dates; a header row is optional)."""
+    rows = []
+    with path.open(newline="") as handle:
+        for line_no, record in enumerate(csv.reader(handle), start=1):
+            if not record or record[0].strip().lower() in {"date", "rate_date"}:
+                continue
+            if len(record) < 3:
+                raise ValueError(f"{path}:{line_no}: expected date,currency,rate")
+            try:
+                rate_date = dt.date.fromisoformat(record[0].strip())
+            except ValueError as exc:
+                raise ValueError(f"{path}:{line_no}: invalid date {record[0]!r}") from exc
+            rows.append((rate_date, normalize_currency(record[1]), parse_rate(record[2].strip())))
+    return rows
+
+
+async def load_rates_csv(session: AsyncSession, workspace: Workspace, path: Path) -> int:
+    return await set_rates(session, workspace, read_rates_csv(path))
+
+
+async def latest_rates(session: AsyncSession, workspace: Workspace) -> dict[str, tuple[dt.date, int]]:
+    rates = await rate_cache.get(session, workspace.id)
+    return {
+        currency: (table.dates[-1], table.rates[-1])
+        for currency, table in sorted(rates.currencies.items())
+        if table.dates
+    }
+
+
+def format_rate(rate: int) -> str:
+    return f"{Decimal(rate).scaleb(-8).normalize():f}"
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import JournalEvent, JournalSnapshot, Transaction, Workspace
+from app.services.balance import split_balance_deltas
+from app.services.utils import as_utc
+
+EXPENSE_CREATED = "ExpenseCreated"
+INCOME_CREATED = "IncomeCreated"
+TRANSFER_RECORDED = "TransferRecorded"
+MEMBER_JOINED = "MemberJoined"
+WEIGHT_CHANGED = "WeightChanged"
+
+# Replayed events after which a rebuild stores a fresh snapshot.
+SNAPSHOT_EVERY = 500
+# Only events older than this go into a snapshot: ids are assigned at insert time, so a
+# younger event may still be followed by a lower id from a transaction not yet committed.
+SNAPSHOT_LAG = dt.timedelta(minutes=1)
+
+# "YYYY-MM" -> currency -> category id (0 = uncategorized) -> total
+MonthlyTotals = dict[str, dict[str, dict[int, int]]]
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    type: str
+    payload: dict[str, Any]
+
+
+def _month(moment: dt.datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+
+def expense_created(
+    tx: Transaction,
+    user_ids: Sequence[int],
+    amounts: Sequence[int],
+) -> DomainEvent:
+    return DomainEvent(
+        EXPENSE_CREATED,
+        {
+            "tx_id": tx.id,
+            "payer_id": tx.created_by,
+            "amount_minor": tx.amount_minor,
+            "currency": tx.currency,
+            "category_id": tx.category_id,
+            "month": _month(tx.occurred_at),
+            "user_ids": list(user_ids),
+            "amounts": list(amounts),
+        },
+    )
+
+
+def income_created(tx: Transaction) -> DomainEvent:
+    return DomainEvent(
+        INCOME_CREATED,
+        {
+            "tx_id": tx.id,
+            "recipient_id": tx.created_by,
+            "amount_minor": tx.amount_minor,
+            "currency": tx.currency,
+            "category_id": tx.category_id,
+            "month": _month(tx.occurred_at),
+        },
+    )
+
+
+def transfer_recorded(tx: Transaction, payee_id: int) -> DomainEvent:
+    """A payment between members (settlement or personal-to-personal transfer)."""
+    return DomainEvent(
+        TRANSFER_RECORDED,
+        {
+            "tx_id": tx.id,
+            "payer_id": tx.created_by,
+            "payee_id": payee_id,
+            "amount_minor": tx.amount_minor,
+            "currency": tx.currency,
+        },
+    )
+
+
+def member_joined(user_id: int, share_weight: int) -> DomainEvent:
+    return DomainEvent(MEMBER_JOINED, {"user_id": user_id, "share_weight": share_weight})
+
+
+def weight_changed(user_id: int, share_weight: int) -> DomainEvent:
+    return DomainEvent(WEIGHT_CHANGED, {"user_id": user_id, "share_weight": share_weight})
+
+
+async def append_events(
+    session: AsyncSession,
+    workspace_id: int,
+    events: list[DomainEvent],
+) -> None:
+    """Append events in the caller's transaction; the caller commits."""
+    if not events:
+        return
+    await session.execute(
+        insert(JournalEvent),
+        [
+            {
+                "workspace_id": workspace_id,
+                "type": event.type,
+                "payload": json.dumps(event.payload, separators=(",", ":")),
+            }
+            for event in events
+        ],
+    )
+
+
+def _add(totals: dict[int, int], key: int, amount_minor: int) -> None:
+    totals[key] = totals.get(key, 0) + amount_minor
+
+
+@dataclass
+class JournalState:
+    """Balances, monthly totals and share weights derived from a workspace's journal."""
+
+    last_event_id: int = 0
+    # currency -> user_id -> balance
+    balances: dict[str, dict[int, int]] = field(default_factory=dict)
+    expenses: MonthlyTotals = field(default_factory=dict)
+    income: MonthlyTotals = field(default_factory=dict)
+    weights: dict[int, int] = field(default_factory=dict)
+
+    def apply(self, event_id: int, event_type: str, payload: dict[str, Any]) -> None:
+        if event_type == EXPENSE_CREATED:
+            if "shares" in payload:
+                # Events written before shares were stored as columns.
+                shares = [(user_id, amount) for user_id, amount in payload["shares"]]
+            else:
+                shares = zip(payload["user_ids"], payload["amounts"], strict=True)
+            balances = self.balances.setdefault(payload["currency"], {})
+            for user_id, delta in split_balance_deltas(payload["payer_id"], shares).items():
+                _add(balances, user_id, delta)
+            self._add_total(self.expenses, payload)
+        elif event_type == INCOME_CREATED:
+            self._add_total(self.income, payload)
+        elif event_type == TRANSFER_RECORDED:
+            balances = self.balances.setdefault(payload["currency"], {})
+            _add(balances, payload["payer_id"], payload["amount_minor"])
+            _add(balances, payload["payee_id"], -payload["amount_minor"])
+        elif event_type in (MEMBER_JOINED, WEIGHT_CHANGED):
+            self.weights[payload["user_id"]] = payload["share_weight"]
+        self.last_event_id = event_id
+
+    @staticmethod
+    def _add_total(totals: MonthlyTotals, payload: dict[str, Any]) -> None:
+        month = totals.setdefault(payload["month"], {})
+        _add(
+            month.setdefault(payload["currency"], {}),
+            payload["category_id"] or 0,
+            payload["amount_minor"],
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "last_event_id": self.last_event_id,
+                "balances": self.balances,
+                "expenses": self.expenses,
+                "income": self.income,
+                "weights": self.weights,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> JournalState:
+        data = json.loads(raw)
+
+        def ints(mapping: dict[str, int]) -> dict[int, int]:
+            return {int(key): value for key, value in mapping.items()}
+
+        def totals(months: dict[str, dict[str, dict[str, int]]]) -> MonthlyTotals:
+            return {
+                month: {currency: ints(values) for currency, values in currencies.items()}
+                for month, currencies in months.items()
+            }
+
+        return cls(
+            last_event_id=data["last_event_id"],
+            balances={currency: ints(values) for currency, values in data["balances"].items()},
+            expenses=totals(data["expenses"]),
+            income=totals(data["income"]),
+            weights=ints(data["weights"]),
+        )
+
+
+def start_journal(session: AsyncSession, workspace_id: int) -> None:
+    """Store the empty snapshot a new workspace's replay starts from; the caller commits."""
+    session.add(
+        JournalSnapshot(workspace_id=workspace_id, last_event_id=0, state=JournalState().to_json())
+    )
+
+
+async def rebuild_state(
+    session: AsyncSession,
+    workspace: Workspace,
+    snapshot_every: int = SNAPSHOT_EVERY,
+    snapshot_lag: dt.timedelta = SNAPSHOT_LAG,
+) -> JournalState:
+    """Derived state from the latest snapshot plus the events after it.
+
+    When the replayed tail is ``snapshot_every`` events or longer, the state as of the
+    last event older than ``snapshot_lag`` is stored as the new snapshot in the caller's
+    transaction; once the caller commits, the next rebuild replays only what happened since.
+
+    Every workspace has a snapshot to start from: new ones get an empty one and the
+    0018 migration stored the state of older ones, whose early history the journal never
+    saw. Without one this raises ``ValueError`` rather than replay part of the history.
+    """
+    snapshot = (
+        await session.execute(
+            select(JournalSnapshot.state)
+            .where(JournalSnapshot.workspace_id == workspace.id)
+            .order_by(JournalSnapshot.last_event_id.desc())
+            .limit(1)
+        )
+    ).scalar_one_or_none()
+    if snapshot is None:
+        raise ValueError("Workspace has no journal snapshot")
+    state = JournalState.from_json(snapshot)
+
+    result = await session.execute(
+        select(JournalEvent.id, JournalEvent.type, JournalEvent.payload, JournalEvent.created_at)
+        .where(JournalEvent.workspace_id == workspace.id, JournalEvent.id > state.last_event_id)
+        .order_by(JournalEvent.id)
+    )
+    tail = result.all()
+    cutoff = dt.datetime.now(dt.timezone.utc) - snapshot_lag
+    settled = len(tail)
+    while settled and as_utc(tail[settled - 1].created_at) > cutoff:
+        settled -= 1
+
+    for event_id, event_type, payload, _ in tail[:settled]:
+        state.apply(event_id, event_type, json.loads(payload))
+    if settled and settled >= snapshot_every:
+        session.add(
+            JournalSnapshot(
+                workspace_id=workspace.id,
+                last_event_id=state.last_event_id,
+                state=state.to_json(),
+            )
+        )
+        await session.execute(
+            delete(JournalSnapshot).where(
+                JournalSnapshot.workspace_id == workspace.id,
+                JournalSnapshot.last_event_id < state.last_event_id,
+            )
+        )
+    for event_id, event_type, payload, _ in tail[settled:]:
+        state.apply(event_id, event_type, json.loads(payload))
+    return state
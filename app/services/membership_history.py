@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import datetime as dt
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.models import MembershipHistory, Workspace
+from app.services.snapshots import get_workspace_snapshot
+from app.services.splits import CompiledSplit, weighted_split
+from app.services.utils import as_utc
+
+
+@dataclass(frozen=True)
+class MembershipInterval:
+    user_id: int
+    share_weight: int
+    valid_from_version: int
+    valid_to_version: int | None
+    valid_from: dt.datetime
+    valid_to: dt.datetime | None
+
+
+async def record_membership_change(
+    session: AsyncSession,
+    workspace: Workspace,
+    user_id: int,
+    share_weight: int | None,
+    now: dt.datetime | None = None,
+) -> int:
+    """Advance the membership version for a join or weight change; the caller commits.
+
+    The member's open interval is closed at the new version and, unless ``share_weight``
+    is None (the member left), a new one opens with the given weight.
+    """
+    if now is None:
+        now = dt.datetime.now(dt.timezone.utc)
+    version = (
+        await session.execute(
+            update(Workspace)
+            .where(Workspace.id == workspace.id)
+            .values(membership_version=Workspace.membership_version + 1)
+            .returning(Workspace.membership_version)
+        )
+    ).scalar_one()
+    set_committed_value(workspace, "membership_version", version)
+    await session.execute(
+        update(MembershipHistory)
+        .where(
+            MembershipHistory.workspace_id == workspace.id,
+            MembershipHistory.user_id == user_id,
+            MembershipHistory.valid_to_version.is_(None),
+        )
+        .values(valid_to_version=version, valid_to=now)
+    )
+    if share_weight is not None:
+        session.add(
+            MembershipHistory(
+                workspace_id=workspace.id,
+                user_id=user_id,
+                share_weight=share_weight,
+                valid_from_version=version,
+                valid_from=now,
+            )
+        )
+    return version
+
+
+class MembershipTimeline:
+    """Interval index over a workspace's membership history.
+
+    Each member holds a sorted list of non-overlapping version intervals, so the weights
+    at a version cost one binary search per member, and the version in force at a moment
+    one binary search over the version start times. Compiled splits are cached per
+    version, so replaying a whole epoch of expenses compiles its weights once.
+    """
+
+    def __init__(self, intervals: Iterable[MembershipInterval]) -> None:
+        self._members: dict[int, list[MembershipInterval]] = {}
+        starts: dict[int, dt.datetime] = {}
+        for interval in sorted(intervals, key=lambda item: item.valid_from_version):
+            self._members.setdefault(interval.user_id, []).append(interval)
+            starts.setdefault(interval.valid_from_version, as_utc(interval.valid_from))
+            if interval.valid_to_version is not None and interval.valid_to is not None:
+                starts.setdefault(interval.valid_to_version, as_utc(interval.valid_to))
+        self._user_ids = sorted(self._members)
+        self._member_starts = {
+            user_id: [interval.valid_from_version for interval in history]
+            for user_id, history in self._members.items()
+        }
+        self._versions = sorted(starts)
+        # Clocks of different processes may disagree; keep start times non-decreasing.
+        self._times: list[dt.datetime] = []
+        for version in self._versions:
+            moment = starts[version]
+            if self._times and moment < self._times[-1]:
+                moment = self._times[-1]
+            self._times.append(moment)
+        self._splits: dict[int, CompiledSplit | None] = {}
+
+    def weights_at(self, version: int) -> dict[int, int]:
+        weights = {}
+        for user_id in self._user_ids:
+            idx = bisect_right(self._member_starts[user_id], version) - 1
+            if idx < 0:
+                continue
+            interval = self._members[user_id][idx]
+            if interval.valid_to_version is None or version < interval.valid_to_version:
+                weights[user_id] = interval.share_weight
+        return weights
+
+    def version_at(self, moment: dt.datetime) -> int | None:
+        """The version in force at ``moment``; None before the first recorded change."""
+        idx = bisect_right(self._times, as_utc(moment)) - 1
+        return self._versions[idx] if idx >= 0 else None
+
+    def split(self, version: int) -> CompiledSplit | None:
+        """The default weighted split of ``version``; None if nobody was a member."""
+        if version not in self._splits:
+            self._splits[version] = weighted_split(self.weights_at(version))
+        return self._splits[version]
+
+
+async def load_membership_timeline(
+    session: AsyncSession,
+    workspace_id: int,
+) -> MembershipTimeline:
+    result = await session.execute(
+        select(
+            MembershipHistory.user_id,
+            MembershipHistory.share_weight,
+            MembershipHistory.valid_from_version,
+            MembershipHistory.valid_to_version,
+            MembershipHistory.valid_from,
+            MembershipHistory.valid_to,
+        ).where(MembershipHistory.workspace_id == workspace_id)
+    )
+    return MembershipTimeline(MembershipInterval(*row) for row in result.all())
+
+
+async def get_membership_timeline(
+    session: AsyncSession,
+    workspace: Workspace,
+) -> MembershipTimeline:
+    """The workspace's timeline, loaded once per snapshot version.
+
+    Every membership change bumps the workspace version, so the cached index never
+    misses a version.
+    """
+    snapshot = await get_workspace_snapshot(session, workspace)
+    timeline = snapshot.derived.get("membership_timeline")
+    if timeline is None:
+        timeline = await load_membership_timeline(session, workspace.id)
+        snapshot.derived["membership_timeline"] = timeline
+    return timeline
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+# Oldest alert batches are dropped beyond this while delivery is stuck.
+MAX_QUEUED = 10_000
+
+
+class Alert(Protocol):
+    recipients: tuple[int, ...]
+
+    def message(self) -> str: ...
+
+
+AlertHandler = Callable[[Sequence[Alert]], Awaitable[None]]
+
+
+class AlertNotifier:
+    """Hands user-facing alerts to whoever can deliver them (the bot, in practice).
+
+    Once started, ``notify`` only queues the alerts and a background task delivers them,
+    so a slow Bot API call never holds up the request that raised them. Without the task
+    (scripts, tests) alerts are delivered inline.
+    """
+
+    def __init__(self, max_queued: int = MAX_QUEUED) -> None:
+        self.dropped = 0
+        self._handlers: list[AlertHandler] = []
+        self._queue: deque[Sequence[Alert]] = deque()
+        self._max_queued = max_queued
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def subscribe(self, handler: AlertHandler) -> None:
+        self._handlers.append(handler)
+
+    def unsubscribe(self, handler: AlertHandler) -> None:
+        self._handlers.remove(handler)
+
+    async def notify(self, alerts: Sequence[Alert]) -> None:
+        if self._wakeup is None:
+            await self._deliver(alerts)
+            return
+        self._queue.append(alerts)
+        while len(self._queue) > self._max_queued:
+            self._queue.popleft()
+            self.dropped += 1
+        self._wakeup.set()
+
+    async def _deliver(self, alerts: Sequence[Alert]) -> None:
+        for handler in list(self._handlers):
+            try:
+                await handler(alerts)
+            except Exception:
+                logger.exception("Alert delivery failed")
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                await self._deliver(self._queue.popleft())
+            if self._stopping:
+                return
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Deliver what is queued, then stop the background task."""
+        if self._task is None:
+            return
+        assert self._wakeup is not None
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        self._wakeup = None
+
+    def clear(self) -> None:
+        self._queue.clear()
+        self.dropped = 0
+
+
+alert_notifier = AlertNotifier()
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import calendar
+import datetime as dt
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models import RecurrenceInterval, RecurringRule, Transaction, User, Workspace
+from app.services.notifications import Alert, alert_notifier
+from app.services.snapshots import WalletRef
+from app.services.transactions import ExpenseDraft, audit_expenses, insert_expenses
+from app.services.utils import as_utc
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+# Runs materialized per rule and pass; a longer backlog continues in the next pass.
+MAX_RUNS_PER_RULE = 400
+POLL_INTERVAL_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class RecurringRunResult:
+    rules: int
+    expenses: int
+    backlog: bool
+
+
+def next_occurrence(
+    moment: dt.datetime,
+    interval: RecurrenceInterval,
+    anchor_day: int,
+) -> dt.datetime:
+    if interval == RecurrenceInterval.daily:
+        return moment + dt.timedelta(days=1)
+    if interval == RecurrenceInterval.weekly:
+        return moment + dt.timedelta(weeks=1)
+    year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+    day = min(anchor_day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+def due_occurrences(
+    next_run_at: dt.datetime,
+    interval: RecurrenceInterval,
+    anchor_day: int,
+    now: dt.datetime,
+    limit: int = MAX_RUNS_PER_RULE,
+) -> tuple[list[dt.datetime], dt.datetime]:
+    """Every run due by ``now`` (at most ``limit``) and the run after them."""
+    runs = []
+    moment = as_utc(next_run_at)
+    while moment <= now and len(runs) < limit:
+        runs.append(moment)
+        moment = next_occurrence(moment, interval, anchor_day)
+    return runs, moment
+
+
+async def create_recurring_rule(
+    session: AsyncSession,
+    workspace: Workspace,
+    wallet: WalletRef,
+    payer: User,
+    amount_minor: int,
+    currency: str,
+    category_id: int | None,
+    note: str | None,
+    interval: str,
+    start_at: dt.datetime | None = None,
+) -> RecurringRule:
+    if amount_minor <= 0:
+        raise ValueError("Amount must be positive")
+    start_at = as_utc(start_at or dt.datetime.now(dt.timezone.utc))
+    rule = RecurringRule(
+        workspace_id=workspace.id,
+        wallet_id=wallet.id,
+        category_id=category_id,
+        payer_id=payer.id,
+        amount_minor=amount_minor,
+        currency=currency,
+        note=note,
+        interval=RecurrenceInterval(interval),
+        anchor_day=start_at.day,
+        next_run_at=start_at,
+    )
+    session.add(rule)
+    await session.commit()
+    await session.refresh(rule)
+    return rule
+
+
+async def list_recurring_rules(
+    session: AsyncSession,
+    workspace: Workspace,
+) -> list[RecurringRule]:
+    result = await session.execute(
+        select(RecurringRule)
+        .where(RecurringRule.workspace_id == workspace.id, RecurringRule.is_active.is_(True))
+        .order_by(RecurringRule.id)
+    )
+    return list(result.scalars().all())
+
+
+async def stop_recurring_rule(
+    session: AsyncSession,
+    workspace: Workspace,
+    rule_id: int,
+) -> bool:
+    result = await session.execute(
+        select(RecurringRule).where(
+            RecurringRule.workspace_id == workspace.id,
+            RecurringRule.id == rule_id,
+            RecurringRule.is_active.is_(True),
+        )
+    )
+    rule = result.scalar_one_or_none()
+    if rule is None:
+        return False
+    rule.is_active = False
+    await session.commit()
+    return True
+
+
+async def run_due_rules(
+    session: AsyncSession,
+    now: dt.datetime | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> RecurringRunResult:
+    """Materialize every due run of up to ``batch_size`` rules in one transaction.
+
+    Rules are claimed with ``FOR UPDATE SKIP LOCKED``, so concurrent replicas take
+    disjoint batches, and each rule's ``next_run_at`` advances in the same commit as its
+    expenses, so a run is never created twice. Missed runs after downtime are inserted
+    together through the bulk expense path, dated at their scheduled time.
+    """
+    now = as_utc(now or dt.datetime.now(dt.timezone.utc))
+    result = await session.execute(
+        select(RecurringRule)
+        .where(RecurringRule.is_active.is_(True), RecurringRule.next_run_at <= now)
+        .order_by(RecurringRule.next_run_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rules = list(result.scalars().all())
+    if not rules:
+        await session.rollback()
+        return RecurringRunResult(rules=0, expenses=0, backlog=False)
+
+    drafts: dict[int, list[ExpenseDraft]] = defaultdict(list)
+    backlog = False
+    for rule in rules:
+        runs, next_run_at = due_occurrences(
+            rule.next_run_at, rule.interval, rule.anchor_day, now
+        )
+        drafts[rule.workspace_id].extend(
+            ExpenseDraft(
+                wallet_id=rule.wallet_id,
+                amount_minor=rule.amount_minor,
+                currency=rule.currency,
+                note=rule.note,
+                payer_id=rule.payer_id,
+                category_id=rule.category_id,
+                occurred_at=run,
+            )
+            for run in runs
+        )
+        rule.next_run_at = next_run_at
+        backlog = backlog or next_run_at <= now
+
+    # A fixed order keeps the row locks of concurrent runners in the same order.
+    workspaces = await session.execute(
+        select(Workspace).where(Workspace.id.in_(drafts)).order_by(Workspace.id)
+    )
+    created: list[Transaction] = []
+    alerts: list[Alert] = []
+    for workspace in workspaces.scalars():
+        # Scheduled runs are expected repeats, so they skip the anomaly detector.
+        txs, workspace_alerts = await insert_expenses(
+            session, workspace, drafts[workspace.id], screen=False
+        )
+        created.extend(txs)
+        alerts.extend(workspace_alerts)
+    await session.commit()
+    audit_expenses(created)
+    if alerts:
+        await alert_notifier.notify(alerts)
+    return RecurringRunResult(rules=len(rules), expenses=len(created), backlog=backlog)
+
+
+class RecurringScheduler:
+    """Polls for due recurring rules and drains them batch by batch."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self._session_factory = session_factory
+        self._poll_interval = poll_interval
+        self._batch_size = batch_size
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self, now: dt.datetime | None = None) -> int:
+        created = 0
+        while True:
+            async with self._session_factory() as session:
+                result = await run_due_rules(session, now, self._batch_size)
+            created += result.expenses
+            if result.rules < self._batch_size and not result.backlog:
+                return created
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                created = await self.run_once()
+                if created:
+                    logger.info("Recurring scheduler created %s expenses", created)
+            except Exception:
+                logger.exception("Recurring scheduler pass failed")
+            await asyncio.sleep(self._poll_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
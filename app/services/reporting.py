@@ -6,6 +6,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Category, Transaction, TransactionType, Workspace
+from app.services.fx import convert_minor, rate_cache
 from app.services.utils import format_minor
 
 
@@ -59,4 +60,19 @@ async def monthly_expense_report(
             current_currency = currency
             lines.append(f"{currency}:")
         lines.append(f"- {category}: {format_minor(int(total_minor), currency)}")
+
+    base_currency = workspace.base_currency
+    if any(currency != base_currency for _, currency, _ in rows):
+        rates = await rate_cache.get(session, workspace.id)
+        total_base = 0
+        missing: set[str] = set()
+        for _, currency, total_minor in rows:
+            rate = rates.rate_on(currency, base_currency, now.date())
+            if rate is None:
+                missing.add(currency)
+                continue
+            total_base += convert_minor(int(total_minor), currency, base_currency, rate)
+        lines.append(f"Total in {base_currency}: {format_minor(total_base, base_currency)}")
+        if missing:
+            lines.append(f"(no FX rate for {', '.join(sorted(missing))}; set one with /fx)")
     return "\n".join(lines)
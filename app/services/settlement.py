@@ -1,27 +1,180 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
 from decimal import Decimal, ROUND_HALF_UP
 
+# Above this many open positions the exact 2^n subset DP gets too slow for a
+# request path, so the solver falls back to the greedy heuristic.
+EXACT_SOLVER_LIMIT = 12
+
+
+@dataclass(frozen=True)
+class Transfer:
+    from_user: int
+    to_user: int
+    amount_minor: int
+
 
 def quantize(value: Decimal) -> Decimal:
     return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
 
-def simplify_settlements(net_balances: dict[int, Decimal]) -> list[dict]:
-    debtors = sorted([(u, -b) for u, b in net_balances.items() if b < 0], key=lambda x: x[0])
-    creditors = sorted([(u, b) for u, b in net_balances.items() if b > 0], key=lambda x: x[0])
+def _settle_group(positions: list[tuple[int, int]]) -> list[Transfer]:
+    """Pair debtors and creditors of one zero-sum group by user id.
+
+    Every step closes at least one side, so a group of k members needs at most k - 1
+    transfers.
+    """
+    debtors = [[user_id, -amount] for user_id, amount in positions if amount < 0]
+    creditors = [[user_id, amount] for user_id, amount in positions if amount > 0]
+    transfers = []
     i = j = 0
-    settlements = []
     while i < len(debtors) and j < len(creditors):
-        debtor, debt = debtors[i]
-        creditor, credit = creditors[j]
-        amount = quantize(min(debt, credit))
-        if amount > 0:
-            settlements.append({'from_user': debtor, 'to_user': creditor, 'amount': amount})
-        debt = quantize(debt - amount)
-        credit = quantize(credit - amount)
-        debtors[i] = (debtor, debt)
-        creditors[j] = (creditor, credit)
-        if debt == 0:
+        amount = min(debtors[i][1], creditors[j][1])
+        transfers.append(Transfer(debtors[i][0], creditors[j][0], amount))
+        debtors[i][1] -= amount
+        creditors[j][1] -= amount
+        if debtors[i][1] == 0:
             i += 1
-        if credit == 0:
+        if creditors[j][1] == 0:
             j += 1
-    return settlements
+    return transfers
+
+
+def _split_opposite_pairs(
+    positions: list[tuple[int, int]],
+) -> tuple[list[list[tuple[int, int]]], list[tuple[int, int]]]:
+    """Peel off pairs with equal and opposite balances.
+
+    Such a pair is always a group in some optimal partition, and removing it shrinks the
+    exponential search.
+    """
+    open_debts: dict[int, list[tuple[int, int]]] = {}
+    for user_id, amount in positions:
+        if amount < 0:
+            open_debts.setdefault(-amount, []).append((user_id, amount))
+    pairs = []
+    rest = []
+    for user_id, amount in positions:
+        if amount > 0 and open_debts.get(amount):
+            debtor = open_debts[amount].pop(0)
+            pairs.append(sorted([debtor, (user_id, amount)]))
+        elif amount > 0:
+            rest.append((user_id, amount))
+    for debtors in open_debts.values():
+        rest.extend(debtors)
+    rest.sort()
+    return pairs, rest
+
+
+def _exact_zero_sum_groups(positions: list[tuple[int, int]]) -> list[list[tuple[int, int]]]:
+    """Partition positions into the maximum number of zero-sum groups (bitmask DP).
+
+    With g groups the settlement needs n - g transfers, which is the optimum.
+    """
+    n = len(positions)
+    if n == 0:
+        return []
+    amounts = [amount for _, amount in positions]
+    size = 1 << n
+    subset_sum = [0] * size
+    best = [0] * size
+    parent = [0] * size
+    for mask in range(1, size):
+        low_bit = mask & -mask
+        subset_sum[mask] = subset_sum[mask ^ low_bit] + amounts[low_bit.bit_length() - 1]
+        best_groups = -1
+        best_prev = 0
+        remaining = mask
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            prev = mask ^ bit
+            if best[prev] > best_groups:
+                best_groups = best[prev]
+                best_prev = prev
+        best[mask] = best_groups + (1 if subset_sum[mask] == 0 else 0)
+        parent[mask] = best_prev
+
+    groups = []
+    mask = size - 1
+    boundary = mask
+    while mask:
+        mask = parent[mask]
+        if subset_sum[mask] == 0:
+            group_mask = boundary ^ mask
+            groups.append([positions[idx] for idx in range(n) if group_mask >> idx & 1])
+            boundary = mask
+    groups.reverse()
+    return groups
+
+
+def _heuristic_transfers(positions: list[tuple[int, int]]) -> list[Transfer]:
+    """Greedy largest-debtor/largest-creditor matching; at most n - 1 transfers."""
+    debtors = sorted(([-amount, user_id] for user_id, amount in positions if amount < 0),
+                     key=lambda item: (-item[0], item[1]))
+    creditors = sorted(([amount, user_id] for user_id, amount in positions if amount > 0),
+                       key=lambda item: (-item[0], item[1]))
+    transfers = []
+    i = j = 0
+    while i < len(debtors) and j < len(creditors):
+        amount = min(debtors[i][0], creditors[j][0])
+        transfers.append(Transfer(debtors[i][1], creditors[j][1], amount))
+        debtors[i][0] -= amount
+        creditors[j][0] -= amount
+        if debtors[i][0] == 0:
+            i += 1
+        if creditors[j][0] == 0:
+            j += 1
+    return transfers
+
+
+def minimal_transfers(balances: dict[int, int]) -> list[Transfer]:
+    """Settle net balances (minor units, positive = is owed) with as few transfers as possible.
+
+    Groups of up to ``EXACT_SOLVER_LIMIT`` open positions are solved exactly; larger groups
+    use a greedy heuristic. Output is sorted by (from_user, to_user).
+    """
+    positions = sorted((user_id, amount) for user_id, amount in balances.items() if amount)
+    if sum(amount for _, amount in positions) != 0:
+        raise ValueError('Balances must sum to zero')
+
+    pairs, rest = _split_opposite_pairs(positions)
+    transfers = []
+    for group in pairs:
+        transfers.extend(_settle_group(group))
+    if len(rest) <= EXACT_SOLVER_LIMIT:
+        for group in _exact_zero_sum_groups(rest):
+            transfers.extend(_settle_group(group))
+    else:
+        transfers.extend(_heuristic_transfers(rest))
+    transfers.sort(key=lambda transfer: (transfer.from_user, transfer.to_user))
+    return transfers
+
+
+def _absorb_residue(cents: dict[int, int]) -> dict[int, int]:
+    """Move what rounding left over onto the largest position, so the cents sum to zero.
+
+    Ties go to the lowest user id, so the same balances always settle the same way.
+    """
+    residue = sum(cents.values())
+    if residue:
+        largest = max(sorted(cents), key=lambda user_id: abs(cents[user_id]))
+        cents[largest] -= residue
+    return cents
+
+
+def simplify_settlements(net_balances: dict[int, Decimal]) -> list[dict]:
+    # Balances rounded to cents one by one (e.g. after FX conversion) may miss zero by a
+    # cent or two.
+    cents = _absorb_residue(
+        {user_id: int(quantize(balance) * 100) for user_id, balance in net_balances.items()}
+    )
+    return [
+        {
+            'from_user': transfer.from_user,
+            'to_user': transfer.to_user,
+            'amount': Decimal(transfer.amount_minor).scaleb(-2),
+        }
+        for transfer in minimal_transfers(cents)
+    ]
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.invalidation import InvalidationEvent, bus
+from app.db.models import (
+    Budget,
+    Category,
+    CategoryType,
+    Membership,
+    MembershipRole,
+    SplitTemplate,
+    User,
+    Wallet,
+    WalletType,
+    Workspace,
+)
+from app.services.data_versions import bump_data_version
+
+
+@dataclass(frozen=True)
+class WalletRef:
+    id: int
+    workspace_id: int
+    name: str
+    type: WalletType
+    owner_user_id: int | None
+    currency: str
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class CategoryRef:
+    id: int
+    name: str
+    type: CategoryType
+
+
+@dataclass(frozen=True)
+class MemberRef:
+    user_id: int
+    role: MembershipRole
+    share_weight: int
+    tg_id: int
+    username: str | None
+    first_name: str | None
+    last_name: str | None
+
+
+@dataclass(frozen=True)
+class BudgetRef:
+    id: int
+    category_id: int
+    currency: str
+    limit_minor: int
+    thresholds: str
+
+
+@dataclass(frozen=True)
+class SplitTemplateRef:
+    id: int
+    name: str
+    weights: str
+
+
+@dataclass
+class WorkspaceSnapshot:
+    version: int
+    wallets: tuple[WalletRef, ...]
+    categories: tuple[CategoryRef, ...]
+    members: tuple[MemberRef, ...]
+    budgets: tuple[BudgetRef, ...] = ()
+    split_templates: tuple[SplitTemplateRef, ...] = ()
+    # Derived lookups built on demand by the owning services (e.g. the category index).
+    derived: dict[str, Any] = field(default_factory=dict)
+
+    def member(self, user_id: int) -> MemberRef | None:
+        for member in self.members:
+            if member.user_id == user_id:
+                return member
+        return None
+
+
+class SnapshotCache:
+    """Per-process reference data (wallets, categories, members, ...) keyed by workspace.
+
+    A snapshot is reused while its version equals ``workspaces.version`` on the row the
+    caller already loaded, so checking it costs no query. Every write to the reference
+    data bumps that counter in the same transaction, which makes other processes reload
+    on their next request.
+    """
+
+    def __init__(self) -> None:
+        self._workspaces: dict[int, WorkspaceSnapshot] = {}
+
+    async def get(self, session: AsyncSession, workspace: Workspace) -> WorkspaceSnapshot:
+        cached = self._workspaces.get(workspace.id)
+        if cached is not None and cached.version == workspace.version:
+            return cached
+        snapshot = await _load_snapshot(session, workspace)
+        # A transaction that bumped the version sees its own uncommitted rows; those are
+        # only cached once the commit lands, when the bus drops the older snapshot.
+        if not bus.is_pending(session, "workspace", workspace.id):
+            self._workspaces[workspace.id] = snapshot
+        return snapshot
+
+    def invalidate(self, workspace_id: int) -> None:
+        self._workspaces.pop(workspace_id, None)
+
+    def clear(self) -> None:
+        self._workspaces.clear()
+
+    def on_event(self, event: InvalidationEvent) -> None:
+        cached = self._workspaces.get(event.id)
+        if cached is not None and cached.version < event.version:
+            self.invalidate(event.id)
+
+
+snapshot_cache = SnapshotCache()
+bus.subscribe("workspace", snapshot_cache.on_event, on_reset=snapshot_cache.clear)
+
+
+async def _load_snapshot(session: AsyncSession, workspace: Workspace) -> WorkspaceSnapshot:
+    wallets = await session.execute(
+        select(
+            Wallet.id,
+            Wallet.workspace_id,
+            Wallet.name,
+            Wallet.type,
+            Wallet.owner_user_id,
+            Wallet.currency,
+            Wallet.is_active,
+        )
+        .where(Wallet.workspace_id == workspace.id)
+        .order_by(Wallet.id)
+    )
+    categories = await session.execute(
+        select(Category.id, Category.name, Category.type)
+        .where(Category.workspace_id == workspace.id)
+        .order_by(Category.id)
+    )
+    members = await session.execute(
+        select(
+            Membership.user_id,
+            Membership.role,
+            Membership.share_weight,
+            User.tg_id,
+            User.username,
+            User.first_name,
+            User.last_name,
+        )
+        .join(User, User.id == Membership.user_id)
+        .where(Membership.workspace_id == workspace.id)
+        .order_by(Membership.user_id)
+    )
+    budgets = await session.execute(
+        select(Budget.id, Budget.category_id, Budget.currency, Budget.limit_minor, Budget.thresholds)
+        .where(Budget.workspace_id == workspace.id)
+        .order_by(Budget.id)
+    )
+    split_templates = await session.execute(
+        select(SplitTemplate.id, SplitTemplate.name, SplitTemplate.weights)
+        .where(SplitTemplate.workspace_id == workspace.id)
+        .order_by(SplitTemplate.id)
+    )
+    return WorkspaceSnapshot(
+        version=workspace.version,
+        wallets=tuple(WalletRef(*row) for row in wallets.all()),
+        categories=tuple(CategoryRef(*row) for row in categories.all()),
+        members=tuple(MemberRef(*row) for row in members.all()),
+        budgets=tuple(BudgetRef(*row) for row in budgets.all()),
+        split_templates=tuple(SplitTemplateRef(*row) for row in split_templates.all()),
+    )
+
+
+async def get_workspace_snapshot(
+    session: AsyncSession,
+    workspace: Workspace,
+) -> WorkspaceSnapshot:
+    return await snapshot_cache.get(session, workspace)
+
+
+async def bump_workspace_version(session: AsyncSession, workspace: Workspace) -> int:
+    """Advance the workspace version inside the caller's transaction; the caller commits.
+
+    The in-memory ``workspace`` is updated too, so the same request sees its own write.
+    The cached snapshot is dropped by the invalidation bus once the commit lands, in
+    this process and the others; on rollback it stays valid.
+    """
+    version = (
+        await session.execute(
+            update(Workspace)
+            .where(Workspace.id == workspace.id)
+            .values(version=Workspace.version + 1)
+            .returning(Workspace.version)
+        )
+    ).scalar_one()
+    set_committed_value(workspace, "version", version)
+    await bus.publish(session, "workspace", workspace.id, version)
+    # Reference data shows up in Mini App reads (category and member names, base currency).
+    await bump_data_version(session, workspace)
+    return version
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.dialect import upsert_insert
+from app.db.models import SplitTemplate, Workspace
+from app.services.snapshots import (
+    SplitTemplateRef,
+    WorkspaceSnapshot,
+    bump_workspace_version,
+    get_workspace_snapshot,
+)
+
+# Percent splits are held as integer basis points (hundredths of a percent).
+BASIS_POINTS = 10_000
+
+
+def largest_remainder(amount_minor: int, weights: Sequence[int], seed: int = 0) -> list[int]:
+    """Split ``amount_minor`` in proportion to ``weights`` so the parts add up exactly.
+
+    Every part gets its floor and the leftover units go to the largest fractional
+    remainders (Hamilton's method). Equal remainders are ordered starting from position
+    ``seed % len(weights)``, so seeding with the transaction id rotates who gets the
+    extra cent instead of always favouring the first members.
+    """
+    total = sum(weights)
+    if total <= 0:
+        raise ValueError("Split weights must add up to more than zero")
+    count = len(weights)
+    start = seed % count
+    parts = []
+    # One integer per fractional part: larger remainder first, then rotated position.
+    keys = []
+    for idx, weight in enumerate(weights):
+        part, remainder = divmod(amount_minor * weight, total)
+        parts.append(part)
+        if remainder:
+            keys.append((total - remainder) * count + (idx - start) % count)
+    leftover = amount_minor - sum(parts)
+    if leftover:
+        keys.sort()
+        for key in keys[:leftover]:
+            parts[(key % count + start) % count] += 1
+    return parts
+
+
+class SplitBatch:
+    """Split rows of many transactions as parallel int64 columns.
+
+    A 1000-member expense costs three arrays of machine integers instead of a thousand
+    row objects, and ``insert_split_batch`` writes the columns as they are.
+    """
+
+    __slots__ = ("transaction_ids", "user_ids", "amounts")
+
+    def __init__(self) -> None:
+        self.transaction_ids = array("q")
+        self.user_ids = array("q")
+        self.amounts = array("q")
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def extend(self, transaction_id: int, user_ids: Sequence[int], amounts: Sequence[int]) -> None:
+        if len(user_ids) != len(amounts):
+            raise ValueError("Split batch columns must have the same length")
+        self.transaction_ids.extend(array("q", (transaction_id,)) * len(amounts))
+        self.user_ids.extend(user_ids)
+        self.amounts.extend(amounts)
+
+    def rows(self) -> Iterator[tuple[int, int, int]]:
+        return zip(self.transaction_ids, self.user_ids, self.amounts)
+
+
+@dataclass(frozen=True)
+class CompiledSplit:
+    """A split reduced to parallel user id and integer weight vectors."""
+
+    user_ids: tuple[int, ...]
+    weights: tuple[int, ...]
+
+    def allocate(self, amount_minor: int, seed: int = 0) -> list[tuple[int, int]]:
+        parts = largest_remainder(amount_minor, self.weights, seed)
+        return list(zip(self.user_ids, parts, strict=True))
+
+    def allocate_into(
+        self,
+        batch: SplitBatch,
+        transaction_id: int,
+        amount_minor: int,
+        seed: int = 0,
+    ) -> list[int]:
+        """Append the shares of one transaction to ``batch`` and return the amounts."""
+        parts = largest_remainder(amount_minor, self.weights, seed)
+        batch.extend(transaction_id, self.user_ids, parts)
+        return parts
+
+
+@dataclass(frozen=True)
+class SplitSpec:
+    """How one expense is divided when it should not follow the members' share weights."""
+
+    mode: str
+    # exact: (user_id, amount_minor); percent: (user_id, basis points); subset: (user_id, 0)
+    shares: tuple[tuple[int, int], ...] = ()
+    template: str | None = None
+
+    @classmethod
+    def exact(cls, amounts: dict[int, int]) -> SplitSpec:
+        return cls("exact", tuple(sorted(amounts.items())))
+
+    @classmethod
+    def percent(cls, percents: dict[int, Decimal | str]) -> SplitSpec:
+        shares = []
+        for user_id, raw in sorted(percents.items()):
+            try:
+                scaled = Decimal(str(raw)) * 100
+            except InvalidOperation as exc:
+                raise ValueError(f"Invalid percentage: {raw}") from exc
+            if not scaled.is_finite():
+                raise ValueError(f"Invalid percentage: {raw}")
+            if scaled != scaled.to_integral_value() or scaled < 0:
+                raise ValueError("Percentages must be non-negative with at most two decimals")
+            shares.append((user_id, int(scaled)))
+        if sum(points for _, points in shares) != BASIS_POINTS:
+            raise ValueError("Percentages must add up to 100")
+        return cls("percent", tuple(shares))
+
+    @classmethod
+    def subset(cls, user_ids: Sequence[int]) -> SplitSpec:
+        return cls("subset", tuple((user_id, 0) for user_id in sorted(set(user_ids))))
+
+    @classmethod
+    def named(cls, name: str) -> SplitSpec:
+        return cls("template", template=normalize_template_name(name))
+
+
+def normalize_template_name(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+def parse_template_weights(raw: str) -> dict[int, int]:
+    """Parse ``"3:2,5:1"`` into ``{3: 2, 5: 1}``."""
+    weights: dict[int, int] = {}
+    for part in raw.split(","):
+        if not part.strip():
+            continue
+        user_id, _, weight = part.partition(":")
+        try:
+            weights[int(user_id)] = int(weight)
+        except ValueError as exc:
+            raise ValueError(f"Invalid template weight: {part.strip()}") from exc
+    return weights
+
+
+def format_template_weights(weights: dict[int, int]) -> str:
+    return ",".join(f"{user_id}:{weight}" for user_id, weight in sorted(weights.items()))
+
+
+def _member_weights(snapshot: WorkspaceSnapshot) -> dict[int, int]:
+    weights = snapshot.derived.get("member_weights")
+    if weights is None:
+        weights = {member.user_id: max(0, member.share_weight) for member in snapshot.members}
+        snapshot.derived["member_weights"] = weights
+    return weights
+
+
+def weighted_split(weights: dict[int, int]) -> CompiledSplit | None:
+    """Everyone in ``weights`` by weight (equally if every weight is zero); None if empty."""
+    if not weights:
+        return None
+    values = tuple(max(0, weight) for weight in weights.values())
+    if sum(values) <= 0:
+        values = tuple(1 for _ in values)
+    return CompiledSplit(tuple(weights), values)
+
+
+def default_split(snapshot: WorkspaceSnapshot) -> CompiledSplit | None:
+    """All members by share weight; None without members."""
+    compiled = snapshot.derived.get("default_split")
+    if compiled is None and snapshot.members:
+        compiled = weighted_split(_member_weights(snapshot))
+        snapshot.derived["default_split"] = compiled
+    return compiled
+
+
+def compiled_templates(snapshot: WorkspaceSnapshot) -> dict[str, CompiledSplit]:
+    """Templates of the snapshot as weight vectors, compiled once per snapshot version.
+
+    Users who have left the workspace are dropped; a template left without weight is
+    skipped.
+    """
+    compiled = snapshot.derived.get("split_templates")
+    if compiled is None:
+        members = _member_weights(snapshot)
+        compiled = {}
+        for template in snapshot.split_templates:
+            weights = {
+                user_id: weight
+                for user_id, weight in parse_template_weights(template.weights).items()
+                if user_id in members and weight > 0
+            }
+            if weights:
+                compiled[template.name] = CompiledSplit(
+                    tuple(weights), tuple(weights.values())
+                )
+        snapshot.derived["split_templates"] = compiled
+    return compiled
+
+
+def compile_split(
+    snapshot: WorkspaceSnapshot,
+    spec: SplitSpec,
+    amount_minor: int,
+) -> CompiledSplit:
+    """Validate ``spec`` for an expense of ``amount_minor`` and reduce it to weights."""
+    if spec.mode == "template":
+        compiled = compiled_templates(snapshot).get(spec.template or "")
+        if compiled is None:
+            raise ValueError(f"Unknown split template: {spec.template}")
+        return compiled
+
+    members = _member_weights(snapshot)
+    if not spec.shares:
+        raise ValueError("Split needs at least one member")
+    for user_id, _ in spec.shares:
+        if user_id not in members:
+            raise ValueError("Split includes someone who is not a member of this workspace")
+
+    if spec.mode == "exact":
+        if any(amount < 0 for _, amount in spec.shares):
+            raise ValueError("Split amounts cannot be negative")
+        if sum(amount for _, amount in spec.shares) != amount_minor:
+            raise ValueError("Split amounts must add up to the expense amount")
+    user_ids = tuple(user_id for user_id, _ in spec.shares)
+    if spec.mode in ("exact", "percent"):
+        # Exact amounts are weights that divide without remainder.
+        return CompiledSplit(user_ids, tuple(value for _, value in spec.shares))
+    if spec.mode == "subset":
+        weights = tuple(members[user_id] for user_id in user_ids)
+        if sum(weights) <= 0:
+            weights = tuple(1 for _ in user_ids)
+        return CompiledSplit(user_ids, weights)
+    raise ValueError(f"Unknown split mode: {spec.mode}")
+
+
+async def check_split(
+    session: AsyncSession,
+    workspace: Workspace,
+    spec: SplitSpec,
+    amount_minor: int,
+) -> None:
+    """Raise ValueError when ``spec`` cannot split an expense of ``amount_minor``."""
+    compile_split(await get_workspace_snapshot(session, workspace), spec, amount_minor)
+
+
+def resolve_split(
+    snapshot: WorkspaceSnapshot,
+    spec: SplitSpec,
+    amount_minor: int,
+    seed: int = 0,
+) -> list[tuple[int, int]]:
+    """(user_id, amount_minor) shares of an expense under ``spec``."""
+    return compile_split(snapshot, spec, amount_minor).allocate(amount_minor, seed)
+
+
+async def set_split_template(
+    session: AsyncSession,
+    workspace: Workspace,
+    name: str,
+    weights: dict[int, int],
+) -> None:
+    normalized = normalize_template_name(name)
+    if not normalized or len(normalized) > 64:
+        raise ValueError("Template name must be 1 to 64 characters")
+    if any(weight < 0 for weight in weights.values()) or sum(weights.values()) <= 0:
+        raise ValueError("Template weights must be non-negative and not all zero")
+    snapshot = await get_workspace_snapshot(session, workspace)
+    members = _member_weights(snapshot)
+    if any(user_id not in members for user_id in weights):
+        raise ValueError("Template includes someone who is not a member of this workspace")
+
+    stmt = upsert_insert(session, SplitTemplate).values(
+        workspace_id=workspace.id,
+        name=normalized,
+        weights=format_template_weights(weights),
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["workspace_id", "name"],
+            set_={"weights": stmt.excluded.weights},
+        )
+    )
+    await bump_workspace_version(session, workspace)
+    await session.commit()
+
+
+async def list_split_templates(
+    session: AsyncSession,
+    workspace: Workspace,
+) -> list[SplitTemplateRef]:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    return sorted(snapshot.split_templates, key=lambda template: template.name)
@@ -1,107 +1,255 @@
 from __future__ import annotations
 
+import datetime as dt
+from collections import defaultdict
 from dataclasses import dataclass
 
-from sqlalchemy import select
+from sqlalchemy import BigInteger, DateTime, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.dml import Insert
 
 from app.db.models import (
-    Membership,
     Transaction,
     TransactionType,
     TransactionSplit,
     User,
-    Wallet,
     Workspace,
 )
+from app.services.anomalies import screen_expense
+from app.services.audit import record_audit
+from app.services.balance import apply_balance_deltas, split_balance_deltas
+from app.services.budgets import month_start, record_budget_spends
+from app.services.data_versions import bump_data_version
+from app.services.journal import append_events, expense_created, income_created
+from app.services.membership_history import get_membership_timeline
+from app.services.notifications import Alert, alert_notifier
+from app.services.snapshots import WalletRef, get_workspace_snapshot
+from app.services.splits import (
+    CompiledSplit,
+    SplitBatch,
+    SplitSpec,
+    compile_split,
+    default_split,
+    largest_remainder,
+)
+
+_SPLIT_COLUMNS = ("transaction_id", "user_id", "amount_minor", "occurred_at")
+
+
+def unnest_split_insert(batch: SplitBatch, times: list[dt.datetime]) -> Insert:
+    """``INSERT ... SELECT`` from the batch columns unnested as PostgreSQL arrays."""
+    columns = [
+        literal(values.tolist(), ARRAY(BigInteger))
+        for values in (batch.transaction_ids, batch.user_ids, batch.amounts)
+    ]
+    columns.append(literal(times, ARRAY(DateTime(timezone=True))))
+    # Multi-argument unnest names every output column "unnest"; alias them explicitly.
+    rows = func.unnest(*columns).table_valued(*_SPLIT_COLUMNS).render_derived()
+    return TransactionSplit.__table__.insert().from_select(_SPLIT_COLUMNS, select(rows))
+
+
+async def insert_split_batch(
+    session: AsyncSession,
+    batch: SplitBatch,
+    occurred_at: dict[int, dt.datetime],
+) -> None:
+    """Write ``batch`` in one statement outside the ORM unit of work; the caller commits.
+
+    ``occurred_at`` maps each transaction id to its time, which split rows carry as their
+    partition key. PostgreSQL receives the columns as arrays and unnests them
+    server-side, so the statement carries four parameters however many rows there are.
+    SQLite gets a plain DB-API executemany over the column tuples.
+    """
+    if not batch:
+        return
+    table = TransactionSplit.__table__
+    times = [occurred_at[transaction_id] for transaction_id in batch.transaction_ids]
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(unnest_split_insert(batch, times))
+        return
+    connection = await session.connection()
+    # Stored in the same text format the ORM writes, so joins on occurred_at match.
+    process = table.c.occurred_at.type.bind_processor(connection.dialect)
+    if process is not None:
+        times = [process(moment) for moment in times]
+    await connection.exec_driver_sql(
+        f"INSERT INTO {table.name} ({', '.join(_SPLIT_COLUMNS)}) VALUES (?, ?, ?, ?)",
+        list(zip(batch.transaction_ids, batch.user_ids, batch.amounts, times)),
+    )
 
 
 @dataclass(frozen=True)
-class Split:
-    user_id: int
+class ExpenseDraft:
+    wallet_id: int
     amount_minor: int
+    currency: str
+    note: str | None
+    payer_id: int
+    category_id: int | None
+    occurred_at: dt.datetime | None = None
+    # None splits among all members by share weight, as of occurred_at when it is set.
+    split: SplitSpec | None = None
 
 
-def compute_weighted_splits(amount_minor: int, memberships: list[Membership]) -> list[Split]:
-    if not memberships:
-        return []
-    weights = [max(0, membership.share_weight) for membership in memberships]
-    total_weight = sum(weights)
-    if total_weight <= 0:
-        weights = [1 for _ in memberships]
-        total_weight = len(memberships)
+async def insert_expenses(
+    session: AsyncSession,
+    workspace: Workspace,
+    drafts: list[ExpenseDraft],
+    screen: bool = True,
+) -> tuple[list[Transaction], list[Alert]]:
+    """Write expenses with their splits, balances and budget counters; the caller commits.
+
+    Issues one INSERT for the transactions, one columnar write for all splits and one
+    upsert per touched balance currency or budget counter, however many drafts there
+    are. Default splits in a workspace with ``implicit_splits`` write no split rows.
+    With ``screen`` each expense also passes the in-memory anomaly detector.
+    """
+    if not drafts:
+        return [], []
+    snapshot = await get_workspace_snapshot(session, workspace)
+    # Backdated default splits (e.g. recurring catch-up) follow the members of their date.
+    # Moments before the recorded history use the current members.
+    timeline = None
+    if any(draft.split is None and draft.occurred_at is not None for draft in drafts):
+        timeline = await get_membership_timeline(session, workspace)
+    # Compiled before anything is written, so an invalid split leaves no rows behind.
+    compiled: list[CompiledSplit | None] = []
+    versions: list[int | None] = []
+    for draft in drafts:
+        if draft.split is not None:
+            compiled.append(compile_split(snapshot, draft.split, draft.amount_minor))
+            versions.append(None)
+            continue
+        version = None
+        if timeline is not None and draft.occurred_at is not None:
+            version = timeline.version_at(draft.occurred_at)
+        if version is not None and version != workspace.membership_version:
+            compiled.append(timeline.split(version))
+            versions.append(version)
+        else:
+            compiled.append(default_split(snapshot))
+            versions.append(workspace.membership_version)
+
+    # Default splits can be left implicit: the row names the membership version instead.
+    split_versions = [
+        version if workspace.implicit_splits and version and split is not None else None
+        for version, split in zip(versions, compiled, strict=True)
+    ]
 
-    base = [amount_minor * weight // total_weight for weight in weights]
-    remainder = amount_minor - sum(base)
-    for idx in range(remainder):
-        base[idx % len(base)] += 1
+    now = dt.datetime.now(dt.timezone.utc)
+    result = await session.scalars(
+        insert(Transaction).returning(Transaction, sort_by_parameter_order=True),
+        [
+            {
+                "workspace_id": workspace.id,
+                "wallet_id": draft.wallet_id,
+                "type": TransactionType.expense,
+                "amount_minor": draft.amount_minor,
+                "currency": draft.currency,
+                "note": draft.note,
+                "created_by": draft.payer_id,
+                "category_id": draft.category_id,
+                "occurred_at": draft.occurred_at or now,
+                "split_version": split_version,
+            }
+            for draft, split_version in zip(drafts, split_versions, strict=True)
+        ],
+    )
+    txs = list(result.all())
+
+    batch = SplitBatch()
+    events = []
+    deltas: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    spends: dict[tuple[int, str, dt.date], int] = defaultdict(int)
+    for tx, draft, split in zip(txs, drafts, compiled, strict=True):
+        if split is None:
+            user_ids: tuple[int, ...] = (draft.payer_id,)
+            amounts = [draft.amount_minor]
+            batch.extend(tx.id, user_ids, amounts)
+        elif tx.split_version is not None:
+            user_ids = split.user_ids
+            amounts = largest_remainder(draft.amount_minor, split.weights, seed=tx.id)
+        else:
+            # Seeding with the id rotates who absorbs rounding across expenses.
+            user_ids = split.user_ids
+            amounts = split.allocate_into(batch, tx.id, draft.amount_minor, seed=tx.id)
+        events.append(expense_created(tx, user_ids, amounts))
+        shares = zip(user_ids, amounts)
+        for user_id, delta in split_balance_deltas(draft.payer_id, shares).items():
+            deltas[draft.currency][user_id] += delta
+        if draft.category_id is not None:
+            period = month_start(draft.occurred_at or now)
+            spends[(draft.category_id, draft.currency, period)] += draft.amount_minor
+    await insert_split_batch(session, batch, {tx.id: tx.occurred_at for tx in txs})
+    await append_events(session, workspace.id, events)
+    for currency, currency_deltas in sorted(deltas.items()):
+        await apply_balance_deltas(session, workspace.id, currency, currency_deltas)
+    await bump_data_version(session, workspace)
+    alerts: list[Alert] = list(
+        await record_budget_spends(session, workspace, dict(sorted(spends.items())))
+    )
+    if screen:
+        for tx in txs:
+            alerts.extend(await screen_expense(session, workspace, tx))
+    return txs, alerts
 
-    splits = []
-    for membership, amount in zip(memberships, base, strict=False):
-        splits.append(Split(user_id=membership.user_id, amount_minor=amount))
-    return splits
 
+def audit_expenses(txs: list[Transaction]) -> None:
+    for tx in txs:
+        record_audit(
+            "expense.created",
+            "transaction",
+            tx.id,
+            tx.workspace_id,
+            tx.created_by,
+            amount_minor=tx.amount_minor,
+            currency=tx.currency,
+            category_id=tx.category_id,
+        )
 
-async def list_memberships(
+
+async def create_expenses(
     session: AsyncSession,
     workspace: Workspace,
-) -> list[Membership]:
-    result = await session.execute(
-        select(Membership)
-        .options(selectinload(Membership.user))
-        .where(Membership.workspace_id == workspace.id)
-        .order_by(Membership.user_id)
-    )
-    return list(result.scalars().all())
+    drafts: list[ExpenseDraft],
+) -> list[Transaction]:
+    txs, alerts = await insert_expenses(session, workspace, drafts)
+    await session.commit()
+    audit_expenses(txs)
+    if alerts:
+        await alert_notifier.notify(alerts)
+    return txs
 
 
 async def create_expense(
     session: AsyncSession,
     workspace: Workspace,
-    wallet: Wallet,
+    wallet: WalletRef,
     amount_minor: int,
     currency: str,
     note: str | None,
     payer: User,
     category_id: int | None,
+    split: SplitSpec | None = None,
 ) -> Transaction:
-    tx = Transaction(
-        workspace_id=workspace.id,
+    draft = ExpenseDraft(
         wallet_id=wallet.id,
-        type=TransactionType.expense,
         amount_minor=amount_minor,
         currency=currency,
         note=note,
-        created_by=payer.id,
+        payer_id=payer.id,
         category_id=category_id,
+        split=split,
     )
-    session.add(tx)
-    await session.flush()
-
-    memberships = await list_memberships(session, workspace)
-    if memberships:
-        splits = compute_weighted_splits(amount_minor, memberships)
-    else:
-        splits = [Split(user_id=payer.id, amount_minor=amount_minor)]
-    for split in splits:
-        session.add(
-            TransactionSplit(
-                transaction_id=tx.id,
-                user_id=split.user_id,
-                amount_minor=split.amount_minor,
-            )
-        )
-
-    await session.commit()
-    await session.refresh(tx)
+    [tx] = await create_expenses(session, workspace, [draft])
     return tx
 
 
 async def create_income(
     session: AsyncSession,
     workspace: Workspace,
-    wallet: Wallet,
+    wallet: WalletRef,
     amount_minor: int,
     currency: str,
     note: str | None,
@@ -117,18 +265,32 @@ async def create_income(
         note=note,
         created_by=recipient.id,
         category_id=category_id,
+        occurred_at=dt.datetime.now(dt.timezone.utc),
     )
     session.add(tx)
     await session.flush()
+    await append_events(session, workspace.id, [income_created(tx)])
+    await bump_data_version(session, workspace)
 
     session.add(
         TransactionSplit(
             transaction_id=tx.id,
             user_id=recipient.id,
             amount_minor=amount_minor,
+            occurred_at=tx.occurred_at,
         )
     )
 
     await session.commit()
     await session.refresh(tx)
+    record_audit(
+        "income.created",
+        "transaction",
+        tx.id,
+        workspace.id,
+        recipient.id,
+        amount_minor=amount_minor,
+        currency=currency,
+        category_id=category_id,
+    )
     return tx
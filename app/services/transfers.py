@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import (
+    Transaction,
+    TransactionSplit,
+    TransactionType,
+    User,
+    WalletType,
+    Workspace,
+)
+from app.services.audit import record_audit
+from app.services.balance import apply_balance_deltas
+from app.services.data_versions import bump_data_version
+from app.services.journal import append_events, transfer_recorded
+from app.services.snapshots import WalletRef
+from app.services.workspaces import is_member
+
+
+async def record_settlement(
+    session: AsyncSession,
+    workspace: Workspace,
+    wallet: WalletRef,
+    payer: User,
+    payee: User,
+    amount_minor: int,
+    currency: str,
+    note: str | None,
+) -> Transaction:
+    """Record that ``payer`` paid ``payee`` back outside the app.
+
+    Stored as a transfer with one split for the payee, which moves both running balances
+    the same way an expense share would.
+    """
+    if amount_minor <= 0:
+        raise ValueError("Amount must be positive")
+    if payer.id == payee.id:
+        raise ValueError("Cannot settle with yourself")
+    if not await is_member(session, workspace, payee.id):
+        raise ValueError("Payee is not a member of this workspace")
+
+    tx = Transaction(
+        workspace_id=workspace.id,
+        wallet_id=wallet.id,
+        type=TransactionType.transfer,
+        amount_minor=amount_minor,
+        currency=currency,
+        note=note,
+        created_by=payer.id,
+        occurred_at=dt.datetime.now(dt.timezone.utc),
+    )
+    session.add(tx)
+    await session.flush()
+
+    session.add(
+        TransactionSplit(
+            transaction_id=tx.id,
+            user_id=payee.id,
+            amount_minor=amount_minor,
+            occurred_at=tx.occurred_at,
+        )
+    )
+    await apply_balance_deltas(
+        session,
+        workspace.id,
+        currency,
+        {payer.id: amount_minor, payee.id: -amount_minor},
+    )
+    await append_events(session, workspace.id, [transfer_recorded(tx, payee.id)])
+    await bump_data_version(session, workspace)
+
+    await session.commit()
+    await session.refresh(tx)
+    record_audit(
+        "settlement.recorded",
+        "transaction",
+        tx.id,
+        workspace.id,
+        payer.id,
+        payee_id=payee.id,
+        amount_minor=amount_minor,
+        currency=currency,
+    )
+    return tx
+
+
+async def create_transfer(
+    session: AsyncSession,
+    workspace: Workspace,
+    from_wallet: WalletRef,
+    to_wallet: WalletRef,
+    amount_minor: int,
+    note: str | None,
+    user: User,
+) -> Transaction:
+    """Move money between two wallets of the workspace.
+
+    A transfer from the user's personal wallet into another member's personal wallet is a
+    payment between members and adjusts their balances; any other transfer only moves
+    money between pots.
+    """
+    if amount_minor <= 0:
+        raise ValueError("Amount must be positive")
+    if from_wallet.id == to_wallet.id:
+        raise ValueError("Source and destination wallets must differ")
+    if from_wallet.workspace_id != workspace.id or to_wallet.workspace_id != workspace.id:
+        raise ValueError("Wallet does not belong to this workspace")
+    if from_wallet.currency != to_wallet.currency:
+        raise ValueError("Wallets must use the same currency")
+    if from_wallet.type == WalletType.personal and from_wallet.owner_user_id != user.id:
+        raise ValueError("You can only transfer from your own or shared wallets")
+
+    tx = Transaction(
+        workspace_id=workspace.id,
+        wallet_id=from_wallet.id,
+        to_wallet_id=to_wallet.id,
+        type=TransactionType.transfer,
+        amount_minor=amount_minor,
+        currency=from_wallet.currency,
+        note=note,
+        created_by=user.id,
+        occurred_at=dt.datetime.now(dt.timezone.utc),
+    )
+    session.add(tx)
+    await session.flush()
+
+    payee_id = to_wallet.owner_user_id
+    if (
+        from_wallet.type == WalletType.personal
+        and to_wallet.type == WalletType.personal
+        and payee_id is not None
+        and payee_id != user.id
+    ):
+        session.add(
+            TransactionSplit(
+                transaction_id=tx.id,
+                user_id=payee_id,
+                amount_minor=amount_minor,
+                occurred_at=tx.occurred_at,
+            )
+        )
+        await apply_balance_deltas(
+            session,
+            workspace.id,
+            from_wallet.currency,
+            {user.id: amount_minor, payee_id: -amount_minor},
+        )
+        await append_events(session, workspace.id, [transfer_recorded(tx, payee_id)])
+        await bump_data_version(session, workspace)
+
+    await session.commit()
+    await session.refresh(tx)
+    record_audit(
+        "transfer.created",
+        "transaction",
+        tx.id,
+        workspace.id,
+        user.id,
+        from_wallet_id=from_wallet.id,
+        to_wallet_id=to_wallet.id,
+        amount_minor=amount_minor,
+        currency=from_wallet.currency,
+    )
+    return tx
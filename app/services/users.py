@@ -1,29 +1,52 @@
 from __future__ import annotations
 
-from aiogram.types import User as TgUser
+from typing import TYPE_CHECKING
+
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import User
+from app.db.models import Membership, User, Workspace
+from app.services.snapshots import bump_workspace_version
+
+if TYPE_CHECKING:
+    from aiogram.types import User as TgUser
+
+
+def _apply_names(
+    user: User,
+    first_name: str | None,
+    last_name: str | None,
+    username: str | None,
+) -> bool:
+    """Copy the names Telegram reports onto ``user``; True if any of them changed."""
+    if (user.first_name, user.last_name, user.username) == (first_name, last_name, username):
+        return False
+    user.first_name = first_name
+    user.last_name = last_name
+    user.username = username
+    return True
+
+
+async def _commit_rename(session: AsyncSession, user: User) -> None:
+    """Commit new names with a version bump of every workspace that shows them."""
+    workspaces = await session.scalars(
+        select(Workspace)
+        .join(Membership, Membership.workspace_id == Workspace.id)
+        .where(Membership.user_id == user.id)
+        .order_by(Workspace.id)
+    )
+    for workspace in workspaces.all():
+        await bump_workspace_version(session, workspace)
+    await session.commit()
 
 
 async def ensure_user(session: AsyncSession, tg_user: TgUser) -> User:
     result = await session.execute(select(User).where(User.tg_id == tg_user.id))
     user = result.scalar_one_or_none()
     if user:
-        updated = False
-        if user.first_name != tg_user.first_name:
-            user.first_name = tg_user.first_name
-            updated = True
-        if user.last_name != tg_user.last_name:
-            user.last_name = tg_user.last_name
-            updated = True
-        if user.username != tg_user.username:
-            user.username = tg_user.username
-            updated = True
-        if updated:
-            await session.commit()
+        if _apply_names(user, tg_user.first_name, tg_user.last_name, tg_user.username):
+            await _commit_rename(session, user)
         return user
 
     user = User(
@@ -57,18 +80,8 @@ async def ensure_user_from_payload(session: AsyncSession, payload: dict) -> User
     username = payload.get("username")
 
     if user:
-        updated = False
-        if user.first_name != first_name:
-            user.first_name = first_name
-            updated = True
-        if user.last_name != last_name:
-            user.last_name = last_name
-            updated = True
-        if user.username != username:
-            user.username = username
-            updated = True
-        if updated:
-            await session.commit()
+        if _apply_names(user, first_name, last_name, username):
+            await _commit_rename(session, user)
         return user
 
     user = User(
@@ -85,16 +98,6 @@ async def ensure_user_from_payload(session: AsyncSession, payload: dict) -> User
         await session.rollback()
         result = await session.execute(select(User).where(User.tg_id == tg_id))
         user = result.scalar_one()
-        updated = False
-        if user.first_name != first_name:
-            user.first_name = first_name
-            updated = True
-        if user.last_name != last_name:
-            user.last_name = last_name
-            updated = True
-        if user.username != username:
-            user.username = username
-            updated = True
-        if updated:
-            await session.commit()
+        if _apply_names(user, first_name, last_name, username):
+            await _commit_rename(session, user)
         return user
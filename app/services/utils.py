@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import datetime as dt
+from decimal import Decimal, InvalidOperation, Overflow, ROUND_HALF_UP
 
 from app.db.models import User
 
@@ -23,16 +24,25 @@ def parse_amount_to_minor(amount_raw: str, currency: str) -> int:
         value = Decimal(cleaned)
     except InvalidOperation as exc:
         raise ValueError("Invalid amount") from exc
+    if not value.is_finite():
+        raise ValueError("Invalid amount")
 
     scale = Decimal(10) ** decimals
-    minor = (value * scale).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    try:
+        minor = (value * scale).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    except (InvalidOperation, Overflow) as exc:
+        # Beyond what the decimal context can hold.
+        raise ValueError("Invalid amount") from exc
     return int(minor)
 
 
+def minor_to_decimal(amount_minor: int, currency: str) -> Decimal:
+    return Decimal(amount_minor).scaleb(-CURRENCY_DECIMALS.get(currency, 2))
+
+
 def format_minor(amount_minor: int, currency: str) -> str:
     decimals = CURRENCY_DECIMALS.get(currency, 2)
-    scale = Decimal(10) ** decimals
-    value = Decimal(amount_minor) / scale
+    value = minor_to_decimal(amount_minor, currency)
     if decimals == 0:
         formatted = f"{int(value)}"
     else:
@@ -40,6 +50,13 @@ def format_minor(amount_minor: int, currency: str) -> str:
     return f"{formatted} {currency}"
 
 
+def as_utc(moment: dt.datetime) -> dt.datetime:
+    # SQLite hands timestamps back without tzinfo; they are stored in UTC.
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=dt.timezone.utc)
+    return moment
+
+
 def display_name(user: User) -> str:
     if user.username:
         return f"@{user.username}"
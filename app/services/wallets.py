@@ -1,48 +1,66 @@
 from __future__ import annotations
 
-from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import User, Wallet, WalletType, Workspace
+from app.services.audit import record_audit
+from app.services.snapshots import WalletRef, bump_workspace_version, get_workspace_snapshot
 
 
-async def list_wallets(session: AsyncSession, workspace: Workspace) -> list[Wallet]:
-    result = await session.execute(
-        select(Wallet)
-        .where(Wallet.workspace_id == workspace.id)
-        .order_by(Wallet.type, Wallet.name)
-    )
-    return list(result.scalars().all())
+async def list_wallets(session: AsyncSession, workspace: Workspace) -> list[WalletRef]:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    return sorted(snapshot.wallets, key=lambda wallet: (wallet.type.value, wallet.name))
+
+
+async def get_wallet_by_id(
+    session: AsyncSession,
+    workspace: Workspace,
+    wallet_id: int,
+) -> WalletRef | None:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    for wallet in snapshot.wallets:
+        if wallet.id == wallet_id:
+            return wallet
+    return None
 
 
 async def get_wallet_by_name(
     session: AsyncSession,
     workspace: Workspace,
     name: str,
-) -> Wallet | None:
-    result = await session.execute(
-        select(Wallet).where(
-            Wallet.workspace_id == workspace.id,
-            func.lower(Wallet.name) == name.lower(),
-        )
-    )
-    return result.scalar_one_or_none()
+) -> WalletRef | None:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    name = name.lower()
+    for wallet in snapshot.wallets:
+        if wallet.name.lower() == name:
+            return wallet
+    return None
+
+
+def _first_active(
+    wallets: tuple[WalletRef, ...],
+    wallet_type: WalletType,
+    currency: str | None,
+    owner_user_id: int | None = None,
+) -> WalletRef | None:
+    for wallet in wallets:
+        if (
+            wallet.type == wallet_type
+            and wallet.is_active
+            and (currency is None or wallet.currency == currency)
+            and (owner_user_id is None or wallet.owner_user_id == owner_user_id)
+        ):
+            return wallet
+    return None
 
 
 async def get_shared_wallet(
     session: AsyncSession,
     workspace: Workspace,
     currency: str | None = None,
-) -> Wallet | None:
-    stmt = select(Wallet).where(
-        Wallet.workspace_id == workspace.id,
-        Wallet.type == WalletType.shared,
-        Wallet.is_active.is_(True),
-    )
-    if currency:
-        stmt = stmt.where(Wallet.currency == currency)
-    result = await session.execute(stmt.order_by(Wallet.id))
-    return result.scalars().first()
+) -> WalletRef | None:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    return _first_active(snapshot.wallets, WalletType.shared, currency)
 
 
 async def get_personal_wallet(
@@ -50,17 +68,22 @@ async def get_personal_wallet(
     workspace: Workspace,
     user: User,
     currency: str | None = None,
-) -> Wallet | None:
-    stmt = select(Wallet).where(
-        Wallet.workspace_id == workspace.id,
-        Wallet.type == WalletType.personal,
-        Wallet.owner_user_id == user.id,
-        Wallet.is_active.is_(True),
+) -> WalletRef | None:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    return _first_active(snapshot.wallets, WalletType.personal, currency, user.id)
+
+
+def _audit_wallet(wallet: Wallet, actor_user_id: int | None) -> None:
+    record_audit(
+        "wallet.created",
+        "wallet",
+        wallet.id,
+        wallet.workspace_id,
+        actor_user_id,
+        name=wallet.name,
+        type=WalletType(wallet.type).value,
+        currency=wallet.currency,
     )
-    if currency:
-        stmt = stmt.where(Wallet.currency == currency)
-    result = await session.execute(stmt.order_by(Wallet.id))
-    return result.scalars().first()
 
 
 async def create_wallet(
@@ -79,8 +102,10 @@ async def create_wallet(
         currency=currency,
     )
     session.add(wallet)
+    await bump_workspace_version(session, workspace)
     await session.commit()
     await session.refresh(wallet)
+    _audit_wallet(wallet, owner_user_id)
     return wallet
 
 
@@ -117,9 +142,11 @@ async def ensure_default_wallets(
         wallets.append(personal)
 
     if wallets:
+        await bump_workspace_version(session, workspace)
         await session.commit()
         for wallet in wallets:
             await session.refresh(wallet)
+            _audit_wallet(wallet, owner.id)
     return wallets
 
 
@@ -128,7 +155,7 @@ async def get_default_wallet(
     workspace: Workspace,
     user: User,
     currency: str,
-) -> Wallet | None:
+) -> WalletRef | None:
     shared = await get_shared_wallet(session, workspace, currency)
     if shared:
         return shared
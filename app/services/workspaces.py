@@ -1,9 +1,19 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Membership, MembershipRole, User, Workspace
+from app.services.audit import record_audit
+from app.services.data_versions import bump_data_version
+from app.services.journal import (
+    append_events,
+    member_joined,
+    start_journal,
+    weight_changed,
+)
+from app.services.snapshots import bump_workspace_version, get_workspace_snapshot
+from app.services.membership_history import record_membership_change
 
 
 async def create_workspace(
@@ -23,9 +33,21 @@ async def create_workspace(
         share_weight=1,
     )
     session.add(membership)
-    owner.active_workspace_id = workspace.id
+    await _activate_workspace(session, owner, workspace.id)
+    start_journal(session, workspace.id)
+    await append_events(session, workspace.id, [member_joined(owner.id, 1)])
+    await record_membership_change(session, workspace, owner.id, 1)
     await session.commit()
     await session.refresh(workspace)
+    record_audit(
+        "workspace.created",
+        "workspace",
+        workspace.id,
+        workspace.id,
+        owner.id,
+        name=name,
+        base_currency=workspace.base_currency,
+    )
     return workspace
 
 
@@ -58,13 +80,76 @@ async def add_member(
         workspace_id=workspace.id,
         user_id=user.id,
         role=MembershipRole.member,
+        share_weight=1,
     )
     session.add(membership)
-    user.active_workspace_id = workspace.id
+    await _activate_workspace(session, user, workspace.id)
+    await append_events(session, workspace.id, [member_joined(user.id, 1)])
+    await record_membership_change(session, workspace, user.id, 1)
+    await bump_workspace_version(session, workspace)
     await session.commit()
+    record_audit(
+        "member.joined",
+        "membership",
+        membership.id,
+        workspace.id,
+        user.id,
+        role=membership.role.value,
+    )
     return membership
 
 
+async def set_share_weight(
+    session: AsyncSession,
+    workspace: Workspace,
+    user_id: int,
+    share_weight: int,
+) -> None:
+    """Change how much of each future expense a member covers."""
+    if share_weight < 0:
+        raise ValueError("Share weight cannot be negative")
+    result = await session.execute(
+        update(Membership)
+        .where(Membership.workspace_id == workspace.id, Membership.user_id == user_id)
+        .values(share_weight=share_weight)
+        .returning(Membership.id)
+    )
+    membership_id = result.scalar_one_or_none()
+    if membership_id is None:
+        raise ValueError("Not a member of this workspace")
+    await append_events(session, workspace.id, [weight_changed(user_id, share_weight)])
+    await record_membership_change(session, workspace, user_id, share_weight)
+    await bump_workspace_version(session, workspace)
+    await session.commit()
+    record_audit(
+        "member.weight_changed",
+        "membership",
+        membership_id,
+        workspace.id,
+        user_id,
+        share_weight=share_weight,
+    )
+
+
+async def set_implicit_splits(
+    session: AsyncSession,
+    workspace: Workspace,
+    enabled: bool,
+    actor_user_id: int,
+) -> None:
+    """Switch whether default-split expenses are stored without per-member split rows."""
+    workspace.implicit_splits = enabled
+    await session.commit()
+    record_audit(
+        "workspace.implicit_splits_changed",
+        "workspace",
+        workspace.id,
+        workspace.id,
+        actor_user_id,
+        enabled=enabled,
+    )
+
+
 async def list_user_workspaces(
     session: AsyncSession,
     user: User,
@@ -83,10 +168,25 @@ async def set_active_workspace(
     user: User,
     workspace_id: int | None,
 ) -> None:
-    user.active_workspace_id = workspace_id
+    await _activate_workspace(session, user, workspace_id)
     await session.commit()
 
 
+async def _activate_workspace(
+    session: AsyncSession,
+    user: User,
+    workspace_id: int | None,
+) -> None:
+    # Cached Mini App reads are keyed by the user's active workspace; bumping the one
+    # they leave makes any ETag issued for it stop matching.
+    previous_id = user.active_workspace_id
+    if previous_id is not None and previous_id != workspace_id:
+        previous = await session.get(Workspace, previous_id)
+        if previous is not None:
+            await bump_data_version(session, previous)
+    user.active_workspace_id = workspace_id
+
+
 async def get_active_workspace(
     session: AsyncSession,
     user: User,
@@ -101,13 +201,38 @@ async def get_active_workspace(
     if workspace is None:
         return None
 
-    membership_result = await session.execute(
-        select(Membership).where(
-            Membership.workspace_id == workspace.id,
-            Membership.user_id == user.id,
-        )
-    )
-    membership = membership_result.scalar_one_or_none()
-    if membership is None:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    if snapshot.member(user.id) is None:
         return None
     return workspace
+
+
+async def is_member(
+    session: AsyncSession,
+    workspace: Workspace,
+    user_id: int,
+) -> bool:
+    snapshot = await get_workspace_snapshot(session, workspace)
+    return snapshot.member(user_id) is not None
+
+
+async def find_member(
+    session: AsyncSession,
+    workspace: Workspace,
+    reference: str,
+) -> User | None:
+    """Resolve ``@username``, a Telegram id or ``user:<tg_id>`` to a workspace member."""
+    reference = reference.strip().removeprefix("user:").lstrip("@")
+    if not reference:
+        return None
+    stmt = (
+        select(User)
+        .join(Membership, Membership.user_id == User.id)
+        .where(Membership.workspace_id == workspace.id)
+    )
+    if reference.isdigit():
+        stmt = stmt.where(User.tg_id == int(reference))
+    else:
+        stmt = stmt.where(func.lower(User.username) == reference.lower())
+    result = await session.execute(stmt)
+    return result.scalars().first()
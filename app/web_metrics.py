@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from aiohttp import web
+
+from app.db.session import get_engine
+
+
+@dataclass
+class RouteStats:
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class WorkerMetrics:
+    """Request counters and latencies of one Mini App worker process."""
+
+    def __init__(self, worker: int = 0, workers: int = 1) -> None:
+        self.worker = worker
+        self.workers = workers
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.in_flight = 0
+        self.routes: dict[str, RouteStats] = {}
+
+    def record(self, route: str, status: int, seconds: float) -> None:
+        stats = self.routes.setdefault(route, RouteStats())
+        stats.count += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        if status >= 500:
+            stats.errors += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "worker": self.worker,
+            "workers": self.workers,
+            "pid": self.pid,
+            "uptime_s": round(time.time() - self.started_at, 3),
+            "in_flight": self.in_flight,
+            "db_pool": get_engine().pool.status(),
+            "routes": {
+                route: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "mean_ms": round(stats.total_seconds * 1000 / stats.count, 3),
+                    "max_ms": round(stats.max_seconds * 1000, 3),
+                }
+                for route, stats in sorted(self.routes.items())
+            },
+        }
+
+
+def _route_name(request: web.Request) -> str:
+    resource = request.match_info.route.resource
+    path = resource.canonical if resource is not None else "unmatched"
+    return f"{request.method} {path}"
+
+
+@web.middleware
+async def metrics_middleware(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    metrics: WorkerMetrics = request.app["metrics"]
+    started = time.perf_counter()
+    status = 500
+    metrics.in_flight += 1
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as exc:
+        status = exc.status
+        raise
+    finally:
+        metrics.in_flight -= 1
+        metrics.record(_route_name(request), status, time.perf_counter() - started)
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.json_response(request.app["metrics"].snapshot())
+
+
+def create_metrics_app(metrics: WorkerMetrics) -> web.Application:
+    """A private app serving one worker's metrics at ``/metrics``."""
+    app = web.Application()
+    app["metrics"] = metrics
+    app.router.add_get("/metrics", handle_metrics)
+    return app
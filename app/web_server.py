@@ -1,34 +1,126 @@
 from __future__ import annotations
 
-import json
+import datetime as dt
+import hashlib
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 from aiohttp import web
-
-from app.config import load_settings
-from app.db.session import async_session_factory
-from app.services.balance import calculate_balances, format_balance_report, get_workspace_members
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import get_settings
+from app.core.serialization import dumps, loads
+from app.db.invalidation import bus
+from app.db.models import User, Workspace
+from app.db.session import async_session_factory, dispose_engine, get_engine, init_engine
+from app.schemas.api import SettlementSuggestion
+from app.schemas.webapp import ExpensePayload, IncomePayload, SettlementPayload, TransferPayload
+from app.services.anomalies import anomaly_detector
+from app.services.audit import audit_writer
+from app.services.balance import (
+    calculate_balances,
+    consolidate_workspace_balances,
+    format_balance_report,
+    format_settlement_report,
+    get_settlement_suggestions,
+    get_workspace_members,
+)
 from app.services.categories import get_or_create_category
+from app.services.data_versions import data_versions
+from app.services.notifications import alert_notifier
 from app.services.reporting import monthly_expense_report
+from app.services.splits import SplitSpec, check_split
 from app.services.transactions import create_expense, create_income
+from app.services.transfers import create_transfer, record_settlement
 from app.services.users import ensure_user_from_payload
-from app.services.utils import normalize_currency, parse_amount_to_minor
-from app.services.wallets import get_default_wallet
+from app.services.utils import minor_to_decimal, normalize_currency, parse_amount_to_minor
+from app.services.wallets import get_default_wallet, get_wallet_by_id
 from app.services.workspaces import get_active_workspace
+from app.web_metrics import WorkerMetrics, metrics_middleware
 from app.webapp_auth import WebAppAuthError, extract_user, validate_init_data
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 WEB_DIR = BASE_DIR / "web"
 
+PayloadT = TypeVar("PayloadT", bound=BaseModel)
+
+# Browsers must revalidate every time; the bodies are per user, so never shared caches.
+CACHE_CONTROL = "private, no-cache"
+
 
 def json_error(message: str, status: int = 400) -> web.Response:
-    return web.json_response({"ok": False, "error": message}, status=status)
+    return web.Response(
+        body=dumps({"ok": False, "error": message}),
+        status=status,
+        content_type="application/json",
+    )
 
 
 def json_ok(payload: dict[str, Any]) -> web.Response:
-    payload = {"ok": True, **payload}
-    return web.json_response(payload)
+    return web.Response(body=dumps({"ok": True, **payload}), content_type="application/json")
+
+
+def _etag(kind: str, workspace_id: int, data_version: int, *extra: object) -> str:
+    return "-".join(str(part) for part in (kind, workspace_id, data_version, *extra))
+
+
+def _not_modified(
+    request: web.Request,
+    user_payload: dict[str, Any],
+    kind: str,
+    *extra: object,
+) -> web.Response | None:
+    """Answer 304 from the per-process data versions when the client's ETag is current.
+
+    Runs before any query, so a match costs no database round trip.
+    """
+    if not request.if_none_match:
+        return None
+    current = data_versions.current(user_payload.get("id"))
+    if current is None:
+        return None
+    etag = _etag(kind, *current, *extra)
+    # If-None-Match uses the weak comparison, so a W/ prefix still matches.
+    if not any(tag.value == etag for tag in request.if_none_match):
+        return None
+    response = web.Response(status=304, headers={"Cache-Control": CACHE_CONTROL})
+    response.etag = etag
+    return response
+
+
+def _cacheable(
+    response: web.Response,
+    kind: str,
+    workspace: Workspace,
+    *extra: object,
+) -> web.Response:
+    response.etag = _etag(kind, workspace.id, workspace.data_version, *extra)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def _profile(user_payload: dict[str, Any]) -> dict[str, Any]:
+    # The profile comes from the signed init data, not the database.
+    return {
+        "id": user_payload.get("id"),
+        "first_name": user_payload.get("first_name"),
+        "last_name": user_payload.get("last_name"),
+        "username": user_payload.get("username"),
+    }
+
+
+def _profile_digest(user_payload: dict[str, Any]) -> str:
+    """Digest of the requester's profile, for ETags of bodies that show their names.
+
+    A rename reaches the database (and bumps the data version) only once a request gets
+    past the 304 check, so such ETags must change with the init data as well.
+    """
+    return hashlib.blake2b(dumps(_profile(user_payload)), digest_size=8).hexdigest()
+
+
+def _today() -> dt.date:
+    # Reports follow the current month and balances convert at today's FX rates.
+    return dt.datetime.now(dt.timezone.utc).date()
 
 
 async def _get_user_payload(
@@ -53,20 +145,21 @@ async def handle_status(request: web.Request) -> web.Response:
     if error:
         return error
 
+    profile_digest = _profile_digest(user_payload)
+    not_modified = _not_modified(request, user_payload, "status", profile_digest)
+    if not_modified:
+        return not_modified
+
     async with async_session_factory() as session:
         user = await ensure_user_from_payload(session, user_payload)
         workspace = await get_active_workspace(session, user)
     if workspace is None:
         return json_error("no_active_workspace", status=409)
+    data_versions.remember(user.tg_id, workspace)
 
-    return json_ok(
+    response = json_ok(
         {
-            "user": {
-                "id": user_payload.get("id"),
-                "first_name": user_payload.get("first_name"),
-                "last_name": user_payload.get("last_name"),
-                "username": user_payload.get("username"),
-            },
+            "user": _profile(user_payload),
             "workspace": {
                 "id": workspace.id,
                 "name": workspace.name,
@@ -74,18 +167,54 @@ async def handle_status(request: web.Request) -> web.Response:
             },
         }
     )
+    return _cacheable(response, "status", workspace, profile_digest)
+
 
+async def _parse_payload(
+    request: web.Request,
+    model: type[PayloadT],
+    required_error: str,
+) -> tuple[PayloadT | None, web.Response | None]:
+    """Decode and validate the JSON body.
 
-async def _parse_payload(request: web.Request) -> tuple[dict[str, Any] | None, web.Response | None]:
+    A missing or unusable required field answers ``required_error``.
+    """
     if request.content_type != "application/json":
         return None, json_error("content_type_must_be_json")
     try:
-        payload = await request.json()
-    except json.JSONDecodeError:
+        data = loads(await request.read())
+    except ValueError:
         return None, json_error("invalid_json")
-    if not isinstance(payload, dict):
+    if not isinstance(data, dict):
         return None, json_error("invalid_payload")
-    return payload, None
+    try:
+        return model.model_validate(data), None
+    except ValidationError as exc:
+        fields = {str(error["loc"][0]) for error in exc.errors() if error["loc"]}
+    required = {name for name, field in model.model_fields.items() if field.is_required()}
+    if fields & required:
+        return None, json_error(required_error)
+    if any(name.startswith("split_") for name in fields):
+        return None, json_error("invalid_split")
+    return None, json_error("invalid_payload")
+
+
+def _parse_split(payload: ExpensePayload, currency: str) -> SplitSpec | None:
+    """Read an optional custom split; raises ValueError when it is malformed."""
+    if payload.split_template:
+        return SplitSpec.named(payload.split_template)
+    if payload.split_members:
+        return SplitSpec.subset(payload.split_members)
+    if payload.split_exact:
+        return SplitSpec.exact(
+            {
+                user_id: parse_amount_to_minor(amount, currency)
+                for user_id, amount in payload.split_exact.items()
+            }
+        )
+    if payload.split_percent:
+        return SplitSpec.percent(payload.split_percent)
+    return None
 
 
 async def handle_expense(request: web.Request) -> web.Response:
@@ -93,46 +222,54 @@ async def handle_expense(request: web.Request) -> web.Response:
     if error:
         return error
 
-    payload, payload_error = await _parse_payload(request)
+    payload, payload_error = await _parse_payload(
+        request, ExpensePayload, "amount_and_category_required"
+    )
     if payload_error:
         return payload_error
 
-    amount_raw = payload.get("amount")
-    category_name = payload.get("category")
-    note = payload.get("note")
-    currency_raw = payload.get("currency")
-
-    if amount_raw is None or category_name is None:
-        return json_error("amount_and_category_required")
-
     async with async_session_factory() as session:
         user = await ensure_user_from_payload(session, user_payload)
         workspace = await get_active_workspace(session, user)
         if workspace is None:
             return json_error("no_active_workspace", status=409)
 
-        currency = normalize_currency(str(currency_raw or workspace.base_currency))
+        currency = normalize_currency(payload.currency or workspace.base_currency)
         try:
-            amount_minor = parse_amount_to_minor(str(amount_raw), currency)
+            amount_minor = parse_amount_to_minor(payload.amount, currency)
         except ValueError:
             return json_error("invalid_amount")
         if amount_minor <= 0:
             return json_error("amount_must_be_positive")
+        try:
+            split = _parse_split(payload, currency)
+            # Checked before the category is created, so a bad split leaves nothing behind.
+            if split is not None:
+                await check_split(session, workspace, split, amount_minor)
+        except (TypeError, ValueError):
+            return json_error("invalid_split")
 
         wallet = await get_default_wallet(session, workspace, user, currency)
         if wallet is None:
             return json_error("wallet_missing")
-        category = await get_or_create_category(session, workspace, str(category_name), "expense")
-        tx = await create_expense(
-            session,
-            workspace=workspace,
-            wallet=wallet,
-            amount_minor=amount_minor,
-            currency=currency,
-            note=str(note) if note else None,
-            payer=user,
-            category_id=category.id,
+        category = await get_or_create_category(
+            session, workspace, payload.category, "expense", resolve_typos=True
         )
+        try:
+            tx = await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=amount_minor,
+                currency=currency,
+                note=payload.note or None,
+                payer=user,
+                category_id=category.id,
+                split=split,
+            )
+        except ValueError:
+            # Only the split can be rejected here, e.g. a template removed meanwhile.
+            return json_error("invalid_split")
 
     return json_ok(
         {
@@ -148,27 +285,21 @@ async def handle_income(request: web.Request) -> web.Response:
     if error:
         return error
 
-    payload, payload_error = await _parse_payload(request)
+    payload, payload_error = await _parse_payload(
+        request, IncomePayload, "amount_and_category_required"
+    )
     if payload_error:
         return payload_error
 
-    amount_raw = payload.get("amount")
-    category_name = payload.get("category")
-    note = payload.get("note")
-    currency_raw = payload.get("currency")
-
-    if amount_raw is None or category_name is None:
-        return json_error("amount_and_category_required")
-
     async with async_session_factory() as session:
         user = await ensure_user_from_payload(session, user_payload)
         workspace = await get_active_workspace(session, user)
         if workspace is None:
             return json_error("no_active_workspace", status=409)
 
-        currency = normalize_currency(str(currency_raw or workspace.base_currency))
+        currency = normalize_currency(payload.currency or workspace.base_currency)
         try:
-            amount_minor = parse_amount_to_minor(str(amount_raw), currency)
+            amount_minor = parse_amount_to_minor(payload.amount, currency)
         except ValueError:
             return json_error("invalid_amount")
         if amount_minor <= 0:
@@ -177,14 +308,16 @@ async def handle_income(request: web.Request) -> web.Response:
         wallet = await get_default_wallet(session, workspace, user, currency)
         if wallet is None:
             return json_error("wallet_missing")
-        category = await get_or_create_category(session, workspace, str(category_name), "income")
+        category = await get_or_create_category(
+            session, workspace, payload.category, "income", resolve_typos=True
+        )
         tx = await create_income(
             session,
             workspace=workspace,
             wallet=wallet,
             amount_minor=amount_minor,
             currency=currency,
-            note=str(note) if note else None,
+            note=payload.note or None,
             recipient=user,
             category_id=category.id,
         )
@@ -203,15 +336,161 @@ async def handle_balance(request: web.Request) -> web.Response:
     if error:
         return error
 
+    today = _today()
+    profile_digest = _profile_digest(user_payload)
+    not_modified = _not_modified(request, user_payload, "balance", today, profile_digest)
+    if not_modified:
+        return not_modified
+
     async with async_session_factory() as session:
         user = await ensure_user_from_payload(session, user_payload)
         workspace = await get_active_workspace(session, user)
         if workspace is None:
             return json_error("no_active_workspace", status=409)
+        data_versions.remember(user.tg_id, workspace)
         balances = await calculate_balances(session, workspace)
+        consolidated = await consolidate_workspace_balances(
+            session, workspace, balances, today
+        )
         members = await get_workspace_members(session, workspace)
-    report = format_balance_report(balances, members)
-    return json_ok({"report": report})
+    report = format_balance_report(balances, members, consolidated)
+    return _cacheable(
+        json_ok({"report": report}), "balance", workspace, today, profile_digest
+    )
+
+
+async def handle_settlements(request: web.Request) -> web.Response:
+    user_payload, error = await _get_user_payload(request)
+    if error:
+        return error
+
+    async with async_session_factory() as session:
+        user = await ensure_user_from_payload(session, user_payload)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            return json_error("no_active_workspace", status=409)
+        suggestions = await get_settlement_suggestions(session, workspace)
+        members = await get_workspace_members(session, workspace)
+
+    settlements = [
+        SettlementSuggestion(
+            from_user=transfer.from_user,
+            to_user=transfer.to_user,
+            amount=minor_to_decimal(transfer.amount_minor, currency),
+            currency=currency,
+            amount_minor=transfer.amount_minor,
+        ).model_dump(mode="json")
+        for currency, transfers in suggestions.items()
+        for transfer in transfers
+    ]
+    return json_ok(
+        {
+            "user_id": user.id,
+            "settlements": settlements,
+            "report": format_settlement_report(suggestions, members),
+        }
+    )
+
+
+async def handle_settlement(request: web.Request) -> web.Response:
+    user_payload, error = await _get_user_payload(request)
+    if error:
+        return error
+
+    payload, payload_error = await _parse_payload(
+        request, SettlementPayload, "to_user_and_amount_required"
+    )
+    if payload_error:
+        return payload_error
+
+    async with async_session_factory() as session:
+        user = await ensure_user_from_payload(session, user_payload)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            return json_error("no_active_workspace", status=409)
+
+        currency = normalize_currency(payload.currency or workspace.base_currency)
+        try:
+            amount_minor = parse_amount_to_minor(payload.amount, currency)
+        except ValueError:
+            return json_error("invalid_amount")
+        if amount_minor <= 0:
+            return json_error("amount_must_be_positive")
+
+        payee = await session.get(User, payload.to_user)
+        if payee is None:
+            return json_error("member_not_found", status=404)
+        wallet = await get_default_wallet(session, workspace, user, currency)
+        if wallet is None:
+            return json_error("wallet_missing")
+        try:
+            tx = await record_settlement(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                payer=user,
+                payee=payee,
+                amount_minor=amount_minor,
+                currency=currency,
+                note=payload.note or None,
+            )
+        except ValueError as exc:
+            return json_error(str(exc))
+
+    return json_ok(
+        {
+            "transaction_id": tx.id,
+            "amount_minor": tx.amount_minor,
+            "currency": tx.currency,
+        }
+    )
+
+
+async def handle_transfer(request: web.Request) -> web.Response:
+    user_payload, error = await _get_user_payload(request)
+    if error:
+        return error
+
+    payload, payload_error = await _parse_payload(
+        request, TransferPayload, "wallets_and_amount_required"
+    )
+    if payload_error:
+        return payload_error
+
+    async with async_session_factory() as session:
+        user = await ensure_user_from_payload(session, user_payload)
+        workspace = await get_active_workspace(session, user)
+        if workspace is None:
+            return json_error("no_active_workspace", status=409)
+
+        from_wallet = await get_wallet_by_id(session, workspace, payload.from_wallet_id)
+        to_wallet = await get_wallet_by_id(session, workspace, payload.to_wallet_id)
+        if from_wallet is None or to_wallet is None:
+            return json_error("wallet_missing", status=404)
+        try:
+            amount_minor = parse_amount_to_minor(payload.amount, from_wallet.currency)
+        except ValueError:
+            return json_error("invalid_amount")
+        try:
+            tx = await create_transfer(
+                session,
+                workspace=workspace,
+                from_wallet=from_wallet,
+                to_wallet=to_wallet,
+                amount_minor=amount_minor,
+                note=payload.note or None,
+                user=user,
+            )
+        except ValueError as exc:
+            return json_error(str(exc))
+
+    return json_ok(
+        {
+            "transaction_id": tx.id,
+            "amount_minor": tx.amount_minor,
+            "currency": tx.currency,
+        }
+    )
 
 
 async def handle_report(request: web.Request) -> web.Response:
@@ -219,19 +498,80 @@ async def handle_report(request: web.Request) -> web.Response:
     if error:
         return error
 
+    today = _today()
+    not_modified = _not_modified(request, user_payload, "report", today)
+    if not_modified:
+        return not_modified
+
     async with async_session_factory() as session:
         user = await ensure_user_from_payload(session, user_payload)
         workspace = await get_active_workspace(session, user)
         if workspace is None:
             return json_error("no_active_workspace", status=409)
+        data_versions.remember(user.tg_id, workspace)
         report = await monthly_expense_report(session, workspace)
 
-    return json_ok({"report": report})
+    return _cacheable(json_ok({"report": report}), "report", workspace, today)
+
+
+async def _start_engine(app: web.Application) -> None:
+    # Pre-forked workers split the configured pool between them.
+    init_engine(app["metrics"].workers)
 
 
-def create_app() -> web.Application:
-    app = web.Application()
-    app["settings"] = load_settings()
+async def _stop_engine(app: web.Application) -> None:
+    await dispose_engine()
+
+
+async def _start_invalidation_bus(app: web.Application) -> None:
+    await bus.start(get_engine().url)
+
+
+async def _stop_invalidation_bus(app: web.Application) -> None:
+    await bus.stop()
+
+
+async def _start_alerts(app: web.Application) -> None:
+    # aiogram is only needed to deliver alerts; loading it here keeps imports light.
+    from app.bot.dispatcher import create_bot
+    from app.bot.notifications import alert_sender
+
+    bot = create_bot(app["settings"].bot_token)
+    app["alerts"] = (bot, alert_sender(bot))
+    alert_notifier.subscribe(app["alerts"][1])
+    alert_notifier.start()
+
+
+async def _stop_alerts(app: web.Application) -> None:
+    bot, sender = app["alerts"]
+    await alert_notifier.stop()
+    alert_notifier.unsubscribe(sender)
+    await bot.session.close()
+
+
+async def _start_background_writers(app: web.Application) -> None:
+    anomaly_detector.start(async_session_factory)
+    audit_writer.start(async_session_factory)
+
+
+async def _stop_background_writers(app: web.Application) -> None:
+    await anomaly_detector.stop(async_session_factory)
+    await audit_writer.stop(async_session_factory)
+
+
+def create_app(worker: int = 0, workers: int = 1) -> web.Application:
+    """The Mini App of one worker process; ``workers`` is the size of its pre-fork group."""
+    app = web.Application(middlewares=[metrics_middleware])
+    app["settings"] = get_settings()
+    app["metrics"] = WorkerMetrics(worker, workers)
+    app.on_startup.append(_start_engine)
+    app.on_startup.append(_start_invalidation_bus)
+    app.on_startup.append(_start_alerts)
+    app.on_startup.append(_start_background_writers)
+    app.on_cleanup.append(_stop_invalidation_bus)
+    app.on_cleanup.append(_stop_alerts)
+    app.on_cleanup.append(_stop_background_writers)
+    app.on_cleanup.append(_stop_engine)
 
     app.router.add_get("/", handle_index)
     app.router.add_static("/static/", WEB_DIR, show_index=False)
@@ -240,14 +580,18 @@ def create_app() -> web.Application:
     app.router.add_post("/api/expense", handle_expense)
     app.router.add_post("/api/income", handle_income)
     app.router.add_get("/api/balance", handle_balance)
+    app.router.add_get("/api/settlements", handle_settlements)
+    app.router.add_post("/api/settlement", handle_settlement)
+    app.router.add_post("/api/transfer", handle_transfer)
     app.router.add_get("/api/report", handle_report)
     return app
 
 
 def main() -> None:
-    settings = load_settings()
-    app = create_app()
-    web.run_app(app, host=settings.webapp_host, port=settings.webapp_port)
+    # Imported here: the supervisor module builds on create_app.
+    from app.web_workers import main as serve
+
+    serve()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+"""Pre-fork supervisor for the Mini App server.
+
+The supervisor forks ``WEBAPP_WORKERS`` processes that each bind the Mini App port with
+``SO_REUSEPORT``, so the kernel spreads connections across them and cores. Workers
+build their engine, bot and background writers in startup hooks, after the fork.
+
+Signals sent to the supervisor:
+- SIGTERM or SIGINT drains every worker and exits.
+- SIGHUP re-reads the settings and starts a new generation of workers next to the
+  old one, then drains the old one. The port never closes.
+
+A worker that dies is restarted.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from multiprocessing.connection import wait
+from multiprocessing.process import BaseProcess
+
+from aiohttp import web
+
+from app.core.config import Settings, get_settings, reload_settings
+from app.web_metrics import create_metrics_app
+from app.web_server import create_app
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 1.0
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+async def serve_worker(settings: Settings, worker: int, workers: int) -> None:
+    """Serve the Mini App in this process until SIGTERM or SIGINT, then drain it."""
+    app = create_app(worker, workers)
+    runner = web.AppRunner(app, shutdown_timeout=settings.webapp_shutdown_timeout)
+    sites = [(runner, settings.webapp_host, settings.webapp_port)]
+    if settings.webapp_metrics_port:
+        metrics = web.AppRunner(create_metrics_app(app["metrics"]), access_log=None)
+        sites.append((metrics, "127.0.0.1", settings.webapp_metrics_port + worker))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        for site_runner, host, port in sites:
+            await site_runner.setup()
+            # Old and new generations share the ports while a reload overlaps them.
+            await web.TCPSite(site_runner, host, port, reuse_port=True).start()
+        await stop.wait()
+    finally:
+        # Closes the listeners, waits for in-flight requests up to the shutdown
+        # timeout, then runs the app's cleanup hooks.
+        for site_runner, _, _ in reversed(sites):
+            await site_runner.cleanup()
+
+
+def _worker_main(worker: int, workers: int) -> None:
+    # Drop the supervisor's handlers inherited through fork; the event loop installs
+    # its own. Reloads are the supervisor's job.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    asyncio.run(serve_worker(get_settings(), worker, workers))
+
+
+class Supervisor:
+    """Keeps ``webapp_workers`` forked Mini App workers running."""
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.workers: dict[int, BaseProcess] = {}
+        self._context = multiprocessing.get_context("fork")
+        self._signals: list[int] = []
+
+    def _spawn(self, worker: int) -> BaseProcess:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker, self.settings.webapp_workers),
+            name=f"webapp-worker-{worker}",
+        )
+        process.start()
+        return process
+
+    def _spawn_all(self) -> None:
+        count = self.settings.webapp_workers
+        self.workers = {worker: self._spawn(worker) for worker in range(count)}
+
+    def _drain(self, processes: list[BaseProcess]) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.settings.webapp_shutdown_timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("Mini App worker %s did not drain in time; killing it", process.name)
+                process.kill()
+                process.join()
+
+    def reload(self) -> None:
+        """Start workers with re-read settings, then drain the previous generation.
+
+        While both generations run they may hold up to twice the pool budget.
+        """
+        previous = list(self.workers.values())
+        self.settings = reload_settings()
+        self._spawn_all()
+        self._drain(previous)
+
+    def _on_signal(self, signum: int, frame: object) -> None:
+        self._signals.append(signum)
+
+    def run(self) -> None:
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self._on_signal)
+        self._spawn_all()
+        while True:
+            wait([process.sentinel for process in self.workers.values()], timeout=POLL_SECONDS)
+            while self._signals:
+                if self._signals.pop(0) != signal.SIGHUP:
+                    self._drain(list(self.workers.values()))
+                    return
+                self.reload()
+            for worker, process in list(self.workers.items()):
+                if not process.is_alive():
+                    logger.warning(
+                        "Mini App worker %s exited with code %s; restarting",
+                        worker,
+                        process.exitcode,
+                    )
+                    time.sleep(RESPAWN_DELAY_SECONDS)
+                    self.workers[worker] = self._spawn(worker)
+
+
+def main() -> None:
+    Supervisor(get_settings()).run()
+
+
+if __name__ == "__main__":
+    main()
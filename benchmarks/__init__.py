@@ -0,0 +1 @@
+"""Load-test and benchmark suite for the hot service paths."""
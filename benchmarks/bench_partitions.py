@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import datetime as dt
+import sys
+from typing import Any
+
+from sqlalchemy import text
+
+from benchmarks.harness import BenchContext, measure
+
+# Builds its own tables; the seeded dataset is not used.
+NEEDS_DATABASE = False
+ROWS = 500_000
+WORKSPACES = 50
+MONTHS = 24
+START = dt.datetime(2023, 1, 1, tzinfo=dt.timezone.utc)
+
+LAYOUTS = {"plain": False, "partitioned": True}
+
+
+def _month(index: int) -> dt.date:
+    year, month = divmod(START.month - 1 + index, 12)
+    return dt.date(START.year + year, month + 1, 1)
+
+
+def _bounds(index: int) -> tuple[dt.datetime, dt.datetime]:
+    start, end = _month(index), _month(index + 1)
+    return (
+        dt.datetime.combine(start, dt.time(), tzinfo=dt.timezone.utc),
+        dt.datetime.combine(end, dt.time(), tzinfo=dt.timezone.utc),
+    )
+
+
+async def _build(session: Any, schema: str, partitioned: bool) -> None:
+    await session.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    await session.execute(text(f"CREATE SCHEMA {schema}"))
+    suffix = " PARTITION BY RANGE (occurred_at)" if partitioned else ""
+    await session.execute(
+        text(
+            f"CREATE TABLE {schema}.transactions ("
+            "id bigint NOT NULL, workspace_id bigint NOT NULL, category_id bigint, "
+            "type varchar(16) NOT NULL, amount_minor bigint NOT NULL, "
+            f"currency varchar(3) NOT NULL, occurred_at timestamptz NOT NULL){suffix}"
+        )
+    )
+    if partitioned:
+        for index in range(MONTHS):
+            month = _month(index)
+            await session.execute(
+                text(
+                    f"CREATE TABLE {schema}.transactions_y{month.year}m{month.month:02d} "
+                    f"PARTITION OF {schema}.transactions FOR VALUES "
+                    f"FROM ('{month.isoformat()}') TO ('{_month(index + 1).isoformat()}')"
+                )
+            )
+    span = (_bounds(MONTHS - 1)[1] - START).total_seconds()
+    await session.execute(
+        text(
+            f"INSERT INTO {schema}.transactions "
+            "SELECT g, g % :workspaces, g % 8, "
+            "CASE WHEN g % 10 = 0 THEN 'income' ELSE 'expense' END, "
+            "(g * 37) % 50000, 'USD', "
+            "CAST(:start AS timestamptz) + (g * :step) * interval '1 second' "
+            "FROM generate_series(0, :rows - 1) AS g"
+        ),
+        {"workspaces": WORKSPACES, "start": START, "step": span / ROWS, "rows": ROWS},
+    )
+    await session.execute(
+        text(f"CREATE INDEX ON {schema}.transactions (workspace_id, occurred_at)")
+    )
+    await session.commit()
+    await session.execute(text(f"ANALYZE {schema}.transactions"))
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    async with ctx.session_factory() as session:
+        if session.get_bind().dialect.name != "postgresql":
+            print("partitions suite skipped: needs --database-url postgresql+...", file=sys.stderr)
+            return []
+        for layout, partitioned in LAYOUTS.items():
+            await _build(session, f"bench_{layout}", partitioned)
+
+    results = []
+    try:
+        for layout in LAYOUTS:
+            schema = f"bench_{layout}"
+
+            # The shape of monthly_expense_report: one workspace, one month.
+            async def report(index: int, schema: str = schema) -> None:
+                start, end = _bounds(index % MONTHS)
+                async with ctx.session_factory() as session:
+                    await session.execute(
+                        text(
+                            "SELECT category_id, currency, sum(amount_minor) "
+                            f"FROM {schema}.transactions "
+                            "WHERE workspace_id = :workspace_id AND type = 'expense' "
+                            "AND occurred_at >= :start AND occurred_at < :end "
+                            "GROUP BY category_id, currency"
+                        ),
+                        {"workspace_id": index % WORKSPACES, "start": start, "end": end},
+                    )
+
+            # A history scan: every workspace's expenses for one month.
+            async def month_scan(index: int, schema: str = schema) -> None:
+                start, end = _bounds(index % MONTHS)
+                async with ctx.session_factory() as session:
+                    await session.execute(
+                        text(
+                            f"SELECT workspace_id, sum(amount_minor) FROM {schema}.transactions "
+                            "WHERE type = 'expense' AND occurred_at >= :start "
+                            "AND occurred_at < :end GROUP BY workspace_id"
+                        ),
+                        {"start": start, "end": end},
+                    )
+
+            results.append(
+                await measure(
+                    f"partitions.report.{layout}",
+                    report,
+                    ctx.iterations,
+                    ctx.concurrency,
+                    rows=ROWS,
+                )
+            )
+            results.append(
+                await measure(
+                    f"partitions.month_scan.{layout}",
+                    month_scan,
+                    max(1, ctx.iterations // 10),
+                    ctx.concurrency,
+                    rows=ROWS,
+                )
+            )
+    finally:
+        async with ctx.session_factory() as session:
+            for layout in LAYOUTS:
+                await session.execute(text(f"DROP SCHEMA IF EXISTS bench_{layout} CASCADE"))
+            await session.commit()
+    return results
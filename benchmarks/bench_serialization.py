@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from app.core.serialization import BACKENDS, load_backend
+from app.schemas.webapp import ExpensePayload
+from benchmarks.harness import BenchContext, measure_sync
+
+NEEDS_DATABASE = False
+MEMBERS = 50
+
+_REPORT = "\n".join(f"- Member {idx}: {idx * 7}.50 USD" for idx in range(MEMBERS))
+
+# Response bodies shaped like each Mini App endpoint's, for a group of MEMBERS.
+RESPONSES = {
+    "/api/status": {
+        "ok": True,
+        "user": {"id": 1, "first_name": "Ann", "last_name": None, "username": "ann"},
+        "workspace": {"id": 1, "name": "Trip", "base_currency": "USD"},
+    },
+    "/api/balance": {"ok": True, "report": _REPORT},
+    "/api/settlements": {
+        "ok": True,
+        "user_id": 1,
+        "settlements": [
+            {
+                "from_user": idx,
+                "to_user": idx + 1,
+                "amount": Decimal(f"{idx}.25"),
+                "currency": "USD",
+                "amount_minor": idx * 100 + 25,
+            }
+            for idx in range(MEMBERS)
+        ],
+        "report": _REPORT,
+    },
+    "/api/expense": {"ok": True, "transaction_id": 123456, "amount_minor": 1250, "currency": "USD"},
+}
+EXPENSE_REQUEST = {
+    "amount": "12.50",
+    "category": "Food",
+    "note": "lunch",
+    "split_exact": {str(idx): "0.25" for idx in range(MEMBERS)},
+}
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    results = []
+    for name in BACKENDS:
+        try:
+            backend = load_backend(name)
+        except ImportError:
+            continue
+        for path, body in RESPONSES.items():
+            results.append(
+                measure_sync(
+                    f"serialization.{name}.encode {path}",
+                    lambda index, body=body: backend.dumps(body),
+                    ctx.iterations * 10,
+                    bytes=len(backend.dumps(body)),
+                )
+            )
+        raw = backend.dumps(EXPENSE_REQUEST)
+        results.append(
+            measure_sync(
+                f"serialization.{name}.decode POST /api/expense",
+                lambda index, raw=raw: ExpensePayload.model_validate(backend.loads(raw)),
+                ctx.iterations * 10,
+                bytes=len(raw),
+            )
+        )
+    return results
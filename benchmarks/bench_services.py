@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any
+
+from app.db.models import User, Wallet, Workspace
+from app.services.balance import calculate_balances
+from app.services.reporting import monthly_expense_report
+from app.services.transactions import create_expense
+from app.webapp_auth import validate_init_data
+from benchmarks.harness import BENCH_BOT_TOKEN, BenchContext, measure, measure_sync
+from benchmarks.telegram import make_init_data
+
+
+async def _load_refs(ctx: BenchContext) -> list[tuple[Workspace, Wallet, list[User]]]:
+    refs = []
+    async with ctx.session_factory() as session:
+        for seeded in ctx.dataset.workspaces:
+            workspace = await session.get(Workspace, seeded.id)
+            wallet = await session.get(Wallet, seeded.wallet_id)
+            users = [await session.get(User, user_id) for user_id in seeded.user_ids]
+            refs.append((workspace, wallet, users))
+    return refs
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    refs = await _load_refs(ctx)
+    now = dt.datetime.now(dt.timezone.utc)
+    results = []
+
+    async def expense(index: int) -> None:
+        workspace, wallet, users = refs[index % len(refs)]
+        seeded = ctx.dataset.workspaces[index % len(refs)]
+        async with ctx.session_factory() as session:
+            await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=1000 + index,
+                currency=workspace.base_currency,
+                note="bench",
+                payer=users[index % len(users)],
+                category_id=seeded.category_ids[index % len(seeded.category_ids)],
+            )
+
+    async def balances(index: int) -> None:
+        workspace, _, _ = refs[index % len(refs)]
+        async with ctx.session_factory() as session:
+            await calculate_balances(session, workspace)
+
+    async def report(index: int) -> None:
+        workspace, _, _ = refs[index % len(refs)]
+        async with ctx.session_factory() as session:
+            await monthly_expense_report(session, workspace, now=now)
+
+    results.append(await measure("services.create_expense", expense, ctx.iterations, ctx.concurrency))
+    results.append(await measure("services.calculate_balances", balances, ctx.iterations, ctx.concurrency))
+    results.append(
+        await measure("services.monthly_expense_report", report, ctx.iterations, ctx.concurrency)
+    )
+
+    init_data = [
+        make_init_data({"id": tg_id, "first_name": "Bench"}, BENCH_BOT_TOKEN)
+        for seeded in ctx.dataset.workspaces
+        for tg_id in seeded.tg_ids
+    ]
+    results.append(
+        measure_sync(
+            "auth.validate_init_data",
+            lambda index: validate_init_data(init_data[index % len(init_data)], BENCH_BOT_TOKEN),
+            ctx.iterations * 10,
+        )
+    )
+    return results
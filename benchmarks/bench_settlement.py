@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import random
+from typing import Any
+
+from app.services.settlement import minimal_transfers
+from benchmarks.harness import BenchContext, measure_sync
+
+NEEDS_DATABASE = False
+GROUP_SIZES = [2, 5, 10, 12, 20, 50, 100, 200]
+
+
+def random_balances(members: int, rng: random.Random) -> dict[int, int]:
+    balances = {user_id: rng.randint(-50_000, 50_000) for user_id in range(1, members)}
+    balances[members] = -sum(balances.values())
+    return balances
+
+
+def clustered_balances(members: int, rng: random.Random) -> dict[int, int]:
+    """Balances made of small zero-sum subgroups, like several expense circles in one group."""
+    balances: dict[int, int] = {}
+    user_id = 1
+    while user_id <= members:
+        size = min(rng.choice([2, 3, 4]), members - user_id + 1)
+        if size == 1:
+            balances[user_id] = 0
+            break
+        amounts = [rng.randint(-20_000, 20_000) for _ in range(size - 1)]
+        amounts.append(-sum(amounts))
+        for amount in amounts:
+            balances[user_id] = amount
+            user_id += 1
+    return balances
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    rng = random.Random(2024)
+    results = []
+    for shape, generator in (("random", random_balances), ("clustered", clustered_balances)):
+        for members in GROUP_SIZES:
+            cases = [generator(members, rng) for _ in range(16)]
+            transfers = sum(len(minimal_transfers(case)) for case in cases) / len(cases)
+            results.append(
+                measure_sync(
+                    f"settlement.{shape}.{members}",
+                    lambda index: minimal_transfers(cases[index % len(cases)]),
+                    ctx.iterations,
+                    members=members,
+                    avg_transfers=round(transfers, 2),
+                )
+            )
+    return results
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import datetime as dt
+import random
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.models import Base, TransactionSplit
+from app.services.splits import CompiledSplit, SplitBatch, weighted_split
+from app.services.transactions import insert_split_batch
+from benchmarks.harness import BenchContext, measure, measure_sync
+
+NEEDS_DATABASE = False
+GROUP_SIZES = [10, 100, 1000]
+OCCURRED_AT = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def weighted_group(count: int, rng: random.Random) -> CompiledSplit:
+    split = weighted_split({user_id: rng.randint(1, 5) for user_id in range(1, count + 1)})
+    assert split is not None
+    return split
+
+
+def split_rows(batch: SplitBatch) -> list[dict[str, Any]]:
+    """The per-row mappings the ORM insert path consumed before split batches."""
+    return [
+        {
+            "transaction_id": tx_id,
+            "user_id": user_id,
+            "amount_minor": amount,
+            "occurred_at": OCCURRED_AT,
+        }
+        for tx_id, user_id, amount in batch.rows()
+    ]
+
+
+def allocated_bytes(operation: Callable[[], Any]) -> int:
+    """Peak bytes allocated while ``operation`` builds its result."""
+    tracemalloc.start()
+    try:
+        result = operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    rng = random.Random(2024)
+    results = []
+    for size in GROUP_SIZES:
+        group = weighted_group(size, rng)
+        amounts = [rng.randint(1, 10_000_000) for _ in range(64)]
+
+        def batch(index: int) -> SplitBatch:
+            splits = SplitBatch()
+            group.allocate_into(splits, index, amounts[index % len(amounts)], seed=index)
+            return splits
+
+        results.append(
+            measure_sync(
+                f"splits.batch.{size}",
+                batch,
+                ctx.iterations,
+                members=size,
+                peak_bytes=allocated_bytes(lambda: batch(0)),
+            )
+        )
+        results.append(
+            measure_sync(
+                f"splits.rows.{size}",
+                lambda index: split_rows(batch(index)),
+                ctx.iterations,
+                members=size,
+                peak_bytes=allocated_bytes(lambda: split_rows(batch(0))),
+            )
+        )
+
+    # Split writes against a scratch SQLite table: the columnar path versus ORM bulk rows.
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[TransactionSplit.__table__])
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        for size in GROUP_SIZES:
+            group = weighted_group(size, rng)
+
+            async def write_batch(index: int) -> None:
+                splits = SplitBatch()
+                group.allocate_into(splits, index + 1, 10_000_000, seed=index + 1)
+                async with session_factory() as session:
+                    await insert_split_batch(session, splits, {index + 1: OCCURRED_AT})
+                    await session.rollback()
+
+            async def write_rows(index: int) -> None:
+                splits = SplitBatch()
+                group.allocate_into(splits, index + 1, 10_000_000, seed=index + 1)
+                async with session_factory() as session:
+                    await session.execute(insert(TransactionSplit), split_rows(splits))
+                    await session.rollback()
+
+            for name, operation in (("insert_batch", write_batch), ("insert_rows", write_rows)):
+                results.append(
+                    await measure(
+                        f"splits.{name}.{size}", operation, ctx.iterations, members=size
+                    )
+                )
+    finally:
+        await engine.dispose()
+    return results
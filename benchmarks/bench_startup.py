@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+from typing import Any
+
+from benchmarks.harness import BenchContext, measure
+
+# Times fresh interpreters; the seeded dataset is not used.
+NEEDS_DATABASE = False
+MAX_ITERATIONS = 10
+
+ENTRY_POINTS = {
+    "api": "app.main",
+    "bot": "app.bot.service",
+    "webapp": "app.web_server",
+}
+# Loaded by app lifespan hooks (the bot, alert delivery, the engine's driver), never by
+# importing an entry point.
+DEFERRED_IMPORTS = ("aiogram", "aiosqlite")
+
+
+def import_profile(module: str, env: dict[str, str] | None = None) -> dict[str, int]:
+    """Cumulative import time in microseconds of every module ``import module`` loads.
+
+    Runs a fresh interpreter with ``-X importtime``, so nothing is cached in-process.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    iterations = min(ctx.iterations, MAX_ITERATIONS)
+    results = []
+    for name, module in ENTRY_POINTS.items():
+        profile = import_profile(module, dict(os.environ))
+
+        async def cold_import(index: int, module: str = module) -> None:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-c", f"import {module}", env=dict(os.environ)
+            )
+            if await process.wait() != 0:
+                raise RuntimeError(f"import {module} failed")
+
+        results.append(
+            await measure(
+                f"startup.{name}",
+                cold_import,
+                iterations,
+                1,
+                import_ms=round(profile[module] / 1000, 3),
+                modules=len(profile),
+            )
+        )
+    return results
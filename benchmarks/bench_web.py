@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.web_server import create_app
+from benchmarks.harness import BENCH_BOT_TOKEN, BenchContext, measure
+from benchmarks.telegram import make_init_data
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    headers = [
+        {
+            "X-Telegram-Init-Data": make_init_data(
+                {"id": seeded.tg_ids[idx], "first_name": f"Member{idx}"},
+                BENCH_BOT_TOKEN,
+            )
+        }
+        for seeded in ctx.dataset.workspaces
+        for idx in range(len(seeded.tg_ids))
+    ]
+
+    client = TestClient(TestServer(create_app()))
+    await client.start_server()
+    results = []
+    try:
+
+        def get(path: str):
+            async def operation(index: int) -> None:
+                response = await client.get(path, headers=headers[index % len(headers)])
+                if response.status != 200:
+                    raise RuntimeError(f"{path} returned {response.status}: {await response.text()}")
+                await response.read()
+
+            return operation
+
+        async def post_expense(index: int) -> None:
+            response = await client.post(
+                "/api/expense",
+                json={"amount": f"{10 + index % 90}.50", "category": "Food", "note": "bench"},
+                headers=headers[index % len(headers)],
+            )
+            if response.status != 200:
+                raise RuntimeError(f"/api/expense returned {response.status}: {await response.text()}")
+            await response.read()
+
+        def revalidate(path: str):
+            # Each client holds the ETag of its last full read, as web/app.js does.
+            etags: dict[int, str] = {}
+
+            async def operation(index: int) -> None:
+                client_headers = headers[index % len(headers)]
+                etag = etags.get(index % len(headers))
+                if etag:
+                    client_headers = {**client_headers, "If-None-Match": etag}
+                response = await client.get(path, headers=client_headers)
+                if response.status not in (200, 304):
+                    raise RuntimeError(f"{path} returned {response.status}: {await response.text()}")
+                etags[index % len(headers)] = response.headers["ETag"]
+                await response.read()
+
+            return operation
+
+        for path in ("/api/status", "/api/balance", "/api/settlements", "/api/report"):
+            name = "web.GET " + path
+            results.append(await measure(name, get(path), ctx.iterations, ctx.concurrency))
+        for path in ("/api/status", "/api/balance", "/api/report"):
+            name = "web.GET " + path + " (If-None-Match)"
+            results.append(await measure(name, revalidate(path), ctx.iterations, ctx.concurrency))
+        results.append(
+            await measure("web.POST /api/expense", post_expense, ctx.iterations, ctx.concurrency)
+        )
+    finally:
+        await client.close()
+    return results
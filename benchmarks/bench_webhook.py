@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Any
+
+from aiogram import Bot
+from aiogram.types import Update
+
+from app.bot.dispatcher import build_dispatcher
+from benchmarks.harness import BENCH_BOT_TOKEN, BenchContext, measure
+from benchmarks.telegram import FakeTelegramSession, make_message_update
+
+COMMANDS = {
+    "balance": "/balance",
+    "settle": "/settle",
+    "report": "/report",
+    "add": "/add 12.50 Food bench",
+}
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    session = FakeTelegramSession()
+    bot = Bot(token=BENCH_BOT_TOKEN, session=session)
+    dp = build_dispatcher()
+    tg_ids = [tg_id for seeded in ctx.dataset.workspaces for tg_id in seeded.tg_ids]
+    results = []
+    update_id = 0
+
+    def feed(text: str):
+        async def operation(index: int) -> None:
+            nonlocal update_id
+            update_id += 1
+            update = Update.model_validate(
+                make_message_update(update_id, tg_ids[index % len(tg_ids)], text)
+            )
+            await dp.feed_update(bot, update)
+
+        return operation
+
+    for name, text in COMMANDS.items():
+        results.append(
+            await measure(f"webhook.{name}", feed(text), ctx.iterations, ctx.concurrency)
+        )
+    if session.calls == 0:
+        raise RuntimeError("Webhook handlers produced no bot calls; updates were not handled")
+    await bot.session.close()
+    return results
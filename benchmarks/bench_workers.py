@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import socket
+import sys
+from typing import Any
+
+import aiohttp
+
+from benchmarks.harness import BENCH_BOT_TOKEN, BenchContext, measure
+from benchmarks.telegram import make_init_data
+
+STARTUP_TIMEOUT_SECONDS = 60.0
+# Open connections per worker, so every worker has requests queued.
+CONNECTIONS_PER_WORKER = 8
+
+
+def _worker_counts() -> list[int]:
+    cores = os.cpu_count() or 1
+    return sorted({count for count in (1, 2, 4, 8, cores) if count <= cores})
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_ready(client: aiohttp.ClientSession, metrics_port: int, workers: int) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STARTUP_TIMEOUT_SECONDS
+    for worker in range(workers):
+        while True:
+            try:
+                async with client.get(f"http://127.0.0.1:{metrics_port + worker}/metrics"):
+                    break
+            except aiohttp.ClientConnectionError:
+                if loop.time() > deadline:
+                    raise RuntimeError(f"Mini App worker {worker} did not start") from None
+                await asyncio.sleep(0.2)
+
+
+async def run(ctx: BenchContext) -> list[dict[str, Any]]:
+    headers = [
+        {
+            "X-Telegram-Init-Data": make_init_data(
+                {"id": seeded.tg_ids[idx], "first_name": f"Member{idx}"},
+                BENCH_BOT_TOKEN,
+            )
+        }
+        for seeded in ctx.dataset.workspaces
+        for idx in range(len(seeded.tg_ids))
+    ]
+    results = []
+    baseline = None
+    for workers in _worker_counts():
+        port, metrics_port = _free_port(), _free_port()
+        env = {
+            **os.environ,
+            "WEBAPP_HOST": "127.0.0.1",
+            "WEBAPP_PORT": str(port),
+            "WEBAPP_WORKERS": str(workers),
+            "WEBAPP_METRICS_PORT": str(metrics_port),
+        }
+        server = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "app.web_server", env=env
+        )
+        connector = aiohttp.TCPConnector(limit=0)
+        try:
+            async with aiohttp.ClientSession(connector=connector) as client:
+                await _wait_until_ready(client, metrics_port, workers)
+
+                async def balance(index: int) -> None:
+                    url = f"http://127.0.0.1:{port}/api/balance"
+                    async with client.get(url, headers=headers[index % len(headers)]) as response:
+                        if response.status != 200:
+                            raise RuntimeError(f"/api/balance returned {response.status}")
+                        await response.read()
+
+                concurrency = max(ctx.concurrency, CONNECTIONS_PER_WORKER * workers)
+                result = await measure(
+                    f"workers.GET /api/balance x{workers}",
+                    balance,
+                    ctx.iterations * workers,
+                    concurrency,
+                    workers=workers,
+                )
+        finally:
+            server.send_signal(signal.SIGTERM)
+            await server.wait()
+        if baseline is None:
+            baseline = result["throughput_per_s"]
+        result["speedup"] = round(result["throughput_per_s"] / baseline, 2) if baseline else 0.0
+        results.append(result)
+    return results
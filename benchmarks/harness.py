@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+BENCH_BOT_TOKEN = "123456:benchmark-token"
+BENCH_WEBHOOK_SECRET = "benchmark-secret"
+
+
+@dataclass
+class BenchContext:
+    session_factory: Any
+    dataset: Any
+    iterations: int
+    concurrency: int
+
+
+def configure_environment(database_url: str) -> None:
+    """Point the app settings at the benchmark database.
+
+    Must run before any ``app.*`` module that reads settings at import time.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("JWT_SECRET", "benchmark")
+    os.environ.setdefault("BOT_TOKEN", BENCH_BOT_TOKEN)
+    os.environ.setdefault("BOT_WEBHOOK_SECRET", BENCH_WEBHOOK_SECRET)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(name: str, latencies: list[float], wall_seconds: float, **extra: Any) -> dict[str, Any]:
+    count = len(latencies)
+    latencies_ms = [value * 1000 for value in latencies]
+    return {
+        "name": name,
+        "iterations": count,
+        "wall_s": round(wall_seconds, 6),
+        "throughput_per_s": round(count / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        "mean_ms": round(sum(latencies_ms) / count, 4) if count else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 4),
+        "p95_ms": round(percentile(latencies_ms, 95), 4),
+        "p99_ms": round(percentile(latencies_ms, 99), 4),
+        "max_ms": round(max(latencies_ms), 4) if count else 0.0,
+        **extra,
+    }
+
+
+async def measure(
+    name: str,
+    operation: Callable[[int], Awaitable[Any]],
+    iterations: int,
+    concurrency: int = 1,
+    **extra: Any,
+) -> dict[str, Any]:
+    """Run ``operation(i)`` ``iterations`` times with bounded concurrency."""
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await operation(index)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_one(index) for index in range(iterations)))
+    wall = time.perf_counter() - started
+    return summarize(name, latencies, wall, concurrency=concurrency, **extra)
+
+
+def measure_sync(
+    name: str,
+    operation: Callable[[int], Any],
+    iterations: int,
+    **extra: Any,
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    started = time.perf_counter()
+    for index in range(iterations):
+        op_started = time.perf_counter()
+        operation(index)
+        latencies.append(time.perf_counter() - op_started)
+    wall = time.perf_counter() - started
+    return summarize(name, latencies, wall, concurrency=1, **extra)
+
+
+def git_revision() -> str:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return output.stdout.strip() or "unknown"
+
+
+def run_metadata(params: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "commit": git_revision(),
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+    }
+
+
+def save_results(
+    results: list[dict[str, Any]],
+    metadata: dict[str, Any],
+    output: Path | None = None,
+) -> Path:
+    if output is None:
+        stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = RESULTS_DIR / f"{stamp}-{metadata['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"meta": metadata, "results": results}, indent=2))
+    return output
+
+
+def load_results(path: Path) -> dict[str, dict[str, Any]]:
+    payload = json.loads(path.read_text())
+    return {entry["name"]: entry for entry in payload["results"]}
+
+
+def format_table(results: list[dict[str, Any]]) -> str:
+    header = f"{'benchmark':<40} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for entry in results:
+        lines.append(
+            f"{entry['name']:<40} {entry['throughput_per_s']:>10.1f} "
+            f"{entry['p50_ms']:>9.3f} {entry['p95_ms']:>9.3f} {entry['p99_ms']:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(before: Path, after: Path) -> str:
+    old = load_results(before)
+    new = load_results(after)
+    header = f"{'benchmark':<40} {'p50 before':>11} {'p50 after':>10} {'delta':>8}"
+    lines = [header, "-" * len(header)]
+    for name in sorted(old.keys() | new.keys()):
+        if name not in old or name not in new:
+            lines.append(f"{name:<40} {'(only in one run)':>31}")
+            continue
+        before_ms = old[name]["p50_ms"]
+        after_ms = new[name]["p50_ms"]
+        delta = (after_ms - before_ms) / before_ms * 100 if before_ms else 0.0
+        lines.append(f"{name:<40} {before_ms:>11.3f} {after_ms:>10.3f} {delta:>+7.1f}%")
+    return "\n".join(lines)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import datetime as dt
+import random
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.db.base import Base
+from app.db.models import (
+    Category,
+    CategoryType,
+    MemberBalance,
+    Membership,
+    MembershipRole,
+    Transaction,
+    TransactionType,
+    User,
+    Wallet,
+    WalletType,
+    Workspace,
+)
+from app.services.balance import split_balance_deltas
+from app.services.splits import SplitBatch, weighted_split
+from app.services.transactions import insert_split_batch
+
+CATEGORY_NAMES = ["Food", "Cafe", "Transport", "Rent", "Utilities", "Travel", "Other"]
+TX_BATCH_SIZE = 1000
+
+
+@dataclass
+class SeededWorkspace:
+    id: int
+    wallet_id: int
+    category_ids: list[int]
+    user_ids: list[int]
+    tg_ids: list[int]
+
+
+@dataclass
+class Dataset:
+    workspaces: list[SeededWorkspace] = field(default_factory=list)
+    transactions: int = 0
+    splits: int = 0
+
+
+async def create_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed_dataset(
+    session_factory: async_sessionmaker,
+    workspaces: int,
+    members: int,
+    transactions: int,
+    currency: str = "USD",
+    days: int = 90,
+    seed: int = 42,
+    tg_id_offset: int = 9_000_000_000,
+) -> Dataset:
+    """Insert ``workspaces`` workspaces of ``members`` members with ``transactions`` expenses each.
+
+    Rows are written with Core bulk inserts so seeding large datasets stays fast;
+    splits use the same weighting as ``create_expense``.
+    """
+    rng = random.Random(seed)
+    now = dt.datetime.now(dt.timezone.utc)
+    dataset = Dataset()
+
+    async with session_factory() as session:
+        for ws_index in range(workspaces):
+            workspace_id = (
+                await session.execute(
+                    insert(Workspace).returning(Workspace.id),
+                    [{"name": f"Bench {ws_index}", "base_currency": currency}],
+                )
+            ).scalar_one()
+
+            base_tg = tg_id_offset + ws_index * members
+            user_rows = [
+                {
+                    "tg_id": base_tg + idx,
+                    "first_name": f"Member{idx}",
+                    "username": f"bench_{ws_index}_{idx}",
+                    "active_workspace_id": workspace_id,
+                }
+                for idx in range(members)
+            ]
+            user_ids = list(
+                (
+                    await session.execute(
+                        insert(User).returning(User.id, sort_by_parameter_order=True),
+                        user_rows,
+                    )
+                ).scalars()
+            )
+            await session.execute(
+                insert(Membership),
+                [
+                    {
+                        "workspace_id": workspace_id,
+                        "user_id": user_id,
+                        "role": MembershipRole.owner if idx == 0 else MembershipRole.member,
+                        "share_weight": 1,
+                    }
+                    for idx, user_id in enumerate(user_ids)
+                ],
+            )
+            wallet_id = (
+                await session.execute(
+                    insert(Wallet).returning(Wallet.id),
+                    [
+                        {
+                            "workspace_id": workspace_id,
+                            "name": "Shared",
+                            "type": WalletType.shared,
+                            "currency": currency,
+                        }
+                    ],
+                )
+            ).scalar_one()
+            category_ids = list(
+                (
+                    await session.execute(
+                        insert(Category).returning(Category.id, sort_by_parameter_order=True),
+                        [
+                            {
+                                "workspace_id": workspace_id,
+                                "name": name,
+                                "type": CategoryType.expense,
+                            }
+                            for name in CATEGORY_NAMES
+                        ],
+                    )
+                ).scalars()
+            )
+
+            split = weighted_split({user_id: 1 for user_id in sorted(user_ids)})
+            balances: dict[int, int] = defaultdict(int)
+            for start in range(0, transactions, TX_BATCH_SIZE):
+                batch = min(TX_BATCH_SIZE, transactions - start)
+                tx_rows = [
+                    {
+                        "workspace_id": workspace_id,
+                        "wallet_id": wallet_id,
+                        "category_id": rng.choice(category_ids),
+                        "type": TransactionType.expense,
+                        "amount_minor": rng.randint(100, 50_000),
+                        "currency": currency,
+                        "note": None,
+                        "created_by": rng.choice(user_ids),
+                        "occurred_at": now - dt.timedelta(seconds=rng.randint(0, days * 86400)),
+                    }
+                    for _ in range(batch)
+                ]
+                tx_ids = list(
+                    (
+                        await session.execute(
+                            insert(Transaction).returning(
+                                Transaction.id, sort_by_parameter_order=True
+                            ),
+                            tx_rows,
+                        )
+                    ).scalars()
+                )
+                splits = SplitBatch()
+                for tx_id, row in zip(tx_ids, tx_rows, strict=True):
+                    amounts = split.allocate_into(splits, tx_id, row["amount_minor"], seed=tx_id)
+                    shares = zip(split.user_ids, amounts)
+                    for user_id, delta in split_balance_deltas(row["created_by"], shares).items():
+                        balances[user_id] += delta
+                await insert_split_batch(
+                    session,
+                    splits,
+                    {
+                        tx_id: row["occurred_at"]
+                        for tx_id, row in zip(tx_ids, tx_rows, strict=True)
+                    },
+                )
+                dataset.transactions += batch
+                dataset.splits += len(splits)
+            if balances:
+                await session.execute(
+                    insert(MemberBalance),
+                    [
+                        {
+                            "workspace_id": workspace_id,
+                            "user_id": user_id,
+                            "currency": currency,
+                            "balance_minor": balance,
+                        }
+                        for user_id, balance in balances.items()
+                    ],
+                )
+
+            dataset.workspaces.append(
+                SeededWorkspace(
+                    id=workspace_id,
+                    wallet_id=wallet_id,
+                    category_ids=category_ids,
+                    user_ids=user_ids,
+                    tg_ids=[row["tg_id"] for row in user_rows],
+                )
+            )
+        await session.commit()
+    return dataset
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import hmac
+import json
+from collections.abc import AsyncGenerator
+from typing import Any
+from urllib.parse import urlencode
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Chat, Message
+
+
+def make_init_data(user: dict[str, Any], bot_token: str) -> str:
+    """Build a Mini App ``initData`` string signed the way Telegram signs it."""
+    data = {
+        "auth_date": str(int(dt.datetime.now(dt.timezone.utc).timestamp())),
+        "query_id": "bench",
+        "user": json.dumps(user, separators=(",", ":")),
+    }
+    data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(data.items()))
+    secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    data["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(data)
+
+
+def make_message_update(update_id: int, tg_id: int, text: str) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(dt.datetime.now(dt.timezone.utc).timestamp()),
+            "chat": {"id": tg_id, "type": "private"},
+            "from": {"id": tg_id, "is_bot": False, "first_name": f"Bench{tg_id}"},
+            "text": text,
+        },
+    }
+
+
+class FakeTelegramSession(BaseSession):
+    """Bot session that answers API calls locally instead of calling Telegram."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def close(self) -> None:
+        return None
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,
+    ) -> TelegramType:
+        self.calls += 1
+        if method.__returning__ is Message:
+            chat_id = getattr(method, "chat_id", 0)
+            return Message(
+                message_id=self.calls,
+                date=dt.datetime.now(dt.timezone.utc),
+                chat=Chat(id=int(chat_id), type="private"),
+                text=getattr(method, "text", None),
+            )
+        return True
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: dict[str, Any] | None = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
@@ -0,0 +1,23 @@
+import pytest
+
+from app.services.anomalies import anomaly_detector
+from app.services.audit import audit_writer
+from app.services.balance import clear_settlement_cache
+from app.services.data_versions import data_versions
+from app.services.fx import rate_cache
+from app.services.notifications import alert_notifier
+from app.services.snapshots import snapshot_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset_process_caches():
+    # Every test starts from a fresh database whose ids restart at 1, so per-process
+    # caches keyed by workspace id must not leak between tests.
+    clear_settlement_cache()
+    rate_cache.clear()
+    snapshot_cache.clear()
+    data_versions.clear()
+    anomaly_detector.clear()
+    audit_writer.clear()
+    alert_notifier.clear()
+    yield
@@ -0,0 +1,94 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Transaction
+from app.services import anomalies
+from app.services.anomalies import AnomalyDetector, RunningStats
+
+
+def test_running_stats_match_batch_mean_and_variance():
+    values = [1.0, 2.0, 4.0, 7.0]
+    stats = RunningStats()
+    for value in values:
+        stats.push(value)
+    mean = sum(values) / len(values)
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    assert stats.count == 4
+    assert abs(stats.mean - mean) < 1e-12
+    assert abs(stats.stddev**2 - variance) < 1e-12
+
+
+def test_partial_stats_from_several_processes_add_up():
+    values = [1.0, 2.0, 4.0, 7.0, 3.0]
+    whole, first, second = RunningStats(), RunningStats(), RunningStats()
+    for idx, value in enumerate(values):
+        whole.push(value)
+        (first if idx % 2 else second).push(value)
+    merged = first.merged(second)
+    assert merged.count == whole.count
+    assert abs(merged.mean - whole.mean) < 1e-12
+    assert abs(merged.stddev - whole.stddev) < 1e-12
+
+
+def test_outliers_need_history_and_a_large_jump():
+    detector = AnomalyDetector()
+    key = (1, 7, 3, "USD")
+    for amount in [1_000, 1_200, 900, 1_100]:
+        assert not detector.is_outlier(key, amount)
+        detector.record(key, amount)
+    # Too few samples to judge yet.
+    assert not detector.is_outlier(key, 25_000)
+    detector.record(key, 1_000)
+    assert not detector.is_outlier(key, 1_300)
+    assert detector.is_outlier(key, 25_000)
+    # Statistics are per member, category and currency.
+    assert not detector.is_outlier((1, 8, 3, "USD"), 25_000)
+    assert not detector.is_outlier((1, 7, 3, "EUR"), 25_000)
+
+
+def _expense(tx_id: int, amount_minor: int, occurred_at: dt.datetime, payer: int = 7):
+    return Transaction(
+        id=tx_id,
+        workspace_id=1,
+        created_by=payer,
+        category_id=3,
+        amount_minor=amount_minor,
+        currency="USD",
+        occurred_at=occurred_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_found_in_a_bounded_window():
+    detector = AnomalyDetector(max_recent=2)
+    now = dt.datetime(2025, 5, 1, 12, 0, tzinfo=dt.timezone.utc)
+    async with AsyncSession() as session:
+        detector.record_on_commit(session, _expense(1, 1_250, now))
+        # Pending in the same transaction already counts.
+        assert detector.is_duplicate(session, _expense(2, 1_250, now))
+        await session.commit()
+
+    other = AsyncSession()
+    assert detector.is_duplicate(other, _expense(3, 1_250, now + dt.timedelta(minutes=5)))
+    assert not detector.is_duplicate(other, _expense(4, 1_250, now + dt.timedelta(minutes=11)))
+    assert not detector.is_duplicate(other, _expense(5, 1_300, now))
+    assert not detector.is_duplicate(other, _expense(6, 1_250, now, payer=8))
+
+    # Beyond max_recent the oldest expense is forgotten.
+    detector.remember((1, 7, 3, 10, "USD"), now)
+    detector.remember((1, 7, 3, 20, "USD"), now)
+    assert not detector.is_duplicate(other, _expense(7, 1_250, now))
+    assert detector.is_duplicate(other, _expense(8, 20, now))
+
+
+def test_recent_expenses_expire_after_the_window(monkeypatch):
+    clock = [1_000.0]
+    monkeypatch.setattr(anomalies.time, "monotonic", lambda: clock[0])
+    detector = AnomalyDetector(duplicate_window=dt.timedelta(minutes=10))
+    now = dt.datetime(2025, 5, 1, 12, 0, tzinfo=dt.timezone.utc)
+    detector.remember((1, 7, 3, 1_250, "USD"), now)
+    clock[0] += 601
+    assert not detector.is_duplicate(AsyncSession(), _expense(2, 1_250, now))
+    assert len(detector._recent) == 0
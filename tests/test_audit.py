@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.services.audit import AuditEvent, AuditWriter
+
+
+class FailingSessionFactory:
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        raise ConnectionError("database is down")
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_entries_in_order():
+    writer = AuditWriter(batch_size=2)
+    for entity_id in range(3):
+        writer.record(AuditEvent("expense.created", "transaction", entity_id, 1, 1))
+    with pytest.raises(ConnectionError):
+        await writer.flush(FailingSessionFactory())
+    assert [event.entity_id for event in writer.pending()] == [0, 1, 2]
+
+
+def test_buffer_drops_oldest_entries_beyond_the_cap():
+    writer = AuditWriter(max_buffered=2)
+    for entity_id in range(5):
+        writer.record(AuditEvent("expense.created", "transaction", entity_id, 1, 1))
+    assert len(writer) == 2
+    assert writer.dropped == 3
+
+
+class SlowSessionFactory:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        await asyncio.sleep(0.01)
+        self.batches.append(len(statement.compile().params))
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_the_batch_in_flight():
+    factory = SlowSessionFactory()
+    writer = AuditWriter(flush_interval=60, batch_size=10)
+    writer.start(factory)
+    for entity_id in range(25):
+        writer.record(AuditEvent("expense.created", "transaction", entity_id, 1, 1))
+    await asyncio.sleep(0.005)
+    await writer.stop(factory)
+    assert len(writer) == 0
+    assert len(factory.batches) == 3
@@ -0,0 +1,21 @@
+import pytest
+
+from app.services.budgets import crossed_thresholds, parse_thresholds
+
+
+def test_parse_thresholds_sorts_and_validates():
+    assert parse_thresholds("100, 50%,80,50") == (50, 80, 100)
+    with pytest.raises(ValueError):
+        parse_thresholds("eighty")
+    with pytest.raises(ValueError):
+        parse_thresholds("0")
+
+
+def test_crossed_thresholds_fire_once_per_crossing():
+    assert crossed_thresholds(10_000, (80, 100), 0, 7_999) == []
+    assert crossed_thresholds(10_000, (80, 100), 7_999, 8_000) == [80]
+    assert crossed_thresholds(10_000, (80, 100), 8_000, 9_000) == []
+    assert crossed_thresholds(10_000, (80, 100), 5_000, 12_000) == [80, 100]
+    # 80% of 10.01 rounds up, so 8.00 has not crossed it yet.
+    assert crossed_thresholds(1_001, (80,), 0, 800) == []
+    assert crossed_thresholds(1_001, (80,), 0, 801) == [80]
@@ -0,0 +1,31 @@
+from app.db.models import CategoryType
+from app.services.categories import CategoryIndex, CategoryRef
+
+
+def _index(*names: str) -> CategoryIndex:
+    index = CategoryIndex()
+    for idx, name in enumerate(names, start=1):
+        index.add(CategoryRef(id=idx, name=name, type=CategoryType.expense))
+    return index
+
+
+def test_lookup_ignores_case_and_spacing():
+    index = _index("Cafe", "Public Transport")
+    assert index.get(CategoryType.expense, "cafe").id == 1
+    assert index.get(CategoryType.expense, " Cafe ").id == 1
+    assert index.get(CategoryType.expense, "public   transport").id == 2
+    assert index.get(CategoryType.income, "Cafe") is None
+
+
+def test_resolve_typo_matches_close_names_only():
+    index = _index("Cafe", "Groceries", "Food", "Good")
+    assert index.resolve_typo(CategoryType.expense, "caffe").name == "Cafe"
+    assert index.resolve_typo(CategoryType.expense, "Grocereis").name == "Groceries"
+    # Four-letter names are too short to guess at.
+    assert index.resolve_typo(CategoryType.expense, "Hood") is None
+    assert index.resolve_typo(CategoryType.expense, "Travel") is None
+
+
+def test_suggest_ranks_by_similarity():
+    index = _index("Transport", "Travel", "Rent")
+    assert [ref.name for ref in index.suggest(CategoryType.expense, "transprt")][0] == "Transport"
@@ -0,0 +1,35 @@
+import pytest
+
+from app.core.config import get_settings, reload_settings
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql+asyncpg://user:password@db/prospera")
+    monkeypatch.setenv("BOT_TOKEN", "123456:config-test")
+    monkeypatch.setenv("JWT_SECRET", "config-test")
+    monkeypatch.setenv("DB_POOL_SIZE", "8")
+    monkeypatch.delenv("WEBAPP_URL", raising=False)
+    get_settings.cache_clear()
+    yield monkeypatch
+    get_settings.cache_clear()
+
+
+def test_settings_are_read_once_until_reloaded(env):
+    settings = get_settings()
+    assert get_settings() is settings
+    assert settings.engine_options()["pool_size"] == 8
+    # Pre-forked Mini App workers split the budget.
+    assert settings.engine_options(workers=3)["pool_size"] == 2
+    assert settings.engine_options(workers=3)["max_overflow"] == 3
+
+    env.setenv("WEBAPP_URL", "https://mini.example.com")
+    assert get_settings().webapp_url == ""
+    reloaded = reload_settings()
+    assert reloaded is get_settings() is not settings
+    assert reloaded.webapp_url == "https://mini.example.com"
+
+
+def test_sqlite_keeps_its_default_pool(env):
+    env.setenv("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    assert reload_settings().engine_options() == {"pool_pre_ping": True}
@@ -0,0 +1,65 @@
+import datetime as dt
+from decimal import Decimal
+
+import pytest
+
+from app.services.fx import (
+    CurrencyRates,
+    WorkspaceRates,
+    consolidate_balances,
+    convert_many,
+    convert_minor,
+    parse_rate,
+    read_rates_csv,
+    scale_rate,
+)
+
+
+def test_rate_lookup_uses_latest_rate_on_or_before_date():
+    table = CurrencyRates(
+        dates=[dt.date(2025, 1, 1), dt.date(2025, 2, 1)],
+        rates=[scale_rate(Decimal('1.10')), scale_rate(Decimal('1.20'))],
+    )
+    assert table.rate_on(dt.date(2024, 12, 31)) is None
+    assert table.rate_on(dt.date(2025, 1, 15)) == 110_000_000
+    assert table.rate_on(dt.date(2025, 3, 1)) == 120_000_000
+
+
+def test_convert_minor_handles_currency_decimals():
+    # 1000 JPY at 0.0067 USD -> 6.70 USD
+    assert convert_minor(1000, 'JPY', 'USD', scale_rate(Decimal('0.0067'))) == 670
+    assert convert_minor(-1001, 'EUR', 'USD', scale_rate(Decimal('1.005'))) == -1006
+
+
+def test_convert_many_keeps_zero_sum_blocks_balanced():
+    amounts = {1: 333, 2: 333, 3: -666}
+    converted = convert_many(amounts, 'EUR', 'USD', scale_rate(Decimal('1.0857')))
+    assert sum(converted.values()) == 0
+
+
+def test_consolidate_balances_reports_missing_rates():
+    rates = WorkspaceRates(
+        stamp=1,
+        currencies={'EUR': CurrencyRates([dt.date(2025, 1, 1)], [scale_rate(Decimal('2'))])},
+    )
+    balances = {'USD': {1: 100, 2: -100}, 'EUR': {1: -50, 2: 50}, 'GBP': {1: 10, 2: -10}}
+    consolidated, missing = consolidate_balances(balances, rates, 'USD', dt.date(2025, 1, 2))
+    assert consolidated == {1: 0, 2: 0}
+    assert missing == ['GBP']
+
+
+def test_read_rates_csv(tmp_path):
+    path = tmp_path / 'rates.csv'
+    path.write_text('date,currency,rate\n2025-01-01,eur,1.08\n2025-01-02,JPY,"0,0067"\n')
+    assert read_rates_csv(path) == [
+        (dt.date(2025, 1, 1), 'EUR', Decimal('1.08000000')),
+        (dt.date(2025, 1, 2), 'JPY', Decimal('0.00670000')),
+    ]
+
+
+def test_parse_rate_rejects_what_numeric_18_8_cannot_hold():
+    assert parse_rate('0.000000006') == Decimal('0.00000001')
+    assert parse_rate('9999999999,99999999') == Decimal('9999999999.99999999')
+    for raw in ('0.000000001', '0', '-1', 'NaN', 'inf', '10000000000', '1e30', 'abc'):
+        with pytest.raises(ValueError):
+            parse_rate(raw)
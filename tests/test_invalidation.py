@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.invalidation import InvalidationBus, InvalidationEvent
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.listeners = []
+        self.termination_listeners = []
+        self.closed = False
+
+    def add_termination_listener(self, callback) -> None:
+        self.termination_listeners.append(callback)
+
+    async def add_listener(self, channel, callback) -> None:
+        self.listeners.append(callback)
+
+    def notify(self, payload: str) -> None:
+        for callback in self.listeners:
+            callback(self, 1, "prospera_invalidation", payload)
+
+    def terminate(self) -> None:
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def test_event_payload_round_trip():
+    event = InvalidationEvent("workspace", 7, 3, 1700000000.5, "1-abc")
+    assert InvalidationEvent.decode(event.encode()) == event
+    with pytest.raises(ValueError):
+        InvalidationEvent.decode("workspace:7")
+
+
+@pytest.mark.asyncio
+async def test_local_events_are_delivered_on_commit_only(session_factory):
+    bus = InvalidationBus()
+    seen = []
+    bus.subscribe("workspace", seen.append)
+
+    async with session_factory() as session:
+        await bus.publish(session, "workspace", 1, 5)
+        assert seen == []
+        await session.commit()
+        assert [(event.id, event.version) for event in seen] == [(1, 5)]
+
+        await session.execute(text("SELECT 1"))
+        await bus.publish(session, "workspace", 1, 6)
+        await session.rollback()
+        await session.commit()
+    assert len(seen) == 1
+    assert bus.stats.published == 2
+
+
+@pytest.mark.asyncio
+async def test_listener_dispatches_remote_events_and_resets_after_reconnect():
+    connections: list[FakeConnection] = []
+
+    async def connect(dsn: str) -> FakeConnection:
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    bus = InvalidationBus(connect=connect, reconnect_delay=0)
+    seen = []
+    resets = []
+    bus.subscribe("workspace", seen.append, on_reset=lambda: resets.append(True))
+
+    await bus.start("postgresql+asyncpg://user:pw@localhost/db")
+    await asyncio.wait_for(bus.connected.wait(), 1)
+    assert len(resets) == 1
+
+    remote = InvalidationEvent("workspace", 4, 2, time.time() - 0.25, "other-process")
+    connections[0].notify(remote.encode())
+    connections[0].notify(InvalidationEvent("workspace", 4, 3, time.time(), bus.origin).encode())
+    connections[0].notify("garbage")
+    assert [(event.id, event.version) for event in seen] == [(4, 2)]
+    assert bus.stats.received == 1
+    assert bus.stats.malformed == 1
+    assert bus.stats.max_lag >= 0.25
+
+    connections[0].terminate()
+    while len(connections) < 2 or not bus.connected.is_set():
+        await asyncio.sleep(0)
+    assert bus.stats.reconnects == 1
+    assert len(resets) == 2
+
+    await bus.stop()
+    assert connections[1].closed
+
+
+@pytest.mark.asyncio
+async def test_start_is_a_noop_outside_postgresql():
+    bus = InvalidationBus(connect=None)
+    await bus.start("sqlite+aiosqlite:///:memory:")
+    assert not bus.connected.is_set()
+    await bus.stop()
@@ -0,0 +1,61 @@
+import datetime as dt
+import json
+
+from app.db.models import Transaction, TransactionType
+from app.services.journal import (
+    EXPENSE_CREATED,
+    MEMBER_JOINED,
+    TRANSFER_RECORDED,
+    WEIGHT_CHANGED,
+    JournalState,
+    expense_created,
+)
+
+
+def test_state_replays_events_and_round_trips_through_json():
+    state = JournalState()
+    state.apply(1, MEMBER_JOINED, {"user_id": 1, "share_weight": 1})
+    state.apply(2, MEMBER_JOINED, {"user_id": 2, "share_weight": 1})
+    state.apply(
+        3,
+        EXPENSE_CREATED,
+        {
+            "payer_id": 1,
+            "amount_minor": 1_000,
+            "currency": "USD",
+            "category_id": None,
+            "month": "2025-03",
+            "shares": [[1, 500], [2, 500]],
+        },
+    )
+    state.apply(
+        4,
+        TRANSFER_RECORDED,
+        {"payer_id": 2, "payee_id": 1, "amount_minor": 200, "currency": "USD"},
+    )
+    state.apply(5, WEIGHT_CHANGED, {"user_id": 2, "share_weight": 3})
+
+    assert state.balances == {"USD": {1: 300, 2: -300}}
+    assert state.expenses == {"2025-03": {"USD": {0: 1_000}}}
+    assert state.weights == {1: 1, 2: 3}
+    assert state.last_event_id == 5
+    assert JournalState.from_json(state.to_json()) == state
+
+
+def test_state_replays_expense_events_as_they_are_written():
+    tx = Transaction(
+        id=9,
+        type=TransactionType.expense,
+        created_by=1,
+        amount_minor=1_001,
+        currency="USD",
+        category_id=4,
+        occurred_at=dt.datetime(2025, 3, 31, 23, 0, tzinfo=dt.timezone.utc),
+    )
+    event = expense_created(tx, [1, 2], [334, 667])
+    state = JournalState()
+    state.apply(tx.id, event.type, json.loads(json.dumps(event.payload)))
+
+    assert state.balances == {"USD": {1: 667, 2: -667}}
+    assert state.expenses == {"2025-03": {"USD": {4: 1_001}}}
+    assert state.last_event_id == 9
@@ -0,0 +1,52 @@
+import datetime as dt
+
+from app.services.membership_history import MembershipInterval, MembershipTimeline
+
+T0 = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _at(days: int) -> dt.datetime:
+    return T0 + dt.timedelta(days=days)
+
+
+def _timeline() -> MembershipTimeline:
+    # v1: owner joins; v2: user 2 joins; v3: user 2 goes to weight 3; v4: user 3 joins.
+    return MembershipTimeline(
+        [
+            MembershipInterval(1, 1, 1, None, _at(0), None),
+            MembershipInterval(2, 1, 2, 3, _at(10), _at(20)),
+            MembershipInterval(2, 3, 3, None, _at(20), None),
+            MembershipInterval(3, 2, 4, None, _at(30), None),
+        ]
+    )
+
+
+def test_weights_follow_version_intervals():
+    timeline = _timeline()
+    assert timeline.weights_at(1) == {1: 1}
+    assert timeline.weights_at(2) == {1: 1, 2: 1}
+    assert timeline.weights_at(3) == {1: 1, 2: 3}
+    assert timeline.weights_at(4) == {1: 1, 2: 3, 3: 2}
+    split = timeline.split(3)
+    assert split is not None and split.allocate(400) == [(1, 100), (2, 300)]
+    assert timeline.split(3) is split
+
+
+def test_version_at_resolves_moments_to_epochs():
+    timeline = _timeline()
+    assert timeline.version_at(_at(-1)) is None
+    assert timeline.version_at(_at(0)) == 1
+    assert timeline.version_at(_at(15)) == 2
+    assert timeline.version_at(_at(20)) == 3
+    assert timeline.version_at(_at(400)) == 4
+
+
+def test_version_at_tolerates_clock_skew_between_writers():
+    timeline = MembershipTimeline(
+        [
+            MembershipInterval(1, 1, 1, None, _at(5), None),
+            MembershipInterval(2, 1, 2, None, _at(4), None),
+        ]
+    )
+    assert timeline.version_at(_at(4)) is None
+    assert timeline.version_at(_at(5)) == 2
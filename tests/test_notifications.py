@@ -0,0 +1,37 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from app.services.notifications import AlertNotifier
+
+
+@dataclass(frozen=True)
+class FakeAlert:
+    recipients: tuple[int, ...]
+
+    def message(self) -> str:
+        return "alert"
+
+
+@pytest.mark.asyncio
+async def test_started_notifier_queues_and_delivers_in_the_background():
+    delivered = []
+    release = asyncio.Event()
+
+    async def slow_sender(alerts):
+        await release.wait()
+        delivered.extend(alerts)
+
+    notifier = AlertNotifier()
+    notifier.subscribe(slow_sender)
+    notifier.start()
+    # notify returns while the sender is still blocked on the Bot API.
+    await asyncio.wait_for(notifier.notify([FakeAlert((1,))]), timeout=0.1)
+    await asyncio.wait_for(notifier.notify([FakeAlert((2,))]), timeout=0.1)
+    assert delivered == []
+
+    release.set()
+    await notifier.stop()
+    assert [alert.recipients for alert in delivered] == [(1,), (2,)]
+    assert len(notifier) == 0
@@ -0,0 +1,13 @@
+import datetime as dt
+
+from app.db.partitions import next_month, partition_ddl, partition_name
+
+
+def test_monthly_partition_bounds_roll_over_the_year():
+    assert next_month(dt.date(2025, 11, 1)) == dt.date(2025, 12, 1)
+    assert next_month(dt.date(2025, 12, 1)) == dt.date(2026, 1, 1)
+    assert partition_name("transactions", dt.date(2026, 1, 1)) == "transactions_y2026m01"
+    assert partition_ddl("transaction_splits", dt.date(2025, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS transaction_splits_y2025m12 PARTITION OF transaction_splits "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')"
+    )
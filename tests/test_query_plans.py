@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import datetime as dt
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import User
+from app.services.balance import calculate_balances, recompute_balances
+from app.services.budgets import set_budget
+from app.services.categories import get_category_by_name, get_or_create_category
+from app.services.reporting import monthly_expense_report
+from app.services.transactions import create_expense
+from app.services.wallets import ensure_default_wallets, get_default_wallet
+from app.services.workspaces import (
+    add_member,
+    create_workspace,
+    find_member,
+    list_user_workspaces,
+)
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@contextmanager
+def _captured_selects(engine):
+    statements: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def _plans(engine, statements) -> list[list[str]]:
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append([row[3] for row in result.all()])
+    return plans
+
+
+@pytest.mark.asyncio
+async def test_service_queries_search_by_index(engine):
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as session:
+        owner = User(tg_id=1, first_name="A", username="Alice")
+        member = User(tg_id=2, first_name="B", username="Bob")
+        session.add_all([owner, member])
+        await session.commit()
+        workspace = await create_workspace(session, owner, "Trip", "USD")
+        await add_member(session, workspace, member)
+        await ensure_default_wallets(session, workspace, owner)
+        wallet = await get_default_wallet(session, workspace, owner, "USD")
+        category = await get_or_create_category(session, workspace, "Food", "expense")
+        await create_expense(session, workspace, wallet, 1000, "USD", None, owner, category.id)
+
+        now = dt.datetime.now(dt.timezone.utc)
+        # Each service call and the index its query is expected to search.
+        calls = [
+            (
+                "ix_transactions_workspace_type_occurred",
+                lambda: monthly_expense_report(session, workspace, now),
+            ),
+            (
+                "ix_transactions_workspace_type_occurred",
+                lambda: set_budget(session, workspace, category.id, "USD", 5000),
+            ),
+            (
+                "ix_transactions_workspace_type_occurred",
+                lambda: recompute_balances(session, workspace),
+            ),
+            ("ix_memberships_user_workspace", lambda: list_user_workspaces(session, member)),
+            (
+                "ix_categories_workspace_type_lower_name",
+                lambda: get_category_by_name(session, workspace, "FOOD", "expense"),
+            ),
+            ("sqlite_autoindex_member_balances_1", lambda: calculate_balances(session, workspace)),
+            ("sqlite_autoindex_memberships_1", lambda: add_member(session, workspace, member)),
+            ("sqlite_autoindex_memberships_1", lambda: find_member(session, workspace, "@bob")),
+        ]
+        for index, call in calls:
+            with _captured_selects(engine) as statements:
+                await call()
+            steps = [step for plan in await _plans(engine, statements) for step in plan]
+            assert any(index in step for step in steps), (index, steps)
+            # Every table is reached through a key; nothing falls back to a full scan.
+            assert not [step for step in steps if step.startswith("SCAN ")], (index, steps)
@@ -0,0 +1,30 @@
+import datetime as dt
+
+from app.db.models import RecurrenceInterval
+from app.services.recurring import due_occurrences, next_occurrence
+
+UTC = dt.timezone.utc
+
+
+def test_monthly_runs_return_to_the_anchor_day():
+    jan31 = dt.datetime(2025, 1, 31, 9, tzinfo=UTC)
+    feb = next_occurrence(jan31, RecurrenceInterval.monthly, 31)
+    assert feb.date() == dt.date(2025, 2, 28)
+    assert next_occurrence(feb, RecurrenceInterval.monthly, 31).date() == dt.date(2025, 3, 31)
+    dec = dt.datetime(2025, 12, 15, tzinfo=UTC)
+    assert next_occurrence(dec, RecurrenceInterval.monthly, 15).date() == dt.date(2026, 1, 15)
+
+
+def test_due_occurrences_catch_up_in_one_batch():
+    start = dt.datetime(2025, 3, 1, 8, tzinfo=UTC)
+    now = dt.datetime(2025, 3, 22, 12, tzinfo=UTC)
+    runs, following = due_occurrences(start, RecurrenceInterval.weekly, 1, now)
+    assert [run.day for run in runs] == [1, 8, 15, 22]
+    assert following == dt.datetime(2025, 3, 29, 8, tzinfo=UTC)
+
+    runs, following = due_occurrences(start, RecurrenceInterval.daily, 1, now, limit=5)
+    assert len(runs) == 5
+    assert following == dt.datetime(2025, 3, 6, 8, tzinfo=UTC)
+    # Naive timestamps (SQLite) are treated as UTC.
+    runs, _ = due_occurrences(start.replace(tzinfo=None), RecurrenceInterval.daily, 1, now)
+    assert len(runs) == 22
@@ -0,0 +1,95 @@
+import json
+from decimal import Decimal
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from fastapi import FastAPI
+from fastapi.testclient import TestClient as ApiClient
+from pydantic import BaseModel
+
+from app.api import serialization
+from app.api.serialization import FastJSONResponse, FastJSONRoute
+from app.core.serialization import BACKENDS, load_backend
+from app.schemas.webapp import ExpensePayload
+from app.web_server import _parse_payload
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backends_agree_on_encoding_and_errors(name):
+    try:
+        backend = load_backend(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+    payload = {"ok": True, "amount": Decimal("12.50"), "note": "café", "ids": [1, 2]}
+    encoded = backend.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == {"ok": True, "amount": "12.50", "note": "café", "ids": [1, 2]}
+    assert backend.loads(encoded)["amount"] == "12.50"
+    with pytest.raises(json.JSONDecodeError):
+        backend.loads(b'{"ok": ')
+
+
+async def test_mini_app_payloads_map_validation_errors_to_codes():
+    async def handler(request: web.Request) -> web.Response:
+        payload, error = await _parse_payload(
+            request, ExpensePayload, "amount_and_category_required"
+        )
+        if error:
+            return error
+        return web.json_response(payload.model_dump())
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post("/", json={"amount": 12.5, "category": "Food", "note": 7})
+        assert (await response.json())["amount"] == "12.5"
+        assert (await response.json())["note"] == "7"
+
+        cases = {
+            '{"amount": "1"}': "amount_and_category_required",
+            '{"amount": null, "category": "Food"}': "amount_and_category_required",
+            '{"amount": "1", "category": "Food", "split_members": ["x"]}': "invalid_split",
+            '{"amount": "1", "category": "Food", "currency": []}': "invalid_payload",
+            "[1, 2]": "invalid_payload",
+            "{": "invalid_json",
+        }
+        for body, code in cases.items():
+            response = await client.post(
+                "/", data=body, headers={"Content-Type": "application/json"}
+            )
+            assert (response.status, (await response.json())["error"]) == (400, code), body
+
+
+def test_api_routes_decode_and_encode_with_the_shared_backend(monkeypatch):
+    calls = []
+
+    def spy(name):
+        function = getattr(serialization, name)
+
+        def wrapper(value):
+            calls.append(name)
+            return function(value)
+
+        return wrapper
+
+    monkeypatch.setattr(serialization, "dumps", spy("dumps"))
+    monkeypatch.setattr(serialization, "loads", spy("loads"))
+
+    class Item(BaseModel):
+        name: str
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.router.route_class = FastJSONRoute
+
+    @app.post("/items")
+    async def create_item(item: Item):
+        return {"name": item.name}
+
+    client = ApiClient(app)
+    assert client.post("/items", json={"name": "tea"}).json() == {"name": "tea"}
+    assert calls == ["loads", "dumps"]
+    response = client.post(
+        "/items", content=b'{"name": ', headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 422
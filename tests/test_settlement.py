@@ -1,6 +1,9 @@
+import random
 from decimal import Decimal
 
-from app.services.settlement import simplify_settlements
+import pytest
+
+from app.services.settlement import Transfer, minimal_transfers, simplify_settlements
 
 
 def test_settlement_is_deterministic_and_minimalish():
@@ -16,3 +19,56 @@ def test_settlement_handles_rounding():
     balances = {1: Decimal('10.01'), 2: Decimal('-10.01')}
     settlements = simplify_settlements(balances)
     assert settlements[0]['amount'] == Decimal('10.01')
+
+
+def test_settlement_absorbs_cents_lost_to_rounding():
+    # Each balance rounds half up on its own: 10.01 - 5.00 - 5.00 leaves a cent over.
+    balances = {1: Decimal('10.005'), 2: Decimal('-5.0025'), 3: Decimal('-5.0025')}
+    assert simplify_settlements(balances) == [
+        {'from_user': 2, 'to_user': 1, 'amount': Decimal('5.00')},
+        {'from_user': 3, 'to_user': 1, 'amount': Decimal('5.00')},
+    ]
+    # 0.00 + 0.00 - 0.01: the lone cent is rounding noise, nothing is left to settle.
+    balances = {1: Decimal('0.004'), 2: Decimal('0.004'), 3: Decimal('-0.008')}
+    assert simplify_settlements(balances) == []
+
+
+def test_minimal_transfers_beats_id_ordered_greedy():
+    # Pairing by user id would need three transfers (3->1, 3->2, 4->2).
+    transfers = minimal_transfers({1: 500, 2: 1000, 3: -1000, 4: -500})
+    assert transfers == [
+        Transfer(from_user=3, to_user=2, amount_minor=1000),
+        Transfer(from_user=4, to_user=1, amount_minor=500),
+    ]
+
+
+def test_minimal_transfers_finds_zero_sum_subgroups():
+    balances = {1: 300, 2: -100, 3: -200, 4: 700, 5: -450, 6: -250}
+    transfers = minimal_transfers(balances)
+    assert len(transfers) == 4
+
+    net = dict.fromkeys(balances, 0)
+    for transfer in transfers:
+        net[transfer.from_user] += transfer.amount_minor
+        net[transfer.to_user] -= transfer.amount_minor
+    assert all(net[user_id] == -amount for user_id, amount in balances.items())
+
+
+def test_minimal_transfers_large_group_uses_heuristic():
+    rng = random.Random(7)
+    balances = {user_id: rng.randint(-10_000, 10_000) for user_id in range(1, 200)}
+    balances[200] = -sum(balances.values())
+    transfers = minimal_transfers(balances)
+    assert len(transfers) <= len([b for b in balances.values() if b]) - 1
+
+    net = dict.fromkeys(balances, 0)
+    for transfer in transfers:
+        assert transfer.amount_minor > 0
+        net[transfer.from_user] += transfer.amount_minor
+        net[transfer.to_user] -= transfer.amount_minor
+    assert all(net[user_id] == -amount for user_id, amount in balances.items())
+
+
+def test_minimal_transfers_rejects_unbalanced_input():
+    with pytest.raises(ValueError):
+        minimal_transfers({1: 100, 2: -50})
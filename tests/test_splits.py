@@ -0,0 +1,146 @@
+import datetime as dt
+import random
+from collections import Counter
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import MembershipRole
+from app.services.snapshots import MemberRef, SplitTemplateRef, WorkspaceSnapshot
+from app.services.splits import (
+    SplitBatch,
+    SplitSpec,
+    compiled_templates,
+    default_split,
+    largest_remainder,
+    resolve_split,
+)
+from app.services.transactions import unnest_split_insert
+
+
+def _snapshot(*weights: int, templates: tuple[SplitTemplateRef, ...] = ()) -> WorkspaceSnapshot:
+    members = tuple(
+        MemberRef(user_id, MembershipRole.member, weight, 100 + user_id, None, None, None)
+        for user_id, weight in enumerate(weights, start=1)
+    )
+    return WorkspaceSnapshot(
+        version=1, wallets=(), categories=(), members=members, split_templates=templates
+    )
+
+
+def test_largest_remainder_gives_leftover_to_largest_fractions():
+    assert largest_remainder(100, [1, 1, 1]) == [34, 33, 33]
+    # 10 * 1/6 = 1.67, 10 * 2/6 = 3.33, 10 * 3/6 = 5: the .67 remainder wins.
+    assert largest_remainder(10, [1, 2, 3]) == [2, 3, 5]
+    assert sum(largest_remainder(99_999, [7, 3, 11, 0])) == 99_999
+    with pytest.raises(ValueError):
+        largest_remainder(100, [0, 0])
+
+
+def test_largest_remainder_properties_on_random_inputs():
+    rng = random.Random(40)
+    for _ in range(500):
+        weights = [rng.randint(0, 20) for _ in range(rng.randint(1, 60))]
+        if not any(weights):
+            weights[0] = 1
+        amount = rng.randint(1, 10_000_000)
+        parts = largest_remainder(amount, weights, seed=rng.randint(0, 10**9))
+        total = sum(weights)
+        assert sum(parts) == amount
+        remainders = []
+        for part, weight in zip(parts, weights):
+            floor, remainder = divmod(amount * weight, total)
+            # Quota rule: every part is its exact quota rounded down or up.
+            assert part in (floor, floor + 1)
+            if remainder == 0:
+                assert part == floor
+            remainders.append((remainder, part - floor))
+        # Hamilton: no unrounded share has a larger remainder than a rounded-up one.
+        rounded_up = [remainder for remainder, extra in remainders if extra]
+        kept = [remainder for remainder, extra in remainders if not extra and remainder]
+        if rounded_up and kept:
+            assert min(rounded_up) >= max(kept)
+
+
+def test_rotating_tie_break_spreads_rounding_evenly():
+    members = (1, 1, 1)
+    extra = Counter()
+    for tx_id in range(300):
+        for idx, part in enumerate(largest_remainder(100, members, seed=tx_id)):
+            extra[idx] += part - 33
+    assert extra == {0: 100, 1: 100, 2: 100}
+    assert largest_remainder(100, members) == largest_remainder(100, members, seed=3)
+
+
+def test_default_split_is_deterministic_per_transaction():
+    compiled = default_split(_snapshot(*[1] * 1000))
+    batch = SplitBatch()
+    # Expenses seed the rounding with their transaction id.
+    first = compiled.allocate_into(batch, 77, 10_000_001, seed=77)
+    assert first == compiled.allocate_into(SplitBatch(), 77, 10_000_001, seed=77)
+    assert sum(first) == 10_000_001
+    # The one leftover cent goes to the member at the seed's position.
+    assert [user_id for _, user_id, amount in batch.rows() if amount == 10_001] == [78]
+    second = compiled.allocate_into(batch, 78, 10_000_001, seed=78)
+    assert second.index(10_001) == 78
+    assert len(batch) == 2_000
+    assert set(batch.transaction_ids) == {77, 78}
+
+
+def test_split_batch_keeps_columns_aligned():
+    batch = SplitBatch()
+    compiled = default_split(_snapshot(2, 1))
+    assert compiled.allocate_into(batch, 5, 1_001, seed=5) == [667, 334]
+    batch.extend(6, (1,), [40])
+    assert list(batch.rows()) == [(5, 1, 667), (5, 2, 334), (6, 1, 40)]
+    with pytest.raises(ValueError):
+        batch.extend(7, (1, 2), [10])
+    assert len(batch) == 3
+
+
+def test_exact_and_percent_splits_are_validated():
+    snapshot = _snapshot(1, 1, 1)
+    assert resolve_split(snapshot, SplitSpec.exact({1: 700, 3: 300}), 1_000) == [
+        (1, 700),
+        (3, 300),
+    ]
+    with pytest.raises(ValueError):
+        resolve_split(snapshot, SplitSpec.exact({1: 700}), 1_000)
+    with pytest.raises(ValueError):
+        resolve_split(snapshot, SplitSpec.exact({1: 500, 9: 500}), 1_000)
+
+    spec = SplitSpec.percent({1: Decimal("33.33"), 2: "33.33", 3: "33.34"})
+    assert resolve_split(snapshot, spec, 100) == [(1, 33), (2, 33), (3, 34)]
+    with pytest.raises(ValueError):
+        SplitSpec.percent({1: "60", 2: "30"})
+    with pytest.raises(ValueError):
+        SplitSpec.percent({1: "33.333", 2: "66.667"})
+    for raw in ("Infinity", "-Infinity", "NaN"):
+        with pytest.raises(ValueError):
+            SplitSpec.percent({1: raw})
+
+
+def test_subset_uses_share_weights_of_the_chosen_members():
+    snapshot = _snapshot(1, 2, 5)
+    assert resolve_split(snapshot, SplitSpec.subset([2, 1]), 900) == [(1, 300), (2, 600)]
+
+
+def test_templates_compile_once_and_skip_former_members():
+    templates = (SplitTemplateRef(1, "rent", "1:2,2:1,9:4"),)
+    snapshot = _snapshot(1, 1, templates=templates)
+    compiled = compiled_templates(snapshot)
+    assert compiled["rent"].user_ids == (1, 2)
+    assert compiled_templates(snapshot) is compiled
+    assert resolve_split(snapshot, SplitSpec.named("Rent"), 1_001) == [(1, 667), (2, 334)]
+    with pytest.raises(ValueError):
+        resolve_split(snapshot, SplitSpec.named("groceries"), 100)
+
+
+def test_postgresql_split_insert_names_the_unnested_columns():
+    batch = SplitBatch()
+    batch.extend(1, (1, 2), [60, 40])
+    moment = dt.datetime(2025, 5, 1, tzinfo=dt.timezone.utc)
+    sql = str(unnest_split_insert(batch, [moment, moment]).compile(dialect=postgresql.dialect()))
+    assert "AS anon_1(transaction_id, user_id, amount_minor, occurred_at)" in sql
+    assert "SELECT anon_1.transaction_id, anon_1.user_id" in sql
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+from benchmarks.bench_startup import DEFERRED_IMPORTS, ENTRY_POINTS, import_profile
+
+ENV = {
+    **os.environ,
+    "DATABASE_URL": "sqlite+aiosqlite:///:memory:",
+    "BOT_TOKEN": "123456:startup-test",
+    "JWT_SECRET": "startup-test",
+}
+
+
+@pytest.mark.parametrize("module", sorted(ENTRY_POINTS.values()))
+def test_entry_points_defer_the_bot_and_engine(module):
+    profile = import_profile(module, ENV)
+    assert module in profile
+    loaded = sorted(name for name in profile if name.split(".")[0] in DEFERRED_IMPORTS)
+    assert loaded == []
@@ -0,0 +1,29 @@
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.web_metrics import WorkerMetrics, metrics_middleware
+
+
+async def test_middleware_counts_requests_per_route():
+    async def ok(request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    async def broken(request: web.Request) -> web.Response:
+        raise RuntimeError("boom")
+
+    app = web.Application(middlewares=[metrics_middleware])
+    app["metrics"] = WorkerMetrics(worker=1, workers=2)
+    app.router.add_get("/api/items/{item_id}", ok)
+    app.router.add_get("/broken", broken)
+
+    async with TestClient(TestServer(app)) as client:
+        for item_id in (1, 2):
+            assert (await client.get(f"/api/items/{item_id}")).status == 200
+        assert (await client.get("/broken")).status == 500
+        assert (await client.get("/missing")).status == 404
+
+    routes = app["metrics"].routes
+    assert routes["GET /api/items/{item_id}"].count == 2
+    assert routes["GET /broken"].errors == 1
+    assert routes["GET unmatched"].count == 1
+    assert app["metrics"].in_flight == 0
@@ -0,0 +1,181 @@
+import hashlib
+import hmac
+import json
+import time
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import web_server
+from app.db.base import Base
+from app.db.invalidation import InvalidationEvent, bus
+from app.db.models import Category, User
+from app.services.transactions import create_expense
+from app.services.users import ensure_user_from_payload
+from app.services.wallets import ensure_default_wallets, get_default_wallet
+from app.services.workspaces import add_member, create_workspace
+
+BOT_TOKEN = "123456:test-token"
+
+
+def init_data(user: dict) -> str:
+    data = {"auth_date": str(int(time.time())), "user": json.dumps(user)}
+    check = "\n".join(f"{key}={value}" for key, value in sorted(data.items()))
+    secret = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest()
+    data["hash"] = hmac.new(secret, check.encode(), hashlib.sha256).hexdigest()
+    return urlencode(data)
+
+
+@pytest.fixture
+async def session_factory(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(web_server, "async_session_factory", factory)
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(session_factory):
+    app = web.Application()
+    app["settings"] = SimpleNamespace(bot_token=BOT_TOKEN)
+    for path, handler in (
+        ("/api/status", web_server.handle_status),
+        ("/api/report", web_server.handle_report),
+        ("/api/balance", web_server.handle_balance),
+    ):
+        app.router.add_get(path, handler)
+    app.router.add_post("/api/expense", web_server.handle_expense)
+    async with TestClient(TestServer(app)) as client:
+        yield client
+
+
+async def test_read_endpoints_revalidate_without_queries(session_factory, client):
+    async with session_factory() as session:
+        user = User(tg_id=10, first_name="A")
+        session.add(user)
+        await session.commit()
+        workspace = await create_workspace(session, user, "Home", "USD")
+        await ensure_default_wallets(session, workspace, user)
+
+    headers = {"X-Telegram-Init-Data": init_data({"id": 10, "first_name": "A"})}
+    etags = {}
+    for path in ("/api/status", "/api/report", "/api/balance"):
+        response = await client.get(path, headers=headers)
+        assert response.status == 200
+        assert response.headers["Cache-Control"] == "private, no-cache"
+        etags[path] = response.headers["ETag"]
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    for path, etag in etags.items():
+        response = await client.get(path, headers={**headers, "If-None-Match": etag})
+        assert response.status == 304, path
+        assert response.headers["ETag"] == etag
+    assert statements == []
+
+    # A new profile in the init data changes the status body, so its ETag no longer matches.
+    renamed = {"X-Telegram-Init-Data": init_data({"id": 10, "first_name": "B"})}
+    response = await client.get(
+        "/api/status", headers={**renamed, "If-None-Match": etags["/api/status"]}
+    )
+    assert response.status == 200
+
+    async with session_factory() as session:
+        user = await session.get(User, user.id)
+        wallet = await get_default_wallet(session, workspace, user, "USD")
+        await create_expense(session, workspace, wallet, 500, "USD", None, user, None)
+    for path in ("/api/report", "/api/balance"):
+        response = await client.get(path, headers={**headers, "If-None-Match": etags[path]})
+        assert response.status == 200, path
+        assert response.headers["ETag"] != etags[path]
+
+
+async def test_member_renames_invalidate_the_balance(session_factory, client):
+    async with session_factory() as session:
+        user = await ensure_user_from_payload(session, {"id": 40, "first_name": "Ann"})
+        other = await ensure_user_from_payload(session, {"id": 41, "first_name": "Bob"})
+        workspace = await create_workspace(session, user, "Home", "USD")
+        await add_member(session, workspace, other)
+        await ensure_default_wallets(session, workspace, user)
+        wallet = await get_default_wallet(session, workspace, user, "USD")
+        await create_expense(session, workspace, wallet, 500, "USD", None, user, None)
+
+    headers = {"X-Telegram-Init-Data": init_data({"id": 40, "first_name": "Ann"})}
+    etag = (await client.get("/api/balance", headers=headers)).headers["ETag"]
+
+    # Another member renamed on Telegram; the bot saw it first.
+    async with session_factory() as session:
+        await ensure_user_from_payload(session, {"id": 41, "first_name": "Rob"})
+    response = await client.get("/api/balance", headers={**headers, "If-None-Match": etag})
+    assert response.status == 200
+    assert "Rob" in (await response.json())["report"]
+    etag = response.headers["ETag"]
+
+    # The requester renamed; only the init data knows so far.
+    renamed = {"X-Telegram-Init-Data": init_data({"id": 40, "first_name": "Anna"})}
+    response = await client.get("/api/balance", headers={**renamed, "If-None-Match": etag})
+    assert response.status == 200
+    assert "Anna" in (await response.json())["report"]
+
+
+async def test_remote_bumps_and_workspace_switches_invalidate(session_factory, client):
+    async with session_factory() as session:
+        user = User(tg_id=20, first_name="A")
+        session.add(user)
+        await session.commit()
+        await create_workspace(session, user, "Home", "USD")
+
+    headers = {"X-Telegram-Init-Data": init_data({"id": 20, "first_name": "A"})}
+    etag = (await client.get("/api/report", headers=headers)).headers["ETag"]
+    response = await client.get("/api/report", headers={**headers, "If-None-Match": etag})
+    assert response.status == 304
+
+    # Switching away bumps the previous workspace, so its ETag stops matching here.
+    async with session_factory() as session:
+        user = await session.get(User, user.id)
+        trip = await create_workspace(session, user, "Trip", "EUR")
+    response = await client.get("/api/report", headers={**headers, "If-None-Match": etag})
+    assert response.status == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith(f'"report-{trip.id}-')
+    conditional = {**headers, "If-None-Match": etag}
+    assert (await client.get("/api/report", headers=conditional)).status == 304
+
+    # Another process committed a write; its event arrives through the bus.
+    remote = InvalidationEvent("workspace_data", trip.id, trip.data_version + 1, time.time())
+    bus.dispatch(remote.encode())
+    assert (await client.get("/api/report", headers=conditional)).status == 200
+
+
+async def test_rejected_splits_answer_a_code_and_create_nothing(session_factory, client):
+    async with session_factory() as session:
+        user = User(tg_id=30, first_name="A")
+        session.add(user)
+        await session.commit()
+        workspace = await create_workspace(session, user, "Home", "USD")
+        await ensure_default_wallets(session, workspace, user)
+
+    headers = {"X-Telegram-Init-Data": init_data({"id": 30, "first_name": "A"})}
+    for split in (
+        {"split_percent": {str(user.id): "Infinity"}},
+        {"split_percent": {str(user.id): "NaN"}},
+        {"split_exact": {str(user.id): "5"}},
+        {"split_members": [999]},
+        {"split_template": "missing"},
+    ):
+        body = {"amount": "10", "category": "Brand new", **split}
+        response = await client.post("/api/expense", json=body, headers=headers)
+        assert (response.status, (await response.json())["error"]) == (400, "invalid_split")
+
+    async with session_factory() as session:
+        count = await session.scalar(select(func.count()).select_from(Category))
+    assert count == 0
@@ -1,18 +1,74 @@
 from __future__ import annotations
 
 import datetime as dt
+import json
+import time
+from dataclasses import replace
+from decimal import Decimal
 
 import pytest
+from sqlalchemy import delete, event, func, select, update
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from app.db.base import Base
-from app.db.models import User
-from app.services.balance import calculate_balances
-from app.services.categories import ensure_default_categories, get_or_create_category
+from app.db.invalidation import InvalidationEvent, bus
+from app.db.models import (
+    AuditLog,
+    Category,
+    CategoryType,
+    JournalEvent,
+    JournalSnapshot,
+    TransactionSplit,
+    User,
+    Workspace,
+)
+from app.services.balance import (
+    calculate_balances,
+    get_settlement_suggestions,
+    recompute_balances,
+)
+from app.services.anomalies import anomaly_detector
+from app.services.audit import BATCH_SIZE, audit_writer
+from app.services.budgets import list_budget_status, set_budget
+from app.services.categories import (
+    ensure_default_categories,
+    get_or_create_category,
+    list_categories,
+)
+from app.services.fx import set_rate
+from app.services.journal import EXPENSE_CREATED, rebuild_state
+from app.services.notifications import alert_notifier
+from app.services.recurring import (
+    RecurringScheduler,
+    create_recurring_rule,
+    list_recurring_rules,
+)
 from app.services.reporting import monthly_expense_report
-from app.services.transactions import create_expense
-from app.services.wallets import ensure_default_wallets, get_default_wallet
-from app.services.workspaces import add_member, create_workspace
+from app.services.settlement import Transfer
+from app.services.snapshots import (
+    bump_workspace_version,
+    get_workspace_snapshot,
+    snapshot_cache,
+)
+from app.services.splits import SplitSpec, set_split_template
+from app.services.transactions import ExpenseDraft, create_expense, insert_expenses
+from app.services.transfers import create_transfer, record_settlement
+from app.services.users import ensure_user_from_payload
+from app.services.wallets import (
+    create_wallet,
+    ensure_default_wallets,
+    get_default_wallet,
+    get_personal_wallet,
+)
+from app.services.workspaces import (
+    add_member,
+    create_workspace,
+    get_workspace_by_id,
+    set_implicit_splits,
+    set_share_weight,
+)
+
+NO_LAG = dt.timedelta(0)
 
 
 @pytest.fixture
@@ -90,3 +146,752 @@ async def test_monthly_report(session_factory):
         report = await monthly_expense_report(session, workspace, now=dt.datetime.now(dt.timezone.utc))
         assert "USD" in report
         assert "Other" in report
+
+
+@pytest.mark.asyncio
+async def test_settlement_suggestions_follow_new_expenses(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=20, first_name="A")
+        u2 = User(tg_id=21, first_name="B")
+        session.add_all([u1, u2])
+        await session.commit()
+
+        workspace = await create_workspace(session, u1, "Flat", "USD")
+        await add_member(session, workspace, u2)
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+        assert wallet is not None
+
+        async def spend(payer: User, amount_minor: int) -> None:
+            await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=amount_minor,
+                currency="USD",
+                note=None,
+                payer=payer,
+                category_id=None,
+            )
+
+        await spend(u1, 1000)
+        first = await get_settlement_suggestions(session, workspace)
+        assert first == {"USD": [Transfer(from_user=u2.id, to_user=u1.id, amount_minor=500)]}
+        assert await get_settlement_suggestions(session, workspace) is first
+
+        await spend(u2, 1000)
+        assert await get_settlement_suggestions(session, workspace) == {}
+
+
+@pytest.mark.asyncio
+async def test_settlements_and_transfers_update_running_balances(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=30, first_name="A")
+        u2 = User(tg_id=31, first_name="B")
+        session.add_all([u1, u2])
+        await session.commit()
+
+        workspace = await create_workspace(session, u1, "Couple", "USD")
+        await add_member(session, workspace, u2)
+        await ensure_default_wallets(session, workspace, u1)
+        await ensure_default_wallets(session, workspace, u2)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+        assert wallet is not None
+
+        await create_expense(
+            session,
+            workspace=workspace,
+            wallet=wallet,
+            amount_minor=3000,
+            currency="USD",
+            note=None,
+            payer=u1,
+            category_id=None,
+        )
+        await record_settlement(
+            session,
+            workspace=workspace,
+            wallet=wallet,
+            payer=u2,
+            payee=u1,
+            amount_minor=1000,
+            currency="USD",
+            note=None,
+        )
+        balances = await calculate_balances(session, workspace)
+        assert balances["USD"][u1.id] == 500
+        assert balances["USD"][u2.id] == -500
+
+        personal_u1 = await get_personal_wallet(session, workspace, u1, "USD")
+        personal_u2 = await get_personal_wallet(session, workspace, u2, "USD")
+        await create_transfer(
+            session,
+            workspace=workspace,
+            from_wallet=personal_u2,
+            to_wallet=personal_u1,
+            amount_minor=500,
+            note=None,
+            user=u2,
+        )
+        await create_transfer(
+            session,
+            workspace=workspace,
+            from_wallet=wallet,
+            to_wallet=personal_u1,
+            amount_minor=700,
+            note="top up",
+            user=u1,
+        )
+
+        balances = await calculate_balances(session, workspace)
+        assert balances["USD"][u1.id] == 0
+        assert balances["USD"][u2.id] == 0
+        assert await recompute_balances(session, workspace) == {"USD": {u1.id: 0, u2.id: 0}}
+
+        with pytest.raises(ValueError):
+            await record_settlement(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                payer=u1,
+                payee=u1,
+                amount_minor=100,
+                currency="USD",
+                note=None,
+            )
+
+
+@pytest.mark.asyncio
+async def test_multi_currency_settlement_nets_into_base_currency(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=40, first_name="A")
+        u2 = User(tg_id=41, first_name="B")
+        session.add_all([u1, u2])
+        await session.commit()
+
+        workspace = await create_workspace(session, u1, "Trip", "USD")
+        await add_member(session, workspace, u2)
+        await ensure_default_wallets(session, workspace, u1)
+        usd_wallet = await get_default_wallet(session, workspace, u1, "USD")
+        eur_wallet = await create_wallet(session, workspace, "Euro", "shared", "EUR")
+
+        for payer, wallet, currency in ((u1, usd_wallet, "USD"), (u2, eur_wallet, "EUR")):
+            await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=1000,
+                currency=currency,
+                note=None,
+                payer=payer,
+                category_id=None,
+            )
+
+        assert set(await get_settlement_suggestions(session, workspace)) == {"USD", "EUR"}
+
+        await set_rate(session, workspace, "EUR", Decimal("1.2"), dt.date(2020, 1, 1))
+        suggestions = await get_settlement_suggestions(session, workspace)
+        assert suggestions == {"USD": [Transfer(from_user=u1.id, to_user=u2.id, amount_minor=100)]}
+
+        report = await monthly_expense_report(session, workspace)
+        assert "Total in USD: 22.00 USD" in report
+
+
+@pytest.mark.asyncio
+async def test_category_lookup_reuses_existing_categories(session_factory):
+    async with session_factory() as session:
+        owner = User(tg_id=1, first_name="A")
+        session.add(owner)
+        await session.commit()
+        await session.refresh(owner)
+        workspace = await create_workspace(session, owner, "Home", "USD")
+        await ensure_default_categories(session, workspace)
+
+        cafe = await get_or_create_category(session, workspace, "Cafe", "expense")
+        for name in ("cafe", "Cafe ", "caffe"):
+            ref = await get_or_create_category(session, workspace, name, "expense", True)
+            assert ref.id == cafe.id
+        # Creating a category explicitly never maps a new name onto a close one.
+        books = await get_or_create_category(session, workspace, "Books", "expense")
+        boots = await get_or_create_category(session, workspace, "Boots", "expense")
+        assert boots.id != books.id and boots.name == "Boots"
+        income = await get_or_create_category(session, workspace, "cafe", "income")
+        assert income.id != cafe.id
+
+    # A fresh process only knows the table; the name falls back to the indexed lookup.
+    snapshot_cache.clear()
+    async with session_factory() as session:
+        workspace = await get_workspace_by_id(session, workspace.id)
+        assert (await get_or_create_category(session, workspace, "CAFE", "expense")).id == cafe.id
+        categories = await list_categories(session, workspace, "expense")
+        assert sorted(category.name for category in categories) == [
+            "Books",
+            "Boots",
+            "Cafe",
+            "Other",
+        ]
+
+
+@pytest.mark.asyncio
+async def test_workspace_snapshot_follows_version_bumps(session_factory):
+    async with session_factory() as session:
+        owner = User(tg_id=1, first_name="A")
+        session.add(owner)
+        await session.commit()
+        await session.refresh(owner)
+        workspace = await create_workspace(session, owner, "Home", "USD")
+        await ensure_default_wallets(session, workspace, owner)
+        assert workspace.version == 1
+        await get_default_wallet(session, workspace, owner, "USD")
+
+    statements = []
+    engine = session_factory.kw["bind"]
+
+    def listen(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", listen)
+    try:
+        async with session_factory() as session:
+            workspace = await get_workspace_by_id(session, workspace.id)
+            statements.clear()
+            assert (await get_default_wallet(session, workspace, owner, "USD")).name == "Shared"
+            assert statements == []
+
+        # A write from elsewhere bumps the version; the next loaded row sees it.
+        async with session_factory() as session:
+            workspace = await get_workspace_by_id(session, workspace.id)
+            await create_wallet(session, workspace, "Cash", "shared", "EUR")
+        async with session_factory() as session:
+            workspace = await get_workspace_by_id(session, workspace.id)
+            assert workspace.version == 2
+            assert (await get_default_wallet(session, workspace, owner, "EUR")).name == "Cash"
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", listen)
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_reference_data_never_reaches_the_snapshot_cache(session_factory):
+    async with session_factory() as session:
+        owner = User(tg_id=1, first_name="A")
+        session.add(owner)
+        await session.commit()
+        workspace_id = (await create_workspace(session, owner, "Home", "USD")).id
+
+    async with session_factory() as session:
+        workspace = await get_workspace_by_id(session, workspace_id)
+        session.add(Category(workspace_id=workspace_id, name="Draft", type=CategoryType.expense))
+        await bump_workspace_version(session, workspace)
+        # The writing transaction sees its own category...
+        snapshot = await get_workspace_snapshot(session, workspace)
+        assert [category.name for category in snapshot.categories] == ["Draft"]
+        await session.rollback()
+
+    # ...but nothing of it is cached: another process now commits the same version
+    # number, and its event cannot tell a stale snapshot at that version apart.
+    async with session_factory() as session:
+        session.add(Category(workspace_id=workspace_id, name="Kept", type=CategoryType.expense))
+        version = (
+            await session.execute(
+                update(Workspace)
+                .where(Workspace.id == workspace_id)
+                .values(version=Workspace.version + 1)
+                .returning(Workspace.version)
+            )
+        ).scalar_one()
+        await session.commit()
+    bus.dispatch(InvalidationEvent("workspace", workspace_id, version, time.time()).encode())
+
+    async with session_factory() as session:
+        workspace = await get_workspace_by_id(session, workspace_id)
+        snapshot = await get_workspace_snapshot(session, workspace)
+        assert [category.name for category in snapshot.categories] == ["Kept"]
+
+
+@pytest.mark.asyncio
+async def test_budget_counters_alert_when_thresholds_are_crossed(session_factory):
+    alerts = []
+
+    async def collect(batch):
+        alerts.extend(batch)
+
+    alert_notifier.subscribe(collect)
+    try:
+        async with session_factory() as session:
+            u1 = User(tg_id=1, first_name="A")
+            u2 = User(tg_id=2, first_name="B")
+            session.add_all([u1, u2])
+            await session.commit()
+            workspace = await create_workspace(session, u1, "Home", "USD")
+            await add_member(session, workspace, u2)
+            await ensure_default_wallets(session, workspace, u1)
+            wallet = await get_default_wallet(session, workspace, u1, "USD")
+            cafe = await get_or_create_category(session, workspace, "Cafe", "expense")
+
+            async def spend(amount_minor):
+                await create_expense(
+                    session,
+                    workspace=workspace,
+                    wallet=wallet,
+                    amount_minor=amount_minor,
+                    currency="USD",
+                    note=None,
+                    payer=u1,
+                    category_id=cafe.id,
+                )
+
+            # Spending before the budget exists is counted when it is set.
+            await spend(5_000)
+            await set_budget(session, workspace, cafe.id, "USD", 10_000, (50, 100))
+            assert alerts == []
+
+            await spend(4_000)
+            assert alerts == []
+            await spend(2_000)
+            assert [(alert.threshold, alert.spent_minor) for alert in alerts] == [(100, 11_000)]
+            assert alerts[0].recipients == (1, 2)
+
+            [status] = await list_budget_status(session, workspace)
+            assert (status.category_name, status.spent_minor) == ("Cafe", 11_000)
+    finally:
+        alert_notifier.unsubscribe(collect)
+
+
+@pytest.mark.asyncio
+async def test_backdated_spend_counts_what_its_month_already_spent(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=1, first_name="A")
+        session.add(u1)
+        await session.commit()
+        workspace = await create_workspace(session, u1, "Home", "USD")
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+        cafe = await get_or_create_category(session, workspace, "Cafe", "expense")
+        this_month = dt.datetime.now(dt.timezone.utc).replace(day=1)
+        last_month = (this_month - dt.timedelta(days=1)).replace(day=10)
+        draft = ExpenseDraft(wallet.id, 6_000, "USD", None, u1.id, cafe.id, last_month)
+        await insert_expenses(session, workspace, [draft])
+        await session.commit()
+        # Only this month's counter is seeded here.
+        await set_budget(session, workspace, cafe.id, "USD", 10_000, (50, 100))
+
+        _, alerts = await insert_expenses(session, workspace, [replace(draft, amount_minor=5_000)])
+        await session.commit()
+        assert [(alert.threshold, alert.spent_minor) for alert in alerts] == [(100, 11_000)]
+        [status] = await list_budget_status(session, workspace, last_month.date().replace(day=1))
+        assert status.spent_minor == 11_000
+
+
+@pytest.mark.asyncio
+async def test_recurring_scheduler_catches_up_missed_runs(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=1, first_name="A")
+        u2 = User(tg_id=2, first_name="B")
+        session.add_all([u1, u2])
+        await session.commit()
+        workspace = await create_workspace(session, u1, "Home", "USD")
+        await add_member(session, workspace, u2)
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+        rent = await get_or_create_category(session, workspace, "Rent", "expense")
+        start = dt.datetime(2025, 1, 31, 9, tzinfo=dt.timezone.utc)
+        await create_recurring_rule(
+            session,
+            workspace=workspace,
+            wallet=wallet,
+            payer=u1,
+            amount_minor=100_00,
+            currency="USD",
+            category_id=rent.id,
+            note="rent",
+            interval="monthly",
+            start_at=start,
+        )
+
+    scheduler = RecurringScheduler(session_factory, batch_size=1)
+    now = dt.datetime(2025, 4, 15, tzinfo=dt.timezone.utc)
+    assert await scheduler.run_once(now) == 3
+    assert await scheduler.run_once(now) == 0
+
+    async with session_factory() as session:
+        workspace = await get_workspace_by_id(session, workspace.id)
+        balances = await calculate_balances(session, workspace)
+        assert balances["USD"] == {u1.id: 150_00, u2.id: -150_00}
+        [rule] = await list_recurring_rules(session, workspace)
+        assert rule.next_run_at.date() == dt.date(2025, 4, 30)
+        report = await monthly_expense_report(
+            session, workspace, dt.datetime(2025, 2, 10, tzinfo=dt.timezone.utc)
+        )
+        assert "Rent" in report
+
+
+@pytest.mark.asyncio
+async def test_anomaly_detector_flags_duplicates_and_persists_statistics(session_factory):
+    alerts = []
+
+    async def collect(batch):
+        alerts.extend(batch)
+
+    alert_notifier.subscribe(collect)
+    try:
+        async with session_factory() as session:
+            u1 = User(tg_id=1, first_name="A")
+            session.add(u1)
+            await session.commit()
+            workspace = await create_workspace(session, u1, "Home", "USD")
+            await ensure_default_wallets(session, workspace, u1)
+            wallet = await get_default_wallet(session, workspace, u1, "USD")
+            cafe = await get_or_create_category(session, workspace, "Cafe", "expense")
+
+        # A rolled-back expense is neither a duplicate source nor a sample.
+        async with session_factory() as session:
+            scratch = await get_workspace_by_id(session, workspace.id)
+            draft = ExpenseDraft(wallet.id, 1_250, "USD", None, u1.id, cafe.id)
+            await insert_expenses(session, scratch, [draft])
+            await session.rollback()
+        assert anomaly_detector.stats(workspace.id, u1.id, cafe.id, "USD") is None
+
+        async with session_factory() as session:
+
+            async def expense(amount_minor):
+                await create_expense(
+                    session,
+                    workspace=workspace,
+                    wallet=wallet,
+                    amount_minor=amount_minor,
+                    currency="USD",
+                    note=None,
+                    payer=u1,
+                    category_id=cafe.id,
+                )
+
+            await expense(1_250)
+            await expense(1_250)
+            assert [(alert.kind, alert.recipients) for alert in alerts] == [("duplicate", (1,))]
+            assert "Cafe" in alerts[0].message()
+            assert await anomaly_detector.flush(session_factory) == 1
+
+            # The next expense comes from another process with nothing in memory.
+            anomaly_detector.clear()
+            await expense(1_300)
+            assert len(alerts) == 1
+            assert await anomaly_detector.flush(session_factory) == 1
+
+        # Each process added its own samples to the stored sums.
+        async with session_factory() as session:
+            await anomaly_detector.ensure_loaded(session, workspace.id)
+        stats = anomaly_detector.stats(workspace.id, u1.id, cafe.id, "USD")
+        assert stats.count == 3
+    finally:
+        alert_notifier.unsubscribe(collect)
+
+
+@pytest.mark.asyncio
+async def test_audit_entries_are_buffered_until_flushed(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=1, first_name="A")
+        u2 = User(tg_id=2, first_name="B")
+        session.add_all([u1, u2])
+        await session.commit()
+        workspace = await create_workspace(session, u1, "Home", "USD")
+        await add_member(session, workspace, u2)
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+        tx = await create_expense(
+            session,
+            workspace=workspace,
+            wallet=wallet,
+            amount_minor=1_000,
+            currency="USD",
+            note=None,
+            payer=u1,
+            category_id=None,
+        )
+        assert (await session.execute(select(func.count(AuditLog.id)))).scalar_one() == 0
+
+    audit_writer.batch_size = 2
+    try:
+        assert await audit_writer.flush(session_factory) == 5
+    finally:
+        audit_writer.batch_size = BATCH_SIZE
+    async with session_factory() as session:
+        rows = (await session.execute(select(AuditLog).order_by(AuditLog.id))).scalars().all()
+    assert [row.action for row in rows] == [
+        "workspace.created",
+        "member.joined",
+        "wallet.created",
+        "wallet.created",
+        "expense.created",
+    ]
+    assert (rows[-1].entity_id, rows[-1].actor_user_id) == (tx.id, u1.id)
+    assert json.loads(rows[-1].details)["amount_minor"] == 1_000
+
+
+@pytest.mark.asyncio
+async def test_journal_rebuild_replays_tail_after_snapshot(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=1, first_name="A")
+        u2 = User(tg_id=2, first_name="B")
+        session.add_all([u1, u2])
+        await session.commit()
+        workspace = await create_workspace(session, u1, "Home", "USD")
+        await add_member(session, workspace, u2)
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+
+        async def spend(payer, amount_minor):
+            await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=amount_minor,
+                currency="USD",
+                note=None,
+                payer=payer,
+                category_id=None,
+            )
+
+        await spend(u1, 1_000)
+        await set_share_weight(session, workspace, u2.id, 3)
+        await spend(u2, 400)
+
+        state = await rebuild_state(session, workspace, snapshot_every=3, snapshot_lag=NO_LAG)
+        assert state.balances == await calculate_balances(session, workspace)
+        assert state.weights == {u1.id: 1, u2.id: 3}
+        await session.commit()
+        snapshots = await session.execute(select(func.count(JournalSnapshot.id)))
+        assert snapshots.scalar_one() == 1
+
+        await record_settlement(session, workspace, wallet, u2, u1, 200, "USD", None)
+        await spend(u1, 800)
+        state = await rebuild_state(session, workspace, snapshot_every=3, snapshot_lag=NO_LAG)
+        assert state.balances == await calculate_balances(session, workspace)
+        month = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m")
+        assert state.expenses[month]["USD"] == {0: 2_200}
+        snapshots = await session.execute(select(func.count(JournalSnapshot.id)))
+        assert snapshots.scalar_one() == 1
+
+        with pytest.raises(ValueError):
+            await set_share_weight(session, workspace, 999, 1)
+
+
+@pytest.mark.asyncio
+async def test_journal_rebuild_leaves_committing_to_the_caller(session_factory):
+    async with session_factory() as session:
+        owner = User(tg_id=1, first_name="A")
+        session.add(owner)
+        await session.commit()
+        workspace = await create_workspace(session, owner, "Home", "USD")
+        await ensure_default_wallets(session, workspace, owner)
+        wallet = await get_default_wallet(session, workspace, owner, "USD")
+        for amount_minor in (100, 200, 300):
+            await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=amount_minor,
+                currency="USD",
+                note=None,
+                payer=owner,
+                category_id=None,
+            )
+
+    async with session_factory() as session:
+        session.add(Category(workspace_id=workspace.id, name="Draft", type=CategoryType.expense))
+        await rebuild_state(session, workspace, snapshot_every=1, snapshot_lag=NO_LAG)
+        await session.rollback()
+
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count(Category.id))) == 0
+        # Only the empty snapshot the workspace was created with is left.
+        snapshots = await session.scalars(select(JournalSnapshot.last_event_id))
+        assert snapshots.all() == [0]
+
+        # Without a snapshot to start from the history is refused, not replayed in part.
+        await session.execute(delete(JournalSnapshot))
+        with pytest.raises(ValueError):
+            await rebuild_state(session, workspace)
+
+
+@pytest.mark.asyncio
+async def test_expense_with_template_split_updates_balances(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=1, first_name="A")
+        u2 = User(tg_id=2, first_name="B")
+        u3 = User(tg_id=3, first_name="C")
+        session.add_all([u1, u2, u3])
+        await session.commit()
+        workspace = await create_workspace(session, u1, "Home", "USD")
+        await add_member(session, workspace, u2)
+        await add_member(session, workspace, u3)
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+        await set_split_template(session, workspace, "Rent", {u1.id: 2, u2.id: 1})
+
+        await create_expense(
+            session,
+            workspace=workspace,
+            wallet=wallet,
+            amount_minor=3_000,
+            currency="USD",
+            note=None,
+            payer=u1,
+            category_id=None,
+            split=SplitSpec.named("rent"),
+        )
+        with pytest.raises(ValueError):
+            await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=3_000,
+                currency="USD",
+                note=None,
+                payer=u1,
+                category_id=None,
+                split=SplitSpec.exact({u1.id: 1_000}),
+            )
+        balances = await calculate_balances(session, workspace)
+        assert balances["USD"] == {u1.id: 1_000, u2.id: -1_000}
+        assert await recompute_balances(session, workspace) == {"USD": balances["USD"]}
+
+
+async def test_compact_splits_store_a_membership_version_instead_of_rows(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=1, first_name="A")
+        u2 = User(tg_id=2, first_name="B")
+        u3 = User(tg_id=3, first_name="C")
+        session.add_all([u1, u2, u3])
+        await session.commit()
+        workspace = await create_workspace(session, u1, "Home", "USD")
+        await add_member(session, workspace, u2)
+        await set_implicit_splits(session, workspace, True, u1.id)
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+
+        async def expense(amount_minor: int, split: SplitSpec | None = None):
+            return await create_expense(
+                session,
+                workspace=workspace,
+                wallet=wallet,
+                amount_minor=amount_minor,
+                currency="USD",
+                note=None,
+                payer=u1,
+                category_id=None,
+                split=split,
+            )
+
+        first = await expense(1_001)
+        assert first.split_version == workspace.membership_version == 2
+        await add_member(session, workspace, u3)
+        await set_share_weight(session, workspace, u3.id, 2)
+        second = await expense(1_000)
+        assert second.split_version == 4
+        custom = await expense(500, SplitSpec.subset([u1.id, u2.id]))
+        assert custom.split_version is None
+
+        split_rows = await session.execute(
+            select(TransactionSplit.transaction_id, func.count()).group_by(
+                TransactionSplit.transaction_id
+            )
+        )
+        assert dict(split_rows.all()) == {custom.id: 2}
+        balances = await calculate_balances(session, workspace)
+        assert sum(balances["USD"].values()) == 0
+        assert balances["USD"][u3.id] == -500
+        assert await recompute_balances(session, workspace) == {"USD": balances["USD"]}
+
+
+async def test_backdated_expense_splits_by_weights_of_its_date(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=1, first_name="A")
+        u2 = User(tg_id=2, first_name="B")
+        session.add_all([u1, u2])
+        await session.commit()
+        workspace = await create_workspace(session, u1, "Home", "USD")
+        await add_member(session, workspace, u2)
+        await set_implicit_splits(session, workspace, True, u1.id)
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+        before_change = dt.datetime.now(dt.timezone.utc)
+        await set_share_weight(session, workspace, u2.id, 3)
+
+        draft = ExpenseDraft(wallet.id, 1_000, "USD", None, u1.id, None, before_change)
+        drafts = [draft, replace(draft, occurred_at=None)]
+        txs, _ = await insert_expenses(session, workspace, drafts)
+        await session.commit()
+        assert [tx.split_version for tx in txs] == [2, 3]
+        balances = await calculate_balances(session, workspace)
+        assert balances["USD"] == {u1.id: 500 + 750, u2.id: -(500 + 750)}
+        assert await recompute_balances(session, workspace) == {"USD": balances["USD"]}
+
+
+async def test_default_split_rotates_the_leftover_cent_between_expenses(session_factory):
+    async with session_factory() as session:
+        users = [User(tg_id=tg_id, first_name=str(tg_id)) for tg_id in (1, 2, 3)]
+        session.add_all(users)
+        await session.commit()
+        workspace = await create_workspace(session, users[0], "Home", "USD")
+        for user in users[1:]:
+            await add_member(session, workspace, user)
+        await ensure_default_wallets(session, workspace, users[0])
+        wallet = await get_default_wallet(session, workspace, users[0], "USD")
+
+        draft = ExpenseDraft(wallet.id, 100, "USD", None, users[0].id, None)
+        await insert_expenses(session, workspace, [draft] * 3)
+        await session.commit()
+
+        rows = await session.execute(
+            select(TransactionSplit.user_id).where(TransactionSplit.amount_minor == 34)
+        )
+        # Each expense is seeded by its id, so consecutive ones hand the cent to someone else.
+        assert sorted(rows.scalars()) == sorted(user.id for user in users)
+
+
+async def test_member_rename_reaches_the_cached_snapshot(session_factory):
+    async with session_factory() as session:
+        owner = await ensure_user_from_payload(session, {"id": 1, "first_name": "Ann"})
+        workspace = await create_workspace(session, owner, "Home", "USD")
+        snapshot = await get_workspace_snapshot(session, workspace)
+        assert [member.first_name for member in snapshot.members] == ["Ann"]
+
+    async with session_factory() as session:
+        await ensure_user_from_payload(session, {"id": 1, "first_name": "Anna"})
+
+    async with session_factory() as session:
+        workspace = await get_workspace_by_id(session, workspace.id)
+        snapshot = await get_workspace_snapshot(session, workspace)
+        assert [member.first_name for member in snapshot.members] == ["Anna"]
+
+
+async def test_journal_replays_expenses_as_insert_expenses_writes_them(session_factory):
+    async with session_factory() as session:
+        u1 = User(tg_id=1, first_name="A")
+        u2 = User(tg_id=2, first_name="B")
+        session.add_all([u1, u2])
+        await session.commit()
+        workspace = await create_workspace(session, u1, "Home", "USD")
+        await add_member(session, workspace, u2)
+        await set_share_weight(session, workspace, u2.id, 2)
+        await ensure_default_wallets(session, workspace, u1)
+        wallet = await get_default_wallet(session, workspace, u1, "USD")
+        draft = ExpenseDraft(wallet.id, 1_001, "USD", None, u1.id, None)
+        drafts = [
+            draft,
+            replace(draft, amount_minor=300, payer_id=u2.id, split=SplitSpec.subset([u1.id])),
+        ]
+        await insert_expenses(session, workspace, drafts)
+        await session.commit()
+
+        payloads = await session.scalars(
+            select(JournalEvent.payload).where(JournalEvent.type == EXPENSE_CREATED)
+        )
+        payloads = [json.loads(payload) for payload in payloads]
+        assert [(payload["user_ids"], payload["amounts"]) for payload in payloads] == [
+            ([u1.id, u2.id], [334, 667]),
+            ([u1.id], [300]),
+        ]
+        state = await rebuild_state(session, workspace, snapshot_lag=NO_LAG)
+        assert state.balances == await calculate_balances(session, workspace)
+        assert state.balances["USD"] == {u1.id: 667 - 300, u2.id: -667 + 300}
@@ -7,6 +7,8 @@ const workspaceName = document.getElementById("workspace-name");
 const userPill = document.getElementById("user-pill");
 const reportText = document.getElementById("report-text");
 const balanceText = document.getElementById("balance-text");
+const settleText = document.getElementById("settle-text");
+const settleActions = document.getElementById("settle-actions");
 const formMessage = document.getElementById("form-message");
 
 let submitAction = "expense";
@@ -33,13 +35,55 @@ async function apiFetch(path, options = {}) {
   return payload;
 }
 
+// Read endpoints answer 304 when the ETag we send is still current; the body we kept
+// for that ETag is reused. sessionStorage keeps it across reopening the Mini App.
+const CACHE_PREFIX = "prospera:get:";
+
+function readCached(path) {
+  try {
+    return JSON.parse(sessionStorage.getItem(CACHE_PREFIX + path));
+  } catch (error) {
+    return null;
+  }
+}
+
+function writeCached(path, etag, payload) {
+  try {
+    sessionStorage.setItem(CACHE_PREFIX + path, JSON.stringify({ etag, payload }));
+  } catch (error) {
+    // Storage may be full or disabled; the next request is simply unconditional.
+  }
+}
+
+async function cachedFetch(path) {
+  const cached = readCached(path);
+  const headers = { "X-Telegram-Init-Data": initData };
+  if (cached && cached.etag) {
+    headers["If-None-Match"] = cached.etag;
+  }
+  // The page handles revalidation itself, so keep the browser cache out of the way.
+  const response = await fetch(path, { method: "GET", headers, cache: "no-store" });
+  if (response.status === 304 && cached) {
+    return cached.payload;
+  }
+  const payload = await response.json().catch(() => ({ ok: false }));
+  if (!response.ok || !payload.ok) {
+    throw new Error(payload.error || "Request failed");
+  }
+  const etag = response.headers.get("ETag");
+  if (etag) {
+    writeCached(path, etag, payload);
+  }
+  return payload;
+}
+
 async function loadStatus() {
   if (!initData) {
     statusText.textContent = "Open inside Telegram";
     return;
   }
   try {
-    const data = await apiFetch("/api/status", { method: "GET" });
+    const data = await cachedFetch("/api/status");
     const user = data.user || {};
     const workspace = data.workspace || {};
     const label = user.username ? `@${user.username}` : user.first_name || "Member";
@@ -59,7 +103,7 @@ async function loadReport() {
     return;
   }
   try {
-    const data = await apiFetch("/api/report", { method: "GET" });
+    const data = await cachedFetch("/api/report");
     reportText.textContent = data.report || "No data.";
   } catch (error) {
     reportText.textContent = "No report yet.";
@@ -72,13 +116,56 @@ async function loadBalance() {
     return;
   }
   try {
-    const data = await apiFetch("/api/balance", { method: "GET" });
+    const data = await cachedFetch("/api/balance");
     balanceText.textContent = data.report || "All settled.";
   } catch (error) {
     balanceText.textContent = "No balance yet.";
   }
 }
 
+async function loadSettlements() {
+  if (!initData) {
+    settleText.textContent = "Open inside Telegram to load data.";
+    return;
+  }
+  try {
+    const data = await apiFetch("/api/settlements", { method: "GET" });
+    settleText.textContent = data.report || "All settled.";
+    renderSettleActions(data.user_id, data.settlements || []);
+  } catch (error) {
+    settleText.textContent = "No settlements yet.";
+  }
+}
+
+function renderSettleActions(userId, settlements) {
+  settleActions.replaceChildren();
+  settlements
+    .filter((item) => item.from_user === userId)
+    .forEach((item) => {
+      const button = document.createElement("button");
+      button.type = "button";
+      button.className = "btn ghost";
+      button.textContent = `Mark ${item.amount} ${item.currency} paid`;
+      button.addEventListener("click", async () => {
+        try {
+          await apiFetch("/api/settlement", {
+            method: "POST",
+            body: JSON.stringify({
+              to_user: item.to_user,
+              amount: item.amount,
+              currency: item.currency,
+            }),
+          });
+          showMessage("Settlement recorded.");
+          await Promise.all([loadBalance(), loadSettlements()]);
+        } catch (error) {
+          showMessage(error.message);
+        }
+      });
+      settleActions.appendChild(button);
+    });
+}
+
 function bindForm() {
   const form = document.getElementById("entry-form");
   const actionButtons = form.querySelectorAll("button[data-action]");
@@ -103,7 +190,7 @@ function bindForm() {
       });
       showMessage("Saved.");
       form.reset();
-      await Promise.all([loadReport(), loadBalance()]);
+      await Promise.all([loadReport(), loadBalance(), loadSettlements()]);
     } catch (error) {
       showMessage(error.message);
     }
@@ -119,3 +206,4 @@ bindForm();
 loadStatus();
 loadReport();
 loadBalance();
+loadSettlements();